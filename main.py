@@ -1,7 +1,7 @@
 import json
 import os
 import sys
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from PyQt5 import QtCore, QtWidgets, QtGui
 
 from token_manager import TokenManager
@@ -9,6 +9,18 @@ from video_item import VideoItem, UploadStatus
 from dialogs.token_status_dialog import TokenStatusDialog
 from dialogs.video_editor_dialog import VideoEditorDialog
 from uploaders.youtube_uploader import YouTubeUploader
+from uploaders.bilibili_uploader import BilibiliUploader
+from upload_manager import UploadManager, DEFAULT_MAX_WORKERS, MAX_WORKERS_LIMIT
+from uploaders.progress import UploadProgress
+from services.channel_inventory import ChannelInventory
+from services.fingerprint_index import FingerprintIndex
+from services.upload_checkpoints import UploadCheckpoints
+from services.resource_governor import DEFAULT_MEMORY_BUDGET, get_governor
+from services.upload_tuner import UploadTuner
+
+
+# 平台在表格中的顯示名稱
+PLATFORM_LABELS = {"youtube": "YT", "bilibili": "B站"}
 
 
 class BatchUploadWindow(QtWidgets.QMainWindow):
@@ -17,8 +29,29 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
     def __init__(self):
         super().__init__()
         self.token_manager = TokenManager()
-        self.youtube_uploader = YouTubeUploader(self.token_manager)
+        # 分塊大小依量到的吞吐量自動調整，最佳設定保存到下次啟動
+        self.upload_tuner = UploadTuner()
+        # 頻道內容快取：加入播放清單前檢查是否已在清單中，開始批次前檢查標題重複
+        self.channel_inventory = ChannelInventory()
+        self.youtube_uploader = YouTubeUploader(
+            self.token_manager, tuner=self.upload_tuner, inventory=self.channel_inventory
+        )
+        # 勾選「同時上傳 B站」時交給 UploadManager，與 YouTube 共用同一次檔案讀取
+        self.bilibili_uploader = BilibiliUploader(tuner=self.upload_tuner)
         self.video_list: List[VideoItem] = []
+        # 記錄已上傳影片的指紋，開始批次前檢查重複；保存已完成的上傳步驟，程式重啟後只重試未完成的步驟
+        self.upload_manager = UploadManager(
+            self.youtube_uploader, fingerprint_index=FingerprintIndex(),
+            channel_inventory=self.channel_inventory, checkpoints=UploadCheckpoints(), parent=self
+        )
+        self.upload_manager.video_status_changed.connect(self._on_video_status_changed)
+        self.upload_manager.video_progress.connect(self._on_video_progress)
+        self.upload_manager.batch_progress.connect(self._on_batch_progress)
+        self.upload_manager.batch_finished.connect(self._on_batch_finished)
+        self._uploading_videos: List[VideoItem] = []
+        # 每部影片各平台最新的階段與位元組進度（key 為 (id(video), 平台)）
+        self._stage_texts: Dict[Tuple[int, str], str] = {}
+        self._byte_progress: Dict[Tuple[int, str], UploadProgress] = {}
         self.setupUi()
     
     def setupUi(self):
@@ -26,7 +59,7 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
         self.setObjectName("BatchUploadWindow")
         self.setWindowTitle("YouTube 批次上傳器")
         self.setWindowIcon(QtGui.QIcon('assets/icon.jpg'))
-        self.resize(900, 600)
+        self.resize(1100, 600)
         
         # 中央 Widget
         central_widget = QtWidgets.QWidget(self)
@@ -49,6 +82,26 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
         
         toolbar_layout.addStretch()
         
+        # 頻寬限制（0 表示不限速，上傳中也可以調整，例如開台時壓低）
+        toolbar_layout.addWidget(QtWidgets.QLabel("上傳限速:"))
+        self.spinNetworkLimit = self._create_limit_spinbox()
+        toolbar_layout.addWidget(self.spinNetworkLimit)
+        
+        toolbar_layout.addWidget(QtWidgets.QLabel("讀檔限速:"))
+        self.spinDiskLimit = self._create_limit_spinbox()
+        toolbar_layout.addWidget(self.spinDiskLimit)
+        
+        # 所有平行上傳合計的記憶體上限（分塊、封面與傳送中的請求）
+        toolbar_layout.addWidget(QtWidgets.QLabel("記憶體上限:"))
+        self.spinMemoryLimit = QtWidgets.QSpinBox()
+        self.spinMemoryLimit.setRange(0, 16384)
+        self.spinMemoryLimit.setSingleStep(64)
+        self.spinMemoryLimit.setSuffix(" MB")
+        self.spinMemoryLimit.setSpecialValueText("不限")
+        self.spinMemoryLimit.setValue(DEFAULT_MEMORY_BUDGET // (1024 * 1024))
+        self.spinMemoryLimit.valueChanged.connect(self._apply_resource_limits)
+        toolbar_layout.addWidget(self.spinMemoryLimit)
+        
         self.btCheckToken = QtWidgets.QPushButton("🔐 檢查 Token")
         self.btCheckToken.clicked.connect(self.check_token_status)
         toolbar_layout.addWidget(self.btCheckToken)
@@ -57,9 +110,10 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
         
         # === 影片列表表格 ===
         self.video_table = QtWidgets.QTableWidget()
-        self.video_table.setColumnCount(6)
+        self.video_table.setColumnCount(11)
         self.video_table.setHorizontalHeaderLabels([
-            "#", "標題", "對戰類型", "發布時間", "狀態", "操作"
+            "#", "標題", "對戰類型", "發布時間", "狀態", "B站狀態",
+            "階段", "進度", "速度", "剩餘時間", "操作"
         ])
         
         # 設定欄位寬度
@@ -69,7 +123,12 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
         header.setSectionResizeMode(2, QtWidgets.QHeaderView.ResizeToContents)  # 對戰類型
         header.setSectionResizeMode(3, QtWidgets.QHeaderView.ResizeToContents)  # 發布時間
         header.setSectionResizeMode(4, QtWidgets.QHeaderView.ResizeToContents)  # 狀態
-        header.setSectionResizeMode(5, QtWidgets.QHeaderView.ResizeToContents)  # 操作
+        header.setSectionResizeMode(5, QtWidgets.QHeaderView.ResizeToContents)  # B站狀態
+        header.setSectionResizeMode(6, QtWidgets.QHeaderView.ResizeToContents)  # 階段
+        header.setSectionResizeMode(7, QtWidgets.QHeaderView.ResizeToContents)  # 進度
+        header.setSectionResizeMode(8, QtWidgets.QHeaderView.ResizeToContents)  # 速度
+        header.setSectionResizeMode(9, QtWidgets.QHeaderView.ResizeToContents)  # 剩餘時間
+        header.setSectionResizeMode(10, QtWidgets.QHeaderView.ResizeToContents)  # 操作
         
         # 設定選擇模式
         self.video_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
@@ -94,6 +153,20 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
         
         button_layout.addStretch()
         
+        button_layout.addWidget(QtWidgets.QLabel("同時上傳數:"))
+        self.spinMaxWorkers = QtWidgets.QSpinBox()
+        self.spinMaxWorkers.setRange(1, MAX_WORKERS_LIMIT)
+        self.spinMaxWorkers.setValue(DEFAULT_MAX_WORKERS)
+        button_layout.addWidget(self.spinMaxWorkers)
+        
+        self.chkStopOnFailure = QtWidgets.QCheckBox("失敗時停止")
+        self.chkStopOnFailure.setToolTip("任一部影片上傳失敗時停止整個批次，未完成的影片保持待上傳")
+        button_layout.addWidget(self.chkStopOnFailure)
+        
+        self.chkUploadBilibili = QtWidgets.QCheckBox("同時上傳 B站")
+        self.chkUploadBilibili.setToolTip("每部影片同時上傳到 YouTube 與 B站，兩個平台共用同一次檔案讀取")
+        button_layout.addWidget(self.chkUploadBilibili)
+        
         self.btStartUpload = QtWidgets.QPushButton("🚀 開始批次上傳")
         self.btStartUpload.clicked.connect(self.start_batch_upload)
         self.btStartUpload.setStyleSheet("""
@@ -113,6 +186,11 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
         """)
         button_layout.addWidget(self.btStartUpload)
         
+        self.btStopUpload = QtWidgets.QPushButton("⏹ 停止上傳")
+        self.btStopUpload.clicked.connect(self.stop_batch_upload)
+        self.btStopUpload.setEnabled(False)
+        button_layout.addWidget(self.btStopUpload)
+        
         main_layout.addLayout(button_layout)
         
         # === 進度顯示 ===
@@ -127,6 +205,34 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
         
         main_layout.addLayout(progress_layout)
     
+    def _create_limit_spinbox(self) -> QtWidgets.QDoubleSpinBox:
+        """
+        建立 MB/s 限速輸入框
+        
+        Returns:
+            QtWidgets.QDoubleSpinBox: 限速輸入框（0 顯示為「不限」）
+        """
+        spin = QtWidgets.QDoubleSpinBox()
+        spin.setRange(0, 1000)
+        spin.setDecimals(1)
+        spin.setSingleStep(0.5)
+        spin.setSuffix(" MB/s")
+        spin.setSpecialValueText("不限")
+        spin.valueChanged.connect(self._apply_resource_limits)
+        return spin
+    
+    def _apply_resource_limits(self):
+        """把限速與記憶體上限套用到所有上傳器共用的資源管控（立即生效）"""
+        def to_rate(mb_per_second: float):
+            return mb_per_second * 1024 * 1024 if mb_per_second > 0 else None
+        
+        get_governor().set_limits(
+            network_rate=to_rate(self.spinNetworkLimit.value()),
+            disk_rate=to_rate(self.spinDiskLimit.value()),
+        )
+        memory_mb = self.spinMemoryLimit.value()
+        get_governor().set_memory_limit(memory_mb * 1024 * 1024 if memory_mb > 0 else None)
+    
     def check_token_status(self):
         """開啟 Token 狀態檢查對話框"""
         dialog = TokenStatusDialog(self.token_manager, self)
@@ -155,7 +261,8 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
         )
         
         if reply == QtWidgets.QMessageBox.Yes:
-            del self.video_list[current_row]
+            video = self.video_list.pop(current_row)
+            self._clear_progress(video)
             self.refresh_video_table()
     
     def edit_video(self):
@@ -194,19 +301,12 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
             time_item.setTextAlignment(QtCore.Qt.AlignCenter)
             self.video_table.setItem(row, 3, time_item)
             
-            # 狀態
-            status_item = QtWidgets.QTableWidgetItem(video.status_text)
-            status_item.setTextAlignment(QtCore.Qt.AlignCenter)
-            
-            # 根據狀態設定顏色
-            if video.status == UploadStatus.COMPLETED:
-                status_item.setForeground(QtGui.QColor("green"))
-            elif video.status == UploadStatus.FAILED:
-                status_item.setForeground(QtGui.QColor("red"))
-            elif video.status == UploadStatus.UPLOADING:
-                status_item.setForeground(QtGui.QColor("blue"))
+            # 狀態（YouTube 與 B站各自獨立）
+            self.video_table.setItem(row, 4, self._create_status_item(video.status))
+            self.video_table.setItem(row, 5, self._create_status_item(video.bilibili_status))
             
-            self.video_table.setItem(row, 4, status_item)
+            # 階段、進度、速度、剩餘時間
+            self._update_progress_cells(row, video)
             
             # 操作按鈕（預留）
             action_widget = QtWidgets.QWidget()
@@ -217,7 +317,61 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
             # 可以在這裡加入單獨的操作按鈕
             # 例如：查看詳情、重新上傳等
             
-            self.video_table.setCellWidget(row, 5, action_widget)
+            self.video_table.setCellWidget(row, 10, action_widget)
+    
+    @staticmethod
+    def _create_status_item(status: UploadStatus) -> QtWidgets.QTableWidgetItem:
+        """
+        建立依狀態著色的狀態欄位
+        
+        Args:
+            status: 上傳狀態
+            
+        Returns:
+            QtWidgets.QTableWidgetItem: 表格欄位
+        """
+        status_item = QtWidgets.QTableWidgetItem(status.value)
+        status_item.setTextAlignment(QtCore.Qt.AlignCenter)
+        
+        # 根據狀態設定顏色
+        if status == UploadStatus.COMPLETED:
+            status_item.setForeground(QtGui.QColor("green"))
+        elif status == UploadStatus.FAILED:
+            status_item.setForeground(QtGui.QColor("red"))
+        elif status == UploadStatus.UPLOADING:
+            status_item.setForeground(QtGui.QColor("blue"))
+        return status_item
+    
+    def _update_progress_cells(self, row: int, video: VideoItem):
+        """
+        更新單一列的階段、進度、速度與剩餘時間欄位
+        
+        同時上傳兩個平台時，各欄位依平台以「 / 」分隔顯示
+        
+        Args:
+            row: 表格列
+            video: 影片資料
+        """
+        platforms = [p for p in PLATFORM_LABELS if (id(video), p) in self._stage_texts]
+        labeled = len(platforms) > 1
+        columns = [[], [], [], []]
+        for platform in platforms:
+            progress = self._byte_progress.get((id(video), platform))
+            prefix = f"{PLATFORM_LABELS[platform]} " if labeled and progress else ""
+            columns[0].append(self._stage_texts[(id(video), platform)])
+            if progress:
+                columns[1].append(prefix + progress.progress_text)
+                if not progress.is_complete:
+                    columns[2].append(prefix + progress.speed_text)
+                columns[3].append(prefix + progress.eta_text)
+        texts = [" / ".join(parts) for parts in columns]
+        for column, text in enumerate(texts, 6):
+            item = self.video_table.item(row, column)
+            if item is None:
+                item = QtWidgets.QTableWidgetItem()
+                item.setTextAlignment(QtCore.Qt.AlignCenter)
+                self.video_table.setItem(row, column, item)
+            item.setText(text)
     
     
     def start_batch_upload(self):
@@ -226,8 +380,19 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.warning(self, "警告", "影片列表為空，請先新增影片！")
             return
         
-        # 檢查是否有待上傳的影片
-        pending_videos = [v for v in self.video_list if v.status == UploadStatus.PENDING]
+        # 檢查是否有待上傳的影片（失敗的影片重新上傳時只執行未完成的步驟）
+        pending_videos = [v for v in self.video_list if v.needs_upload]
+        if not pending_videos:
+            QtWidgets.QMessageBox.information(self, "提示", "沒有待上傳的影片！")
+            return
+        
+        # 先決定要上傳的平台，檢查重複時只看這些平台
+        self.upload_manager.bilibili_uploader = (
+            self.bilibili_uploader if self.chkUploadBilibili.isChecked() else None
+        )
+        pending_videos = self._skip_duplicate_videos(pending_videos)
+        if pending_videos is None:
+            return
         if not pending_videos:
             QtWidgets.QMessageBox.information(self, "提示", "沒有待上傳的影片！")
             return
@@ -242,97 +407,173 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
         if reply == QtWidgets.QMessageBox.Yes:
             self._execute_batch_upload(pending_videos)
     
+    def _skip_duplicate_videos(self, videos: List[VideoItem]) -> Optional[List[VideoItem]]:
+        """
+        在送出任何位元組之前檢查重複的影片，由使用者決定是否略過
+        
+        略過時已在平台上的影片在該平台標記為已略過（記下原本的影片 ID，不算本批次上傳），
+        其餘要上傳的平台照常上傳；與列表中其他影片相同的影片整部略過
+        
+        Args:
+            videos: 待上傳的影片列表
+            
+        Returns:
+            Optional[List[VideoItem]]: 要上傳的影片（使用者取消時為 None）
+        """
+        duplicates = self.upload_manager.find_duplicates(videos)
+        if not duplicates:
+            return videos
+        
+        lines = []
+        for video, uploaded in duplicates:
+            if uploaded:
+                ids = ", ".join(f"{PLATFORM_LABELS.get(p, p)}: {i}" for p, i in uploaded.items())
+                lines.append(f"• {video.title}（已上傳 {ids}）")
+            else:
+                lines.append(f"• {video.title}（與列表中的其他影片相同）")
+        reply = QtWidgets.QMessageBox.question(
+            self,
+            "重複的影片",
+            "以下影片已上傳過或在列表中重複：\n\n" + "\n".join(lines) + "\n\n是否略過這些影片？（只略過已上傳的平台，其餘平台照常上傳）",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No | QtWidgets.QMessageBox.Cancel
+        )
+        if reply == QtWidgets.QMessageBox.Cancel:
+            return None
+        if reply == QtWidgets.QMessageBox.No:
+            return videos
+        
+        skipped = set()
+        for video, uploaded in duplicates:
+            for platform, video_id in uploaded.items():
+                video.set_skipped(platform, video_id)
+            remaining = video.status != UploadStatus.SKIPPED or (
+                self.upload_manager.bilibili_uploader is not None
+                and video.bilibili_status != UploadStatus.SKIPPED
+            )
+            if not uploaded or not remaining:
+                skipped.add(id(video))
+        self.refresh_video_table()
+        return [video for video in videos if id(video) not in skipped]
+    
     def _execute_batch_upload(self, videos: List[VideoItem]):
         """
-        執行批次上傳
+        執行批次上傳（交由 UploadManager 在背景執行緒處理）
         
         Args:
             videos: 待上傳的影片列表
         """
         # 禁用上傳按鈕
-        self.btStartUpload.setEnabled(False)
-        self.btAddVideo.setEnabled(False)
-        self.btRemoveVideo.setEnabled(False)
-        self.btEditVideo.setEnabled(False)
+        self._set_editing_enabled(False)
         
         # 顯示進度條
         self.progress_bar.setVisible(True)
         self.progress_bar.setMaximum(len(videos))
         self.progress_bar.setValue(0)
+        self.progress_label.setText(f"正在上傳 0/{len(videos)}")
+        
+        self._uploading_videos = list(videos)
+        for video in videos:
+            self._clear_progress(video)
+        self.upload_manager.max_workers = self.spinMaxWorkers.value()
+        self.upload_manager.stop_on_failure = self.chkStopOnFailure.isChecked()
+        self.upload_manager.start(videos)
+    
+    def _set_editing_enabled(self, enabled: bool):
+        """
+        啟用或禁用會修改影片列表的按鈕
         
-        total = len(videos)
-        success_count = 0
-        fail_count = 0
-        
-        for index, video in enumerate(videos, 1):
-            try:
-                # 更新進度
-                self.progress_label.setText(f"正在上傳 {index}/{total}: {video.title}")
-                self.progress_bar.setValue(index - 1)
-                QtWidgets.QApplication.processEvents()
-                
-                # 設定為上傳中
-                video.set_status(UploadStatus.UPLOADING)
-                self.refresh_video_table()
-                QtWidgets.QApplication.processEvents()
-                
-                # 1. 上傳影片
-                print(f"\n{'='*60}")
-                print(f"開始上傳第 {index}/{total} 部影片")
-                print(f"標題: {video.title}")
-                print(f"{'='*60}")
-                
-                video_id = self.youtube_uploader.upload(video)
-                video.set_video_id(video_id)
-                
-                # 2. 設定縮圖
-                if video.has_thumbnail:
-                    print(f"設定縮圖...")
-                    self.youtube_uploader.set_thumbnail(video_id, video.thumbnail_path)
-                
-                # 3. 加入播放清單
-                if video.playlist_ids:
-                    print(f"加入播放清單...")
-                    self.youtube_uploader.add_to_playlist(video_id, video.playlist_ids)
-                
-                # 4. 添加多國語言
-                print(f"添加多國語言...")
-                self.youtube_uploader.add_localizations(video_id, video.replay_url or "")
-                
-                # 設定為完成
-                video.set_status(UploadStatus.COMPLETED)
-                success_count += 1
-                
-                print(f"✅ 第 {index}/{total} 部影片上傳成功！")
-                
-            except Exception as e:
-                # 設定為失敗
-                error_msg = str(e)
-                video.set_status(UploadStatus.FAILED, error_msg)
-                fail_count += 1
-                
-                print(f"❌ 第 {index}/{total} 部影片上傳失敗: {error_msg}")
-                
-                # 詢問是否繼續
-                if index < total:
-                    reply = QtWidgets.QMessageBox.question(
-                        self,
-                        "上傳失敗",
-                        f"影片「{video.title}」上傳失敗：\n{error_msg}\n\n是否繼續上傳剩餘影片？",
-                        QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
-                    )
-                    
-                    if reply == QtWidgets.QMessageBox.No:
-                        break
-            
-            finally:
-                # 刷新表格
-                self.refresh_video_table()
-                QtWidgets.QApplication.processEvents()
+        Args:
+            enabled: 是否啟用
+        """
+        self.btStartUpload.setEnabled(enabled)
+        self.btAddVideo.setEnabled(enabled)
+        self.btRemoveVideo.setEnabled(enabled)
+        self.btEditVideo.setEnabled(enabled)
+        self.spinMaxWorkers.setEnabled(enabled)
+        self.chkStopOnFailure.setEnabled(enabled)
+        self.chkUploadBilibili.setEnabled(enabled)
+        self.btStopUpload.setEnabled(not enabled)
+    
+    def _clear_progress(self, video: VideoItem):
+        """
+        清除影片所有平台的階段與位元組進度
+        
+        Args:
+            video: 影片資料
+        """
+        for platform in PLATFORM_LABELS:
+            self._stage_texts.pop((id(video), platform), None)
+            self._byte_progress.pop((id(video), platform), None)
+    
+    def stop_batch_upload(self):
+        """停止批次上傳（上傳中的影片會在下一個分塊前停止，之後可續傳）"""
+        reply = QtWidgets.QMessageBox.question(
+            self,
+            "確認",
+            "確定要停止上傳嗎？已上傳的部分會保留，下次可從中斷處繼續。",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
+        )
+        if reply == QtWidgets.QMessageBox.Yes:
+            self.btStopUpload.setEnabled(False)
+            self.progress_label.setText("正在停止...")
+            self.upload_manager.cancel()
+    
+    def _on_video_status_changed(self, video: VideoItem):
+        """
+        單部影片狀態變更（由 UploadManager 訊號觸發）
+        
+        Args:
+            video: 狀態變更的影片
+        """
+        self.refresh_video_table()
+    
+    def _on_video_progress(self, video: VideoItem, progress: UploadProgress):
+        """
+        單部影片進度更新（由 UploadManager 訊號觸發，已合併為每秒數次）
+        
+        Args:
+            video: 影片資料
+            progress: 進度快照
+        """
+        label = PLATFORM_LABELS.get(progress.platform, progress.platform)
+        key = (id(video), progress.platform)
+        self._stage_texts[key] = f"{label} {progress.stage.value}"
+        if progress.has_bytes:
+            self._byte_progress[key] = progress
+        
+        for row, item in enumerate(self.video_list):
+            if item is video:
+                self._update_progress_cells(row, video)
+                break
+    
+    def _on_batch_progress(self, done: int, total: int):
+        """
+        批次進度更新（由 UploadManager 訊號觸發）
         
-        # 完成
-        self.progress_bar.setValue(total)
-        self.progress_label.setText(f"上傳完成！成功: {success_count}, 失敗: {fail_count}")
+        Args:
+            done: 已處理完成的影片數
+            total: 影片總數
+        """
+        self.progress_bar.setValue(done)
+        self.progress_label.setText(f"正在上傳 {done}/{total}")
+    
+    def _on_batch_finished(self, success_count: int, fail_count: int):
+        """
+        批次上傳完成（由 UploadManager 訊號觸發）
+        
+        Args:
+            success_count: 成功數
+            fail_count: 失敗數
+        """
+        videos = self._uploading_videos
+        self._uploading_videos = []
+        
+        self.refresh_video_table()
+        self.progress_bar.setValue(self.progress_bar.maximum())
+        if self.upload_manager.was_cancelled:
+            self.progress_label.setText(f"上傳已停止！成功: {success_count}, 未完成: {fail_count}")
+        else:
+            self.progress_label.setText(f"上傳完成！成功: {success_count}, 失敗: {fail_count}")
         
         # 生成上傳報告 JSON
         if success_count > 0:
@@ -346,10 +587,22 @@ class BatchUploadWindow(QtWidgets.QMainWindow):
         )
         
         # 恢復按鈕
-        self.btStartUpload.setEnabled(True)
-        self.btAddVideo.setEnabled(True)
-        self.btRemoveVideo.setEnabled(True)
-        self.btEditVideo.setEnabled(True)
+        self._set_editing_enabled(True)
+    
+    def closeEvent(self, event: QtGui.QCloseEvent):
+        """關閉視窗時確認是否中斷進行中的上傳"""
+        if self.upload_manager.is_running:
+            reply = QtWidgets.QMessageBox.question(
+                self,
+                "確認",
+                "仍有影片正在上傳，確定要離開嗎？",
+                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
+            )
+            if reply == QtWidgets.QMessageBox.No:
+                event.ignore()
+                return
+            self.upload_manager.shutdown()
+        event.accept()
     
     def _generate_upload_report(self, videos: List[VideoItem]):
         """
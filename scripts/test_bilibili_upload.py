@@ -14,7 +14,8 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from uploaders.bilibili_uploader import BilibiliUploader
+from services.upload_tuner import UploadTuner
+from uploaders.bilibili_uploader import BILIBILI_CHUNK_CONCURRENCY, BilibiliUploader
 from video_item import VideoItem
 
 
@@ -29,6 +30,12 @@ def main():
     parser.add_argument("--replay")
     parser.add_argument("--description", default="")
     parser.add_argument("--publish-time", help="Asia/Taipei time, format: YYYY-MM-DD HH:MM")
+    parser.add_argument("--chunk-concurrency", type=int, default=BILIBILI_CHUNK_CONCURRENCY)
+    parser.add_argument(
+        "--auto-tune",
+        action="store_true",
+        help="Adjust in-flight chunks from measured throughput and remember the best value",
+    )
     args = parser.parse_args()
     publish_time = datetime.now(TAIPEI_TIMEZONE)
     if args.publish_time:
@@ -45,7 +52,8 @@ def main():
         publish_time=publish_time,
     )
 
-    bvid = BilibiliUploader().upload(video)
+    tuner = UploadTuner() if args.auto_tune else None
+    bvid = BilibiliUploader(chunk_concurrency=args.chunk_concurrency, tuner=tuner).upload(video)
     print(f"Uploaded to Bilibili: https://www.bilibili.com/video/{bvid}")
 
 
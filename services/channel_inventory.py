@@ -0,0 +1,270 @@
+"""
+頻道內容快取
+在本地保存頻道「上傳的影片」播放清單與目標播放清單的內容，
+上傳或加入播放清單前直接查本地快取（O(1)、不耗配額）：標題重複的影片與已在播放清單中的影片
+不會再送出 insert。同步時每一頁都帶上次的 ETag（If-None-Match），沒有變更的頁面
+伺服器只回 304，沿用快取的內容；「上傳的影片」由新到舊排列，只讀取最前面出現新影片的幾頁
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from googleapiclient.errors import HttpError
+
+from services.state_store import JsonStateStore
+
+
+CHANNEL_INVENTORY_PATH = "channel_inventory.json"
+# playlistItems.list 每頁最多的項目數
+PLAYLIST_PAGE_SIZE = 50
+# 「上傳的影片」播放清單 ID 在快取檔中的 key
+UPLOADS_KEY = "uploads_playlist_id"
+
+
+class ChannelInventory:
+    """
+    頻道播放清單的本地快取
+
+    每個播放清單保存為分頁列表 [{'token', 'etag', 'items': [[影片 ID, 標題], ...], 'next'}]，
+    同步時依頁面 token 帶上 ETag；本地新增（剛上傳、剛加入清單）的項目在下次同步前另外記錄
+    """
+
+    def __init__(self, path: str = CHANNEL_INVENTORY_PATH):
+        """
+        初始化快取
+
+        Args:
+            path: 快取檔路徑
+        """
+        self.store = JsonStateStore(path)
+        self._lock = threading.RLock()
+        # 播放清單 ID → 影片 ID 集合 / 標題 → 影片 ID（由快取檔建立的記憶體索引）
+        self._members: Dict[str, Set[str]] = {}
+        self._titles: Dict[str, Dict[str, str]] = {}
+
+    @property
+    def uploads_playlist_id(self) -> Optional[str]:
+        """頻道「上傳的影片」播放清單 ID（第一次同步後才知道）"""
+        return self.store.get(UPLOADS_KEY)
+
+    def contains(self, playlist_id: str, video_id: str) -> bool:
+        """
+        影片是否已在播放清單中（只查本地快取）
+
+        Args:
+            playlist_id: 播放清單 ID
+            video_id: 影片 ID
+
+        Returns:
+            bool: 是否已在播放清單中
+        """
+        with self._lock:
+            return video_id in self._index(playlist_id)[0]
+
+    def find_title(self, title: str) -> Optional[str]:
+        """
+        找出頻道上標題相同的影片（只查本地快取）
+
+        Args:
+            title: 影片標題
+
+        Returns:
+            Optional[str]: 影片 ID（沒有時為 None）
+        """
+        playlist_id = self.uploads_playlist_id
+        if not playlist_id:
+            return None
+        with self._lock:
+            return self._index(playlist_id)[1].get(title)
+
+    def record(self, playlist_id: str, video_id: str, title: str = ""):
+        """
+        記錄本地剛新增的項目（下次同步時由伺服器的內容取代）
+
+        Args:
+            playlist_id: 播放清單 ID
+            video_id: 影片 ID
+            title: 影片標題
+        """
+        with self._lock:
+            entry = self._entry(playlist_id)
+            entry['added'].append([video_id, title])
+            self.store.set(playlist_id, entry)
+            members, titles = self._index(playlist_id)
+            members.add(video_id)
+            if title:
+                titles[title] = video_id
+
+    def record_upload(self, video_id: str, title: str):
+        """
+        記錄剛上傳的影片（還不知道「上傳的影片」播放清單時略過）
+
+        Args:
+            video_id: 影片 ID
+            title: 影片標題
+        """
+        playlist_id = self.uploads_playlist_id
+        if playlist_id:
+            self.record(playlist_id, video_id, title)
+
+    def sync(self, youtube, playlist_ids: Iterable[str] = (), include_uploads: bool = True):
+        """
+        以 ETag 條件請求同步播放清單
+
+        Args:
+            youtube: YouTube 服務
+            playlist_ids: 要同步的播放清單
+            include_uploads: 是否同時同步「上傳的影片」播放清單
+        """
+        targets = list(dict.fromkeys(playlist_ids))
+        if include_uploads:
+            self._sync_uploads(youtube, self._uploads_playlist(youtube))
+        for playlist_id in targets:
+            self._sync_playlist(youtube, playlist_id)
+
+    def _uploads_playlist(self, youtube) -> str:
+        """
+        取得「上傳的影片」播放清單 ID（只在第一次查詢頻道）
+
+        Args:
+            youtube: YouTube 服務
+
+        Returns:
+            str: 播放清單 ID
+        """
+        playlist_id = self.uploads_playlist_id
+        if not playlist_id:
+            response = youtube.channels().list(part="contentDetails", mine=True).execute()
+            playlist_id = response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+            self.store.set(UPLOADS_KEY, playlist_id)
+        return playlist_id
+
+    def _sync_playlist(self, youtube, playlist_id: str):
+        """
+        逐頁同步單一播放清單，沒有變更的頁面（304）沿用快取
+
+        Args:
+            youtube: YouTube 服務
+            playlist_id: 播放清單 ID
+        """
+        cached = {page['token']: page for page in self._entry(playlist_id)['pages']}
+        pages: List[Dict[str, Any]] = []
+        not_modified = 0
+        token = ""
+        while True:
+            request = self._list_request(youtube, playlist_id, token)
+            page = cached.get(token)
+            if page is not None:
+                request.headers['If-None-Match'] = page['etag']
+            try:
+                response = request.execute()
+            except HttpError as e:
+                if page is None or e.resp.status != 304:
+                    raise
+                not_modified += 1
+            else:
+                page = {
+                    'token': token,
+                    'etag': response.get('etag', ''),
+                    'items': self._page_items(response),
+                    'next': response.get('nextPageToken', ''),
+                }
+            pages.append(page)
+            token = page['next']
+            if not token:
+                break
+
+        with self._lock:
+            self.store.set(playlist_id, {'pages': pages, 'added': []})
+            self._members.pop(playlist_id, None)
+            self._titles.pop(playlist_id, None)
+        print(f"同步播放清單 {playlist_id}: {len(pages)} 頁（{not_modified} 頁沒有變更）")
+
+    def _sync_uploads(self, youtube, playlist_id: str):
+        """
+        同步「上傳的影片」播放清單：從最新的一頁往後讀，讀到含有已知影片的一頁為止
+
+        這個清單由新到舊排列，每上傳一部影片所有分頁都會位移、ETag 全部失效，逐頁條件請求
+        等於每次重新讀取整個頻道；新影片只會出現在最前面，其餘沿用快取。
+        快取存成單一頁並帶第一頁的 ETag，沒有新影片時只花一個 304 請求
+
+        Args:
+            youtube: YouTube 服務
+            playlist_id: 「上傳的影片」播放清單 ID
+        """
+        entry = self._entry(playlist_id)
+        cached = [item for page in entry['pages'] for item in page['items']] + entry['added']
+        known = {video_id for video_id, _ in cached}
+        head_etag = entry['pages'][0]['etag'] if entry['pages'] else None
+        fetched: List[List[str]] = []
+        etag = ""
+        pages = 0
+        token = ""
+        while True:
+            request = self._list_request(youtube, playlist_id, token)
+            if not token and head_etag:
+                request.headers['If-None-Match'] = head_etag
+            try:
+                response = request.execute()
+            except HttpError as e:
+                if token or not head_etag or e.resp.status != 304:
+                    raise
+                print(f"同步上傳的影片 {playlist_id}: 沒有新影片")
+                return
+            pages += 1
+            if not token:
+                etag = response.get('etag', '')
+            items = self._page_items(response)
+            fetched += items
+            token = response.get('nextPageToken', '')
+            if not token or any(video_id in known for video_id, _ in items):
+                break
+
+        fetched_ids = {video_id for video_id, _ in fetched}
+        items = fetched + [item for item in cached if item[0] not in fetched_ids]
+        with self._lock:
+            self.store.set(playlist_id, {
+                'pages': [{'token': "", 'etag': etag, 'items': items, 'next': ""}],
+                'added': [],
+            })
+            self._members.pop(playlist_id, None)
+            self._titles.pop(playlist_id, None)
+        print(f"同步上傳的影片 {playlist_id}: 讀取 {pages} 頁，共 {len(items)} 部影片")
+
+    @staticmethod
+    def _list_request(youtube, playlist_id: str, token: str):
+        """建立 playlistItems.list 的分頁請求"""
+        return youtube.playlistItems().list(
+            part="snippet",
+            playlistId=playlist_id,
+            maxResults=PLAYLIST_PAGE_SIZE,
+            pageToken=token or None,
+            fields="etag,nextPageToken,items(snippet(title,resourceId/videoId))",
+        )
+
+    @staticmethod
+    def _page_items(response: Dict[str, Any]) -> List[List[str]]:
+        """取出一頁回應中的 [影片 ID, 標題]"""
+        return [
+            [item['snippet']['resourceId']['videoId'], item['snippet'].get('title', '')]
+            for item in response.get('items', [])
+        ]
+
+    def _entry(self, playlist_id: str) -> Dict[str, Any]:
+        """取得播放清單的快取內容（沒有時為空）"""
+        entry = self.store.get(playlist_id) or {}
+        return {'pages': entry.get('pages', []), 'added': entry.get('added', [])}
+
+    def _index(self, playlist_id: str):
+        """
+        取得播放清單的記憶體索引（第一次使用時由快取內容建立，呼叫端需持有鎖）
+
+        Returns:
+            Tuple[Set[str], Dict[str, str]]: 影片 ID 集合與標題對應的影片 ID
+        """
+        if playlist_id not in self._members:
+            entry = self._entry(playlist_id)
+            items = [item for page in entry['pages'] for item in page['items']] + entry['added']
+            self._members[playlist_id] = {video_id for video_id, _ in items}
+            self._titles[playlist_id] = {title: video_id for video_id, title in items if title}
+        return self._members[playlist_id], self._titles[playlist_id]
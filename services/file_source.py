@@ -0,0 +1,328 @@
+"""
+共用檔案來源
+以唯讀 mmap 提供影片檔案的分塊（memoryview，不另外配置 bytes），
+並在背景預讀下一個分塊，讓磁碟讀取與上傳重疊；同一個檔案由所有上傳器共用。
+同時上傳到多個平台時，來源就是分流（tee）：各平台讀到的是同一份 page cache，
+磁碟配額也只在第一個讀到某個區塊的上傳器扣一次
+"""
+
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from services.state_store import file_state_key
+
+
+# 沒有 posix_fadvise 的平台（Windows）預讀時每次讀取的位元組數
+PREFETCH_BLOCK_SIZE = 1024 * 1024
+# 串流讀取時預設的預讀範圍
+DEFAULT_READAHEAD = 8 * 1024 * 1024
+# 磁碟配額只扣一次的記錄單位
+TEE_BLOCK_SIZE = 1024 * 1024
+
+
+class FileSource:
+    """
+    唯讀的 mmap 檔案來源
+
+    view() 直接回傳 mmap 的切片，多個執行緒可以同時取用不同範圍；
+    prefetch() 在背景執行緒把指定範圍載入 page cache，之後的 view 不必等待磁碟；
+    charge_disk() 以區塊記錄已讀過的範圍，多個上傳器讀同一段時只扣一次磁碟配額
+    """
+
+    def __init__(self, path: str):
+        """
+        開啟檔案來源
+
+        Args:
+            path: 檔案路徑
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        # 空檔案無法 mmap
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self._view = memoryview(self._mmap) if self._mmap is not None else memoryview(b"")
+        self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="file-readahead")
+        self._prefetch_buffer: Optional[bytearray] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        # 每個區塊是否已被某個上傳器讀過（已扣過磁碟配額）
+        self._block_size = TEE_BLOCK_SIZE
+        self._charged = bytearray(-(-self.size // self._block_size))
+        self.disk_bytes_charged = 0
+
+    def view(self, offset: int, length: int) -> memoryview:
+        """
+        取得檔案指定範圍的唯讀 view（不複製資料）
+
+        Args:
+            offset: 起始位置
+            length: 長度（超過檔案結尾時截斷）
+
+        Returns:
+            memoryview: 檔案內容
+        """
+        return self._view[offset:offset + length]
+
+    def reader(self, readahead: int = DEFAULT_READAHEAD, governor=None,
+               cancel_token=None) -> "SourceReader":
+        """
+        取得可交給 HTTP 函式庫當作 body 的串流
+
+        Args:
+            readahead: 讀取時預先載入的範圍（0 表示不預讀）
+            governor: 讀取時經由 charge_disk() 扣磁碟配額的資源管控（None 表示不扣）
+            cancel_token: 取消權杖（等待配額期間可被中斷）
+
+        Returns:
+            SourceReader: 串流
+        """
+        return SourceReader(self, readahead, governor, cancel_token)
+
+    def charge_disk(self, offset: int, length: int, governor, cancel_token=None) -> int:
+        """
+        讀取指定範圍前扣磁碟配額，其他上傳器已讀過的區塊不再重複扣
+
+        Args:
+            offset: 起始位置
+            length: 長度（超過檔案結尾時截斷）
+            governor: 資源管控
+            cancel_token: 取消權杖
+
+        Returns:
+            int: 實際扣掉的位元組數
+        """
+        end = min(offset + length, self.size)
+        if end <= offset:
+            return 0
+        amount = 0
+        with self._lock:
+            for block in range(offset // self._block_size, (end - 1) // self._block_size + 1):
+                if not self._charged[block]:
+                    self._charged[block] = 1
+                    amount += min(self._block_size, self.size - block * self._block_size)
+            self.disk_bytes_charged += amount
+        if amount:
+            governor.acquire_disk(amount, cancel_token)
+        return amount
+
+    def prefetch(self, offset: int, length: int):
+        """
+        在背景把指定範圍載入 page cache（立即返回）
+
+        Args:
+            offset: 起始位置
+            length: 長度
+        """
+        length = min(length, self.size - offset)
+        if length <= 0:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            self._prefetcher.submit(self._load, offset, length)
+
+    def close(self):
+        """關閉檔案來源（仍被引用的 view 會讓 mmap 延後到不再使用時才釋放）"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._prefetcher.shutdown(wait=True)
+        try:
+            self._view.release()
+            if self._mmap is not None:
+                self._mmap.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+    def _load(self, offset: int, length: int):
+        """
+        實際的預讀（在背景執行緒執行）
+
+        Args:
+            offset: 起始位置
+            length: 長度
+        """
+        try:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(self._file.fileno(), offset, length, os.POSIX_FADV_WILLNEED)
+                return
+            # 其他平台以可重複使用的緩衝區讀過一次，讓資料進入 page cache
+            if self._prefetch_buffer is None:
+                self._prefetch_buffer = bytearray(PREFETCH_BLOCK_SIZE)
+            buffer = memoryview(self._prefetch_buffer)
+            with open(self.path, "rb", buffering=0) as f:
+                f.seek(offset)
+                remaining = length
+                while remaining > 0:
+                    read = f.readinto(buffer[:min(remaining, len(buffer))])
+                    if not read:
+                        break
+                    remaining -= read
+        except OSError as e:
+            print(f"預讀 {self.path} 失敗: {str(e)}")
+
+
+class ViewReader:
+    """把 memoryview 包成可 read / seek / tell 的串流，read 回傳切片而不複製資料"""
+
+    def __init__(self, view: memoryview):
+        """
+        初始化串流
+
+        Args:
+            view: 資料
+        """
+        self._data = view
+        self._position = 0
+
+    def read(self, size: int = -1) -> memoryview:
+        """
+        讀取資料
+
+        Args:
+            size: 最多讀取的位元組數（負數表示讀到結尾）
+
+        Returns:
+            memoryview: 讀到的資料
+        """
+        end = len(self._data) if size is None or size < 0 else min(len(self._data), self._position + size)
+        chunk = self._data[self._position:end]
+        self._position = max(self._position, end)
+        return chunk
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """移動讀取位置"""
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += len(self._data)
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self) -> int:
+        """目前讀取位置"""
+        return self._position
+
+    def close(self):
+        """串流不擁有資料，不需要釋放"""
+        pass
+
+
+class SourceReader(ViewReader):
+    """整個檔案來源的串流，讀取時在背景預讀後面 readahead 位元組"""
+
+    def __init__(self, source: FileSource, readahead: int = DEFAULT_READAHEAD,
+                 governor=None, cancel_token=None):
+        """
+        初始化串流
+
+        Args:
+            source: 檔案來源
+            readahead: 預讀範圍（0 表示不預讀）
+            governor: 讀取時扣磁碟配額的資源管控（None 表示不扣）
+            cancel_token: 取消權杖
+        """
+        super().__init__(source.view(0, source.size))
+        self._source = source
+        self._readahead = readahead
+        self._governor = governor
+        self._cancel_token = cancel_token
+        self._prefetched_until = 0
+        self._schedule_readahead()
+
+    def read(self, size: int = -1) -> memoryview:
+        offset = self.tell()
+        chunk = super().read(size)
+        if self._governor is not None:
+            self._source.charge_disk(offset, len(chunk), self._governor, self._cancel_token)
+        self._schedule_readahead()
+        return chunk
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        position = super().seek(offset, whence)
+        if not self._prefetched_until - self._readahead <= position <= self._prefetched_until:
+            # 跳到預讀範圍以外（例如續傳或重送分塊），從新的位置重新預讀
+            self._prefetched_until = position
+        self._schedule_readahead()
+        return position
+
+    def _schedule_readahead(self):
+        """已讀到預讀範圍的一半時，預讀下一段"""
+        if self._readahead <= 0:
+            return
+        if self.tell() + self._readahead // 2 >= self._prefetched_until:
+            start = max(self._prefetched_until, self.tell())
+            self._source.prefetch(start, self._readahead)
+            self._prefetched_until = start + self._readahead
+
+
+_sources: Dict[str, FileSource] = {}
+_source_refs: Dict[str, int] = {}
+_sources_lock = threading.Lock()
+
+
+def open_source(path: str) -> FileSource:
+    """
+    取得檔案的共用來源（同一個檔案的所有上傳共用同一個 mmap）
+
+    使用完畢必須呼叫 release_source()
+
+    Args:
+        path: 檔案路徑
+
+    Returns:
+        FileSource: 檔案來源
+    """
+    key = file_state_key(path)
+    with _sources_lock:
+        source = _sources.get(key)
+        if source is None:
+            source = FileSource(path)
+            _sources[key] = source
+            _source_refs[key] = 0
+        _source_refs[key] += 1
+        return source
+
+
+def release_source(source: FileSource):
+    """
+    釋放 open_source() 取得的來源，最後一個使用者釋放時關閉檔案
+
+    Args:
+        source: 檔案來源
+    """
+    with _sources_lock:
+        key = next((k for k, s in _sources.items() if s is source), None)
+        if key is None:
+            return
+        _source_refs[key] -= 1
+        if _source_refs[key] > 0:
+            return
+        del _sources[key]
+        del _source_refs[key]
+    source.close()
+
+
+@contextmanager
+def shared_source(path: str) -> Iterator[FileSource]:
+    """
+    以 with 取得並自動釋放共用的檔案來源
+
+    Args:
+        path: 檔案路徑
+
+    Yields:
+        FileSource: 檔案來源
+    """
+    source = open_source(path)
+    try:
+        yield source
+    finally:
+        release_source(source)
@@ -0,0 +1,124 @@
+"""
+影片內容指紋索引
+以檔案大小與開頭、結尾取樣的雜湊作為影片指紋，記錄各平台上傳後的影片 ID；
+開始批次前查詢，同一段錄影重複排入或忘記已上傳過時，不必再送出數 GB 的資料
+"""
+
+import hashlib
+import os
+import threading
+from typing import Dict
+
+from services.state_store import JsonStateStore, file_state_key
+
+
+FINGERPRINT_INDEX_PATH = "upload_fingerprints.json"
+# 指紋取樣檔案開頭與結尾各多少位元組
+FINGERPRINT_SAMPLE_SIZE = 4 * 1024 * 1024
+
+
+def sample_fingerprint(path: str, sample_size: int = FINGERPRINT_SAMPLE_SIZE) -> str:
+    """
+    計算影片指紋（檔案大小 + 開頭與結尾各 sample_size 位元組的 SHA-256）
+
+    只讀取兩段取樣，數 GB 的影片也能立即算出；重新輸出的影片大小或內容會不同
+
+    Args:
+        path: 檔案路徑
+        sample_size: 開頭與結尾各取樣的位元組數
+
+    Returns:
+        str: 指紋
+
+    Raises:
+        OSError: 檔案無法讀取
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode("ascii"))
+    with open(path, "rb") as f:
+        digest.update(f.read(sample_size))
+        if size > sample_size:
+            f.seek(max(sample_size, size - sample_size))
+            digest.update(f.read(sample_size))
+    return f"{size}:{digest.hexdigest()}"
+
+
+class FingerprintIndex:
+    """
+    指紋對應各平台影片 ID 的本地索引
+
+    記錄格式為 {指紋: {'title': 標題, 'youtube': 影片 ID, 'bilibili': bvid}}；
+    同一個檔案（路徑、大小與修改時間相同）的指紋只計算一次
+    """
+
+    def __init__(self, path: str = FINGERPRINT_INDEX_PATH):
+        """
+        初始化索引
+
+        Args:
+            path: 索引檔路徑
+        """
+        self.store = JsonStateStore(path)
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[str, str] = {}
+
+    def fingerprint(self, path: str) -> str:
+        """
+        取得檔案指紋
+
+        Args:
+            path: 檔案路徑
+
+        Returns:
+            str: 指紋
+
+        Raises:
+            OSError: 檔案無法讀取
+        """
+        key = file_state_key(path)
+        with self._lock:
+            fingerprint = self._fingerprints.get(key)
+        if fingerprint is None:
+            fingerprint = sample_fingerprint(path)
+            with self._lock:
+                self._fingerprints[key] = fingerprint
+        return fingerprint
+
+    def lookup(self, path: str) -> Dict[str, str]:
+        """
+        查詢檔案已上傳過的平台
+
+        Args:
+            path: 檔案路徑
+
+        Returns:
+            Dict[str, str]: 平台對應的影片 ID（沒有記錄或檔案無法讀取時為空）
+        """
+        try:
+            entry = self.store.get(self.fingerprint(path))
+        except OSError:
+            return {}
+        return {platform: value for platform, value in (entry or {}).items() if platform != 'title'}
+
+    def record(self, path: str, platform: str, video_id: str, title: str = ""):
+        """
+        記錄上傳完成的影片（檔案無法讀取時略過）
+
+        Args:
+            path: 檔案路徑
+            platform: 平台（'youtube' 或 'bilibili'）
+            video_id: 平台上的影片 ID
+            title: 影片標題（方便辨識索引檔的內容）
+        """
+        try:
+            fingerprint = self.fingerprint(path)
+        except OSError as e:
+            print(f"無法計算影片指紋，略過記錄: {str(e)}")
+            return
+        with self._lock:
+            entry = dict(self.store.get(fingerprint) or {})
+            entry[platform] = video_id
+            if title:
+                entry['title'] = title
+            self.store.set(fingerprint, entry)
+
@@ -0,0 +1,232 @@
+"""
+Google API 服務工廠
+以 googleapiclient 內附的靜態 discovery 文件建立 YouTube / Drive 服務（不連網下載），
+並依憑證快取建立好的服務，憑證更換時才重新建立；
+所有服務共用同一個保持連線（keep-alive）的 HTTP 連線池，TLS 連線可跨請求、跨 API 重複使用
+"""
+
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient import discovery
+from googleapiclient.http import build_http
+
+from services.stall_watchdog import current_transfer, shutdown_socket
+
+
+# 連線池最多保留的閒置 httplib2.Http 數量（超過的用完即丟）
+DEFAULT_MAX_IDLE = 8
+
+
+class HttpPool:
+    """
+    執行緒安全的 httplib2.Http 連線池
+
+    httplib2.Http 本身不是執行緒安全的，因此每個請求借出一個 Http 獨佔使用，
+    完成後歸還；Http 內保留的 keep-alive 連線由之後借用的請求繼續使用
+    """
+
+    def __init__(self, max_idle: int = DEFAULT_MAX_IDLE, http_factory=build_http):
+        """
+        初始化連線池
+
+        Args:
+            max_idle: 最多保留的閒置 Http 數量
+            http_factory: 建立 Http 的函式（預設與 googleapiclient 相同的逾時與 308 處理）
+        """
+        self.max_idle = max_idle
+        self._http_factory = http_factory
+        self._idle: Deque[httplib2.Http] = deque()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.requests = 0
+        self.reused = 0
+
+    @contextmanager
+    def connection(self) -> Iterator[httplib2.Http]:
+        """
+        借出一個 Http（with 結束時歸還）
+
+        Yields:
+            httplib2.Http: 這段期間由呼叫端獨佔
+        """
+        with self._lock:
+            http = self._idle.pop() if self._idle else None
+            if http is None:
+                self.created += 1
+        if http is None:
+            http = self._http_factory()
+        try:
+            yield http
+        finally:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    # 最近用過的放在最後，下次優先借出（連線最可能還活著）
+                    self._idle.append(http)
+                    http = None
+            if http is not None:
+                http.close()
+
+    def record_request(self, http: httplib2.Http, uri: str):
+        """
+        記錄一個即將送出的請求是否會沿用已開啟的連線
+
+        Args:
+            http: 借出的 Http
+            uri: 請求網址
+        """
+        scheme, authority, _, _ = httplib2.urlnorm(uri)
+        connection = http.connections.get(f"{scheme}:{authority}")
+        reused = connection is not None and getattr(connection, "sock", None) is not None
+        with self._lock:
+            self.requests += 1
+            if reused:
+                self.reused += 1
+
+    def stats(self) -> Dict[str, float]:
+        """
+        取得連線重用統計
+
+        Returns:
+            Dict[str, float]: 請求數、沿用既有連線的請求數、重用率與建立過的 Http 數量
+        """
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'reused': self.reused,
+                'reuse_ratio': self.reused / self.requests if self.requests else 0.0,
+                'created': self.created,
+            }
+
+    def close(self):
+        """關閉所有閒置的連線"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for http in idle:
+            http.close()
+
+
+class AuthorizedTransport:
+    """
+    以指定憑證授權、從共用連線池借用連線的 HTTP 傳輸
+
+    介面與 httplib2.Http.request 相同，可直接交給 googleapiclient 當作 http；
+    可以同時被多個工作執行緒使用
+    """
+
+    def __init__(self, credentials, pool: HttpPool):
+        """
+        初始化傳輸
+
+        Args:
+            credentials: google-auth 憑證（401 時由 AuthorizedHttp 自動刷新）
+            pool: 共用的連線池
+        """
+        self.credentials = credentials
+        self.pool = pool
+
+    def request(self, uri, method="GET", body=None, headers=None,
+                redirections=httplib2.DEFAULT_MAX_REDIRECTS, connection_type=None, **kwargs):
+        """
+        送出請求（參數與回傳值同 httplib2.Http.request）
+
+        在 StallWatchdog.watch 內送出時，傳輸停滯會關閉這個請求借用的連線
+        """
+        with self.pool.connection() as http:
+            self.pool.record_request(http, uri)
+            transfer = current_transfer()
+            if transfer is None:
+                return AuthorizedHttp(self.credentials, http=http).request(
+                    uri, method, body=body, headers=headers,
+                    redirections=redirections, connection_type=connection_type, **kwargs
+                )
+            with transfer.aborting(lambda: _shutdown_connections(http)):
+                return AuthorizedHttp(self.credentials, http=http).request(
+                    uri, method, body=body, headers=headers,
+                    redirections=redirections, connection_type=connection_type, **kwargs
+                )
+
+    def close(self):
+        """連線屬於共用的連線池，不在這裡關閉"""
+        pass
+
+
+def _shutdown_connections(http: httplib2.Http):
+    """中止 Http 的所有連線（由停滯監視執行緒呼叫，讓卡住的請求立即返回錯誤）"""
+    for connection in list(http.connections.values()):
+        shutdown_socket(getattr(connection, "sock", None))
+
+
+class GoogleServiceFactory:
+    """依 (API, 版本, 憑證) 快取 googleapiclient 服務，所有服務共用同一個連線池"""
+
+    def __init__(self, pool: Optional[HttpPool] = None):
+        """
+        初始化服務工廠
+
+        Args:
+            pool: 共用的連線池（None 表示建立新的）
+        """
+        self.pool = pool or HttpPool()
+        self._lock = threading.Lock()
+        self._services: Dict[Tuple[str, str], tuple] = {}
+        self.build_count = 0
+
+    def get(self, api: str, version: str, credentials):
+        """
+        取得服務（同一組憑證只建立一次，可跨執行緒共用）
+
+        Args:
+            api: API 名稱（例如 'youtube'、'drive'）
+            version: API 版本（例如 'v3'）
+            credentials: google-auth 憑證；與上次不同（重新認證或換新 token 檔）時重新建立
+
+        Returns:
+            googleapiclient 服務
+        """
+        with self._lock:
+            cached = self._services.get((api, version))
+            if cached is not None and cached[0] is credentials:
+                return cached[1]
+
+            service = discovery.build(
+                api, version,
+                http=AuthorizedTransport(credentials, self.pool),
+                static_discovery=True,
+                cache_discovery=False,
+            )
+            self._services[(api, version)] = (credentials, service)
+            self.build_count += 1
+            return service
+
+
+_factory = GoogleServiceFactory()
+
+
+def get_service(api: str, version: str, credentials):
+    """
+    從行程共用的服務工廠取得服務
+
+    Args:
+        api: API 名稱
+        version: API 版本
+        credentials: google-auth 憑證
+
+    Returns:
+        googleapiclient 服務
+    """
+    return _factory.get(api, version, credentials)
+
+
+def get_transport_stats() -> Dict[str, float]:
+    """
+    取得共用連線池的連線重用統計
+
+    Returns:
+        Dict[str, float]: 見 HttpPool.stats()
+    """
+    return _factory.pool.stats()
@@ -1,17 +1,22 @@
 from __future__ import print_function
 import pickle
 import os.path
-from googleapiclient.discovery import build
+import threading
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.http import MediaFileUpload
 
+from services.google_api import get_service
+
 # 如果修改這些範圍，請刪除token.pickle檔案
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
 google_drive_client_secret = 'token.json'
 temp_token = 'google_drive_token.pickle'
 replay_folder_id = '1ZJLoKqzxymZ9XUyYeOWmvZkeEwxTti-x'
 
+_creds = None
+_creds_lock = threading.Lock()
+
 
 def cut_string(input_string):
     index = input_string.find("【StarCraft II】")
@@ -19,25 +24,33 @@ def cut_string(input_string):
         return input_string[index:]
     return input_string
 
+def get_credentials():
+    global _creds
+    with _creds_lock:
+        # 沿用同一個憑證物件，服務工廠才能重複使用已建立的服務
+        if _creds and _creds.valid:
+            return _creds
+        creds = _creds
+        # token.pickle儲存使用者的存取權和重新整理權杖
+        if not creds and os.path.exists(temp_token):
+            with open(temp_token, 'rb') as token:
+                creds = pickle.load(token)
+        # 如果沒有可用的（有效的）憑證，讓使用者登入
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    google_drive_client_secret, SCOPES)
+                creds = flow.run_local_server(port=0)
+            # 儲存憑證以供下次執行使用
+            with open(temp_token, 'wb') as token:
+                pickle.dump(creds, token)
+        _creds = creds
+        return creds
+
 def upload_replay(filePath):
-    creds = None
-    # token.pickle儲存使用者的存取權和重新整理權杖
-    if os.path.exists(temp_token):
-        with open(temp_token, 'rb') as token:
-            creds = pickle.load(token)
-    # 如果沒有可用的（有效的）憑證，讓使用者登入
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(
-                google_drive_client_secret, SCOPES)
-            creds = flow.run_local_server(port=0)
-        # 儲存憑證以供下次執行使用
-        with open(temp_token, 'wb') as token:
-            pickle.dump(creds, token)
-
-    service = build('drive', 'v3', credentials=creds)
+    service = get_service('drive', 'v3', get_credentials())
 
     file_metadata = {'name': cut_string(filePath), 'parents': [replay_folder_id]}
     media = MediaFileUpload(filePath, resumable=True)
@@ -52,11 +65,13 @@ def upload_replay(filePath):
     service.permissions().create(fileId=file.get('id'), body=permission).execute()
 
     # 取得檔案URL
-    file_id = file.get('id')
-    file_url = f"https://drive.google.com/file/d/{file_id}/view?usp=sharing"
+    file_url = share_url(file.get('id'))
     print('File URL:', file_url)
     return file_url
 
+def share_url(file_id):
+    return f"https://drive.google.com/file/d/{file_id}/view?usp=sharing"
+
 
 if __name__ == '__main__':
     upload_replay("")
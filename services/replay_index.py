@@ -0,0 +1,176 @@
+"""
+Replay 內容索引
+以檔案內容的 MD5 對應 Google Drive 上已存在的 Replay 分享連結，保存在本地 JSON 檔；
+本地沒有記錄時才與 Drive 的 Replay 資料夾同步（第一次列出整個資料夾，之後只取變更），
+以 Drive 回報的 md5Checksum 找出內容相同的檔案，不必重新上傳
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from services import google_drive
+from services.google_api import get_service
+from services.state_store import JsonStateStore
+
+
+REPLAY_INDEX_PATH = "replay_index.json"
+# 同步進度（Drive changes API 的 page token）保存在索引檔中的 key；MD5 只有十六進位字元，不會衝突
+SYNC_TOKEN_KEY = "__drive_page_token__"
+# 每頁最多取得的檔案 / 變更數
+DRIVE_PAGE_SIZE = 1000
+
+
+def _drive_service():
+    """以 Google Drive 憑證取得共用的 Drive 服務"""
+    return get_service('drive', 'v3', google_drive.get_credentials())
+
+
+class ReplayIndex:
+    """
+    內容定址的 Replay 索引
+
+    本地記錄為 {md5: {'url': 分享連結}}；找不到時以 Drive changes API 增量同步資料夾，
+    其他電腦或其他影片剪輯上傳過的相同 Replay 也能找到
+    """
+
+    def __init__(self, path: str = REPLAY_INDEX_PATH,
+                 folder_id: str = google_drive.replay_folder_id,
+                 service_factory: Optional[Callable[[], Any]] = None):
+        """
+        初始化索引
+
+        Args:
+            path: 本地索引檔路徑
+            folder_id: Drive 上的 Replay 資料夾 ID
+            service_factory: 取得 Drive 服務的函式（None 表示使用 Google Drive 憑證建立）
+        """
+        self.store = JsonStateStore(path)
+        self.folder_id = folder_id
+        self._service_factory = service_factory or _drive_service
+        self._sync_lock = threading.Lock()
+
+    def lookup(self, md5: str) -> Optional[str]:
+        """
+        只查本地記錄
+
+        Args:
+            md5: 檔案內容的 MD5（十六進位）
+
+        Returns:
+            Optional[str]: 分享連結（沒有記錄時為 None）
+        """
+        entry = self.store.get(md5)
+        return entry.get('url') if entry else None
+
+    def find(self, md5: str) -> Optional[str]:
+        """
+        查本地記錄，沒有時與 Drive 同步後再查一次（同步失敗視為找不到）
+
+        Args:
+            md5: 檔案內容的 MD5（十六進位）
+
+        Returns:
+            Optional[str]: 分享連結（Drive 上也沒有時為 None）
+        """
+        url = self.lookup(md5)
+        if url:
+            return url
+        try:
+            self.sync()
+        except Exception as e:
+            print(f"同步 Replay 索引失敗: {str(e)}")
+            return None
+        return self.lookup(md5)
+
+    def record(self, md5: str, url: str):
+        """
+        記錄剛上傳的 Replay
+
+        Args:
+            md5: 檔案內容的 MD5（十六進位）
+            url: 分享連結
+        """
+        self.store.set(md5, {'url': url})
+
+    def sync(self):
+        """
+        與 Drive 資料夾同步
+
+        第一次同步時先取得 changes 的起始 page token 再列出整個資料夾
+        （列出期間的變更會在下次同步取得）；之後只從保存的 page token 取得變更
+        """
+        with self._sync_lock:
+            service = self._service_factory()
+            token = self.store.get(SYNC_TOKEN_KEY)
+            if token is None:
+                token = service.changes().getStartPageToken().execute()['startPageToken']
+                self._list_folder(service)
+            else:
+                token = self._apply_changes(service, token)
+            self.store.set(SYNC_TOKEN_KEY, token)
+
+    def _list_folder(self, service):
+        """
+        列出整個資料夾並記錄所有檔案
+
+        Args:
+            service: Drive 服務
+        """
+        entries: Dict[str, Dict[str, str]] = {}
+        page_token = None
+        while True:
+            response = service.files().list(
+                q=f"'{self.folder_id}' in parents and trashed = false",
+                fields="nextPageToken, files(id, md5Checksum)",
+                pageSize=DRIVE_PAGE_SIZE,
+                pageToken=page_token,
+            ).execute()
+            for file in response.get('files', []):
+                if file.get('md5Checksum'):
+                    entries[file['md5Checksum']] = {'url': google_drive.share_url(file['id'])}
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+        self.store.update(entries)
+
+    def _apply_changes(self, service, token: str) -> str:
+        """
+        套用保存的 page token 之後的變更
+
+        Args:
+            service: Drive 服務
+            token: 上次同步保存的 page token
+
+        Returns:
+            str: 下次同步使用的 page token
+        """
+        entries: Dict[str, Dict[str, str]] = {}
+        removed = set()
+        page_token = token
+        while page_token:
+            response = service.changes().list(
+                pageToken=page_token,
+                fields="nextPageToken, newStartPageToken, "
+                       "changes(fileId, removed, file(md5Checksum, parents, trashed))",
+                pageSize=DRIVE_PAGE_SIZE,
+            ).execute()
+            for change in response.get('changes', []):
+                file = change.get('file') or {}
+                url = google_drive.share_url(change['fileId'])
+                if (change.get('removed') or file.get('trashed')
+                        or self.folder_id not in file.get('parents', [])):
+                    removed.add(url)
+                    entries = {md5: e for md5, e in entries.items() if e['url'] != url}
+                elif file.get('md5Checksum'):
+                    removed.discard(url)
+                    entries[file['md5Checksum']] = {'url': url}
+            token = response.get('newStartPageToken', token)
+            page_token = response.get('nextPageToken')
+
+        if entries:
+            self.store.update(entries)
+        if removed:
+            for md5, entry in self.store.items().items():
+                if isinstance(entry, dict) and entry.get('url') in removed and md5 not in entries:
+                    self.store.delete(md5)
+        return token
@@ -0,0 +1,129 @@
+"""
+Replay 上傳服務
+YouTube 與 B站上傳共用：同一個 Replay（路徑與內容雜湊相同）只上傳到 Google Drive 一次，
+同時要求同一個 Replay 的呼叫端等待同一個進行中的上傳並取得同一個連結；
+有內容索引時，Drive 上已有相同內容的 Replay（例如同一場比賽的另一個剪輯）直接沿用其連結
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+
+from services import google_drive
+from services.replay_index import ReplayIndex
+
+
+# 計算雜湊時每次讀取的位元組數
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def replay_content_hash(path: str) -> str:
+    """
+    計算檔案內容的 MD5（與 Google Drive 回報的 md5Checksum 相同）
+
+    Args:
+        path: 檔案路徑
+
+    Returns:
+        str: 十六進位雜湊
+
+    Raises:
+        OSError: 檔案無法讀取
+    """
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ReplayService:
+    """
+    單一執行（single-flight）並記住結果的 Replay 上傳
+
+    以 (絕對路徑, 內容雜湊) 為 key：已上傳過的直接返回連結；正在上傳時後來的呼叫端
+    等待同一個上傳的結果；上傳失敗不記住，下一次呼叫會重新上傳。
+    需要上傳前先以內容雜湊查詢索引，上傳完成後記錄到索引
+    """
+
+    def __init__(self, upload_fn: Optional[Callable[[str], str]] = None,
+                 index: Optional[ReplayIndex] = None):
+        """
+        初始化服務
+
+        Args:
+            upload_fn: 實際上傳並返回分享連結的函式（None 表示 google_drive.upload_replay）
+            index: 內容索引（None 表示不查詢，一律上傳）
+        """
+        self._upload_fn = upload_fn
+        self.index = index
+        self._lock = threading.Lock()
+        self._urls: Dict[Tuple[str, str], str] = {}
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+        self.upload_count = 0
+
+    def get_url(self, replay_path: str) -> str:
+        """
+        取得 Replay 的分享連結，需要時才上傳
+
+        Args:
+            replay_path: Replay 檔案路徑
+
+        Returns:
+            str: Google Drive 分享連結
+
+        Raises:
+            OSError: Replay 無法讀取
+            Exception: 上傳失敗（等待同一個上傳的呼叫端收到相同的例外）
+        """
+        md5 = replay_content_hash(replay_path)
+        key = (os.path.abspath(replay_path), md5)
+        with self._lock:
+            url = self._urls.get(key)
+            if url:
+                return url
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            url = self.index.find(md5) if self.index is not None else None
+            if url:
+                print(f"Drive 上已有相同的 Replay: {url}")
+            else:
+                with self._lock:
+                    self.upload_count += 1
+                upload = self._upload_fn or google_drive.upload_replay
+                url = upload(replay_path)
+                if self.index is not None:
+                    self.index.record(md5, url)
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._urls[key] = url
+            del self._in_flight[key]
+        future.set_result(url)
+        return url
+
+
+_service = ReplayService(index=ReplayIndex())
+
+
+def get_replay_service() -> ReplayService:
+    """
+    取得行程共用的 Replay 上傳服務
+
+    Returns:
+        ReplayService: 共用服務
+    """
+    return _service
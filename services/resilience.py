@@ -0,0 +1,343 @@
+"""
+重試、限流與斷路器
+把失敗分成暫時性錯誤的類別（連線 / 逾時、伺服器 5xx、限流、配額用盡），每個類別各有重試額度，
+退避時間優先採用伺服器的 Retry-After；每個端點（youtube、bilibili、drive）一個斷路器，
+連續失敗時暫停呼叫該端點，不影響其他端點。
+較長的退避不在工作執行緒中等待：由任務相依圖的 RetryLater 在時間到時重新排入
+"""
+
+import http.client
+import json
+import random
+import threading
+import time
+from typing import Callable, Collection, Dict, Optional, TypeVar
+
+import httplib2
+import requests
+from googleapiclient.errors import HttpError
+
+from services.task_graph import RetryLater
+
+
+# 各類暫時性錯誤的重試額度（同一個任務內各自計算）
+RETRY_BUDGETS = {"timeout": 4, "server": 4, "throttled": 6, "quota": 2}
+# 退避從基準時間開始每次加倍（加上抖動），最長不超過上限
+RETRY_BASE_DELAY = 1.0
+THROTTLE_BASE_DELAY = 10.0
+RETRY_MAX_DELAY = 300.0
+# 配額用盡時至少等待的秒數（YouTube 配額每日重置，短時間內重試只會再被拒絕）
+QUOTA_RETRY_DELAY = 60 * 60
+# 退避不超過這個秒數時由上傳器在原執行緒等待（可被取消權杖中斷），更長的等待交給排程器
+INLINE_RETRY_LIMIT = 1.0
+
+# 表示限流的 HTTP 狀態碼
+THROTTLE_STATUSES = (429,)
+# Google API 403 錯誤中表示配額用盡 / 限流的 reason
+QUOTA_REASONS = ("quotaExceeded", "dailyLimitExceeded", "uploadLimitExceeded")
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+
+# 連續失敗幾次後斷路器開啟，開啟後多久允許一次試探呼叫
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 60.0
+# 半開狀態下試探呼叫尚未結束時，其他呼叫等待的秒數
+BREAKER_PROBE_WAIT = 5.0
+
+# 本地檔案錯誤：重試不會有不同結果
+_LOCAL_OS_ERRORS = (FileNotFoundError, FileExistsError, PermissionError, IsADirectoryError, NotADirectoryError)
+# requests 中屬於傳輸層的錯誤（其他 RequestException 是網址、參數等永久性錯誤）
+_REQUESTS_TRANSPORT_ERRORS = (requests.Timeout, requests.ConnectionError, requests.exceptions.ChunkedEncodingError)
+
+T = TypeVar("T")
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """取得例外帶的 HTTP 狀態碼（沒有時為 None）"""
+    if isinstance(exc, HttpError):
+        return exc.resp.status
+    response = getattr(exc, "response", None)
+    if isinstance(exc, requests.HTTPError) and response is not None:
+        return response.status_code
+    return getattr(exc, "status_code", None)
+
+
+def _google_error_reason(exc: HttpError) -> str:
+    """取得 Google API 錯誤的 reason（無法解析時為空字串）"""
+    try:
+        content = exc.content.decode("utf-8") if isinstance(exc.content, bytes) else exc.content
+        return json.loads(content)["error"]["errors"][0]["reason"]
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+        return ""
+
+
+def classify_error(exc: BaseException, throttle_statuses: Collection[int] = THROTTLE_STATUSES) -> Optional[str]:
+    """
+    判斷錯誤屬於哪一類暫時性錯誤
+
+    Args:
+        exc: 例外
+        throttle_statuses: 表示限流的 HTTP 狀態碼（各平台不同）
+
+    Returns:
+        Optional[str]: 'timeout'、'server'、'throttled' 或 'quota'；重試也不會成功的錯誤為 None
+    """
+    status = _status_code(exc)
+    if status is not None:
+        if isinstance(exc, HttpError) and status == 403:
+            reason = _google_error_reason(exc)
+            if reason in QUOTA_REASONS:
+                return "quota"
+            if reason in RATE_LIMIT_REASONS:
+                return "throttled"
+            return None
+        if status in throttle_statuses:
+            return "throttled"
+        if status >= 500:
+            return "server"
+        return None
+    if isinstance(exc, requests.RequestException):
+        return "timeout" if isinstance(exc, _REQUESTS_TRANSPORT_ERRORS) else None
+    if isinstance(exc, (httplib2.HttpLib2Error, http.client.HTTPException)):
+        return "timeout"
+    if isinstance(exc, OSError) and not isinstance(exc, _LOCAL_OS_ERRORS):
+        return "timeout"
+    return None
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """
+    取得伺服器要求的等待秒數（Retry-After）
+
+    Args:
+        exc: 例外
+
+    Returns:
+        Optional[float]: 秒數（伺服器沒有指定或不是數字時為 None）
+    """
+    value = getattr(exc, "retry_after", None)
+    if value is None:
+        if isinstance(exc, HttpError):
+            value = exc.resp.get("retry-after")
+        elif isinstance(exc, requests.HTTPError) and exc.response is not None:
+            value = exc.response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float,
+                  retry_after: Optional[float] = None) -> float:
+    """
+    計算第 attempt 次重試前的退避秒數
+
+    Args:
+        attempt: 第幾次重試（從 1 開始）
+        base_delay: 第一次重試的基準秒數
+        max_delay: 上限秒數
+        retry_after: 伺服器要求的等待秒數（優先採用）
+
+    Returns:
+        float: 秒數
+    """
+    if retry_after is not None:
+        return min(retry_after, max_delay)
+    backoff = min(max_delay, base_delay * 2 ** (attempt - 1))
+    # 等量抖動：保留一半的退避時間，另一半隨機，同時失敗的請求不會同時重試
+    return backoff / 2 + random.uniform(0, backoff / 2)
+
+
+class RetryBudget:
+    """
+    單一任務的重試額度
+
+    每類暫時性錯誤各自計算已重試的次數，額度用完或錯誤不是暫時性時不再重試
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None,
+                 throttle_statuses: Collection[int] = THROTTLE_STATUSES):
+        """
+        初始化重試額度
+
+        Args:
+            budgets: 各類錯誤的重試次數（None 表示使用 RETRY_BUDGETS）
+            throttle_statuses: 表示限流的 HTTP 狀態碼
+        """
+        self.budgets = dict(RETRY_BUDGETS if budgets is None else budgets)
+        self.throttle_statuses = throttle_statuses
+        self.used: Dict[str, int] = {}
+
+    def delay_for(self, exc: BaseException) -> Optional[float]:
+        """
+        記錄一次失敗並計算重試前的等待秒數
+
+        Args:
+            exc: 失敗的例外
+
+        Returns:
+            Optional[float]: 秒數；不應再重試時為 None
+        """
+        error_class = classify_error(exc, self.throttle_statuses)
+        if error_class is None:
+            return None
+        used = self.used[error_class] = self.used.get(error_class, 0) + 1
+        if used > self.budgets.get(error_class, 0):
+            return None
+        retry_after = retry_after_seconds(exc)
+        if error_class == "quota":
+            return max(retry_after or 0.0, QUOTA_RETRY_DELAY)
+        base = THROTTLE_BASE_DELAY if error_class == "throttled" else RETRY_BASE_DELAY
+        return backoff_delay(used, base, RETRY_MAX_DELAY, retry_after)
+
+    def reset(self):
+        """重新開始計算額度（例如整個任務稍後重新排入時）"""
+        self.used.clear()
+
+
+class CircuitOpenError(RuntimeError):
+    """端點的斷路器開啟中，暫時不呼叫該端點"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"{endpoint} 暫停使用中，{retry_in:.0f} 秒後再試")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    單一端點的斷路器
+
+    連續 failure_threshold 次暫時性失敗後開啟，開啟期間呼叫直接被拒絕；
+    reset_timeout 秒後進入半開狀態，只允許一次試探呼叫，成功則關閉、失敗則再次開啟
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        初始化斷路器
+
+        Args:
+            name: 端點名稱
+            failure_threshold: 開啟前允許的連續失敗次數
+            reset_timeout: 開啟後多久允許試探呼叫（秒）
+            clock: 單調時鐘（測試時可替換）
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._open_until = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """目前狀態（closed / open / half_open）"""
+        with self._lock:
+            if self._state == self.OPEN and self._clock() >= self._open_until:
+                return self.HALF_OPEN
+            return self._state
+
+    def check(self):
+        """
+        確認可以呼叫端點（半開時由第一個呼叫者試探）
+
+        Raises:
+            CircuitOpenError: 斷路器開啟中，或另一個試探呼叫尚未結束
+        """
+        with self._lock:
+            now = self._clock()
+            if self._state == self.OPEN:
+                if now < self._open_until:
+                    raise CircuitOpenError(self.name, self._open_until - now)
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError(self.name, BREAKER_PROBE_WAIT)
+                self._probing = True
+
+    def record_success(self):
+        """端點有回應（包含永久性錯誤）：關閉斷路器"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self, open_for: float = 0.0):
+        """
+        記錄一次暫時性失敗
+
+        Args:
+            open_for: 立即開啟至少這麼多秒（例如配額用盡時），0 表示依連續失敗次數決定
+        """
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold or open_for > 0:
+                self._state = self.OPEN
+                self._open_until = self._clock() + max(self.reset_timeout, open_for)
+                print(f"⚠️ {self.name} 連續失敗，暫停 {max(self.reset_timeout, open_for):.0f} 秒")
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    """
+    取得端點共用的斷路器
+
+    Args:
+        endpoint: 端點名稱
+
+    Returns:
+        CircuitBreaker: 斷路器
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+
+def call_endpoint(endpoint: str, fn: Callable[[], T], budget: RetryBudget) -> T:
+    """
+    經由端點的斷路器呼叫 fn，暫時性錯誤改為要求稍後重新執行
+
+    Args:
+        endpoint: 端點名稱
+        fn: 呼叫內容
+        budget: 呼叫所屬任務的重試額度
+
+    Returns:
+        T: fn 的回傳值
+
+    Raises:
+        CircuitOpenError: 斷路器開啟中，沒有呼叫 fn
+        RetryLater: 暫時性錯誤且額度未用完（由任務相依圖在退避時間後重新執行任務）
+        Exception: 永久性錯誤或額度已用完時拋出原本的例外
+    """
+    breaker = get_breaker(endpoint)
+    breaker.check()
+    try:
+        result = fn()
+    except Exception as e:
+        error_class = classify_error(e, budget.throttle_statuses)
+        if error_class is None:
+            breaker.record_success()
+            raise
+        delay = budget.delay_for(e)
+        breaker.record_failure(open_for=delay if error_class == "quota" and delay else 0.0)
+        if delay is None:
+            raise
+        raise RetryLater(delay, f"{endpoint} 暫時失敗（{error_class}）: {str(e)}") from e
+    breaker.record_success()
+    return result
@@ -0,0 +1,322 @@
+"""
+上傳資源管控
+所有上傳器共用的網路 / 磁碟讀取頻寬限制，避免上傳時影響同一台機器上的直播；
+以及整個行程共用的記憶體預算，平行上傳再多也不會讓記憶體無上限成長
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+# 等待配額時每次最多睡眠的秒數（讓限速調整與取消能快速生效）
+WAIT_SLICE_SECONDS = 0.25
+# 允許瞬間突發的秒數（以目前速率計算的位元組數）
+DEFAULT_BURST_SECONDS = 1.0
+# 預設的記憶體預算（分塊、封面編碼與傳送中的請求合計）
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+class TokenBucket:
+    """
+    執行緒安全的 token bucket
+
+    以「理論到達時間」排程，多個執行緒依申請先後輪流取得配額；
+    速率可在執行中調整，等待中的申請會依新的速率重新排程
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst_seconds: float = DEFAULT_BURST_SECONDS):
+        """
+        初始化 token bucket
+
+        Args:
+            rate: 每秒位元組數（None 表示不限速）
+            burst_seconds: 允許瞬間突發的秒數
+        """
+        self._lock = threading.Lock()
+        self._rate = rate
+        self._burst_seconds = burst_seconds
+        self._tat = time.monotonic()
+        self._generation = 0
+
+    @property
+    def rate(self) -> Optional[float]:
+        """每秒位元組數（None 表示不限速）"""
+        with self._lock:
+            return self._rate
+
+    def set_rate(self, rate: Optional[float]):
+        """
+        調整速率（立即對等待中的申請生效）
+
+        Args:
+            rate: 每秒位元組數，None 或 <= 0 表示不限速
+        """
+        with self._lock:
+            self._rate = rate if rate and rate > 0 else None
+            self._tat = time.monotonic()
+            self._generation += 1
+
+    def acquire(self, amount: int, cancel_token=None):
+        """
+        取得指定位元組數的配額，不足時阻塞等待
+
+        Args:
+            amount: 位元組數
+            cancel_token: 取消權杖（CancellationToken），等待期間可被中斷
+        """
+        while True:
+            with self._lock:
+                if self._rate is None or amount <= 0:
+                    return
+                generation = self._generation
+                now = time.monotonic()
+                tat = max(self._tat, now)
+                start_at = tat - self._burst_seconds
+                self._tat = tat + amount / self._rate
+
+            rescheduled = False
+            while not rescheduled:
+                remaining = start_at - time.monotonic()
+                if remaining <= 0:
+                    return
+                if cancel_token is not None:
+                    cancel_token.sleep(min(remaining, WAIT_SLICE_SECONDS))
+                else:
+                    time.sleep(min(remaining, WAIT_SLICE_SECONDS))
+                with self._lock:
+                    rescheduled = self._generation != generation
+
+
+class MemoryBudget:
+    """
+    執行緒安全的位元組預算
+
+    使用記憶體前先保留，用完歸還；預算用完時保留會阻塞，直到其他上傳歸還為止（背壓）。
+    單次保留超過總預算時只保留總預算，避免永遠等不到
+    """
+
+    def __init__(self, capacity: Optional[int] = DEFAULT_MEMORY_BUDGET):
+        """
+        初始化記憶體預算
+
+        Args:
+            capacity: 總位元組數（None 表示不限制）
+        """
+        self._condition = threading.Condition()
+        self._capacity = capacity
+        self._in_use = 0
+
+    @property
+    def capacity(self) -> Optional[int]:
+        """總位元組數（None 表示不限制）"""
+        with self._condition:
+            return self._capacity
+
+    @property
+    def in_use(self) -> int:
+        """目前已保留的位元組數"""
+        with self._condition:
+            return self._in_use
+
+    def set_capacity(self, capacity: Optional[int]):
+        """
+        調整總預算（放大時立即喚醒等待中的保留）
+
+        Args:
+            capacity: 總位元組數，None 或 <= 0 表示不限制
+        """
+        with self._condition:
+            self._capacity = capacity if capacity and capacity > 0 else None
+            self._condition.notify_all()
+
+    def acquire(self, amount: int, cancel_token=None) -> int:
+        """
+        保留指定位元組數，不足時阻塞等待
+
+        Args:
+            amount: 位元組數
+            cancel_token: 取消權杖（CancellationToken），等待期間可被中斷
+
+        Returns:
+            int: 實際保留的位元組數（歸還時傳給 release）
+        """
+        with self._condition:
+            while True:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                granted = amount if self._capacity is None else min(amount, self._capacity)
+                if self._capacity is None or self._in_use + granted <= self._capacity:
+                    self._in_use += granted
+                    return granted
+                self._condition.wait(WAIT_SLICE_SECONDS)
+
+    def release(self, amount: int):
+        """
+        歸還保留的位元組數
+
+        Args:
+            amount: acquire 回傳的位元組數
+        """
+        with self._condition:
+            self._in_use = max(0, self._in_use - amount)
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, amount: int, cancel_token=None) -> Iterator[int]:
+        """
+        以 with 保留並在離開時歸還
+
+        Args:
+            amount: 位元組數
+            cancel_token: 取消權杖
+
+        Yields:
+            int: 實際保留的位元組數
+        """
+        granted = self.acquire(amount, cancel_token)
+        try:
+            yield granted
+        finally:
+            self.release(granted)
+
+
+class ResourceGovernor:
+    """網路上傳與磁碟讀取各自獨立的頻寬預算，以及共用的記憶體預算"""
+
+    def __init__(self, network_rate: Optional[float] = None, disk_rate: Optional[float] = None,
+                 memory_limit: Optional[int] = None):
+        """
+        初始化資源管控
+
+        Args:
+            network_rate: 網路上傳每秒位元組數（None 表示不限速）
+            disk_rate: 磁碟讀取每秒位元組數（None 表示不限速）
+            memory_limit: 記憶體預算位元組數（None 表示不限制）
+        """
+        self.network = TokenBucket(network_rate)
+        self.disk = TokenBucket(disk_rate)
+        self.memory = MemoryBudget(memory_limit)
+
+    def set_limits(self, network_rate: Optional[float], disk_rate: Optional[float]):
+        """
+        調整限速（可在上傳中由 GUI 呼叫）
+
+        Args:
+            network_rate: 網路上傳每秒位元組數（None 表示不限速）
+            disk_rate: 磁碟讀取每秒位元組數（None 表示不限速）
+        """
+        self.network.set_rate(network_rate)
+        self.disk.set_rate(disk_rate)
+
+    def set_memory_limit(self, memory_limit: Optional[int]):
+        """
+        調整記憶體預算（可在上傳中由 GUI 呼叫）
+
+        Args:
+            memory_limit: 位元組數（None 表示不限制）
+        """
+        self.memory.set_capacity(memory_limit)
+
+    def acquire_network(self, amount: int, cancel_token=None):
+        """
+        送出資料前取得網路配額
+
+        Args:
+            amount: 位元組數
+            cancel_token: 取消權杖
+        """
+        self.network.acquire(amount, cancel_token)
+
+    def acquire_disk(self, amount: int, cancel_token=None):
+        """
+        讀取檔案前取得磁碟配額
+
+        Args:
+            amount: 位元組數
+            cancel_token: 取消權杖
+        """
+        self.disk.acquire(amount, cancel_token)
+
+    def reserve_memory(self, amount: int, cancel_token=None):
+        """
+        以 with 保留記憶體預算（讀取分塊、編碼封面或送出請求期間持有）
+
+        Args:
+            amount: 位元組數
+            cancel_token: 取消權杖
+
+        Returns:
+            上下文管理器，離開時歸還
+        """
+        return self.memory.reserve(amount, cancel_token)
+
+
+class GovernedReader:
+    """
+    讀取時才向資源管控取得配額的檔案物件包裝
+
+    作為 HTTP 請求的 body 交給傳送端，傳送端每讀一小段才扣一次配額，
+    因此限速會分散在整個請求之內，不會在請求開始時一次扣完後全速送出
+    """
+
+    def __init__(self, fileobj, governor: ResourceGovernor, cancel_token=None,
+                 charge_disk: bool = True):
+        """
+        初始化讀取包裝
+
+        Args:
+            fileobj: 被包裝的檔案物件（需支援 read / seek / tell）
+            governor: 資源管控
+            cancel_token: 取消權杖，等待配額期間可被中斷
+            charge_disk: 是否同時扣磁碟配額（資料已在記憶體中時為 False）
+        """
+        self._fileobj = fileobj
+        self._governor = governor
+        self._cancel_token = cancel_token
+        self._charge_disk = charge_disk
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        讀取資料，先取得磁碟配額，讀到的資料交出前再取得網路配額
+
+        Args:
+            size: 最多讀取的位元組數（負數表示讀到結尾）
+
+        Returns:
+            bytes: 讀到的資料
+        """
+        bounded = size is not None and size >= 0
+        if bounded and self._charge_disk:
+            self._governor.acquire_disk(size, self._cancel_token)
+        data = self._fileobj.read(size if bounded else -1)
+        if not bounded and self._charge_disk:
+            self._governor.acquire_disk(len(data), self._cancel_token)
+        self._governor.acquire_network(len(data), self._cancel_token)
+        return data
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        """移動讀取位置"""
+        return self._fileobj.seek(offset, whence)
+
+    def tell(self) -> int:
+        """目前讀取位置"""
+        return self._fileobj.tell()
+
+    def close(self):
+        """關閉被包裝的檔案物件"""
+        self._fileobj.close()
+
+
+_governor = ResourceGovernor(memory_limit=DEFAULT_MEMORY_BUDGET)
+
+
+def get_governor() -> ResourceGovernor:
+    """
+    取得所有上傳器共用的資源管控
+
+    Returns:
+        ResourceGovernor: 行程內唯一的資源管控
+    """
+    return _governor
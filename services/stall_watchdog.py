@@ -0,0 +1,447 @@
+"""
+傳輸停滯監視
+每個傳送中的請求登記為一個 Transfer，送出的位元組由 WatchedReader 在傳送端讀取 body 時回報；
+監視執行緒定期檢查，速率低於下限超過寬限時間、或超過依資料量與量測到的連線速度計算的逾時，
+就關閉該請求使用的連線（Wi-Fi 中斷或休眠後的半開連線會讓傳送卡住數分鐘）。
+中止後的請求拋出 StallError（屬於連線錯誤，由重試流程從伺服器確認的位置續傳）
+"""
+
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+# 送出資料的速率低於這個值（bytes/s）持續寬限時間即視為停滯
+STALL_RATE_FLOOR = 16 * 1024
+STALL_GRACE_SECONDS = 30.0
+# 監視執行緒檢查的間隔
+WATCHDOG_POLL_INTERVAL = 1.0
+# 單一請求的逾時 = 基本時間 + 安全倍數 × 資料量 / 連線速度，限制在上下限之間
+TRANSFER_TIMEOUT_BASE = 30.0
+TRANSFER_TIMEOUT_FACTOR = 4.0
+MIN_TRANSFER_TIMEOUT = 30.0
+MAX_TRANSFER_TIMEOUT = 30 * 60.0
+# 還沒有量測值時假設的連線速度
+DEFAULT_LINK_RATE = 256 * 1024
+# 量測連線速度的平滑係數，以及計入量測的最小請求大小（太小的請求主要是延遲）
+LINK_RATE_SMOOTHING = 0.3
+MIN_RATE_SAMPLE_BYTES = 256 * 1024
+
+_local = threading.local()
+
+
+class StallError(ConnectionError):
+    """傳輸停滯，連線已被監視執行緒中止"""
+
+
+def transfer_timeout(num_bytes: int, link_rate: Optional[float]) -> float:
+    """
+    計算送出 num_bytes 的請求的逾時
+
+    Args:
+        num_bytes: 請求的資料量
+        link_rate: 量測到的連線速度（bytes/s，None 表示使用 DEFAULT_LINK_RATE）
+
+    Returns:
+        float: 秒數
+    """
+    rate = link_rate if link_rate and link_rate > 0 else DEFAULT_LINK_RATE
+    timeout = TRANSFER_TIMEOUT_BASE + TRANSFER_TIMEOUT_FACTOR * max(0, num_bytes) / rate
+    return min(MAX_TRANSFER_TIMEOUT, max(MIN_TRANSFER_TIMEOUT, timeout))
+
+
+def current_transfer() -> Optional["Transfer"]:
+    """目前執行緒正在監視中的傳輸（沒有時為 None）"""
+    return getattr(_local, "transfer", None)
+
+
+def shutdown_socket(sock):
+    """
+    中止 socket 的收送（另一個執行緒卡在 send / recv 時會立即返回錯誤）
+
+    Args:
+        sock: socket（None 時略過）
+    """
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class Transfer:
+    """
+    單一請求的傳輸狀態
+
+    時間以「有效時間」計算：讀取 body 期間（例如等待頻寬配額或讀取磁碟）暫停計時，
+    限速造成的等待不會被當成停滯
+    """
+
+    def __init__(self, name: str, num_bytes: int, timeout: float, grace: float,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        初始化傳輸狀態
+
+        Args:
+            name: 傳輸所屬的端點（量測連線速度的 key）
+            num_bytes: 預計送出的位元組數
+            timeout: 逾時秒數（有效時間）
+            grace: 速率檢查的視窗秒數
+            clock: 單調時鐘
+        """
+        self.name = name
+        self.num_bytes = num_bytes
+        self.timeout = timeout
+        self.grace = grace
+        self.bytes_sent = 0
+        self.stalled = False
+        self.reason = ""
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._started = clock()
+        self._paused_since: Optional[float] = None
+        self._paused_total = 0.0
+        self._body_sent = False
+        self._aborts: List[Callable[[], None]] = []
+        # (有效時間, 累計位元組)，只保留速率視窗內與視窗起點前的最後一筆
+        self._samples: Deque[Tuple[float, int]] = deque([(0.0, 0)])
+
+    def _active(self, now: float) -> float:
+        """有效時間（呼叫端需持有鎖）"""
+        paused = self._paused_total
+        if self._paused_since is not None:
+            paused += now - self._paused_since
+        return now - self._started - paused
+
+    @property
+    def active_seconds(self) -> float:
+        """到目前為止的有效時間"""
+        with self._lock:
+            return self._active(self._clock())
+
+    def pause(self):
+        """暫停計時（讀取 body 的資料期間）"""
+        with self._lock:
+            if self._paused_since is None:
+                self._paused_since = self._clock()
+
+    def resume(self, num_bytes: int):
+        """
+        恢復計時並記錄交給傳送端的位元組
+
+        Args:
+            num_bytes: 這次讀出的位元組數（0 表示 body 已讀完）
+        """
+        with self._lock:
+            now = self._clock()
+            if self._paused_since is not None:
+                self._paused_total += now - self._paused_since
+                self._paused_since = None
+            self.bytes_sent += num_bytes
+            if num_bytes == 0 or self.bytes_sent >= self.num_bytes:
+                # body 已全部交出，接下來只等回應，由逾時把關
+                self._body_sent = True
+            active = self._active(now)
+            self._samples.append((active, self.bytes_sent))
+            while len(self._samples) > 1 and self._samples[1][0] <= active - self.grace:
+                self._samples.popleft()
+
+    @contextmanager
+    def aborting(self, callback: Callable[[], None]) -> Iterator[None]:
+        """
+        在 with 區塊內停滯時執行中止動作（通常是關閉這個請求使用的連線）
+
+        區塊結束後連線可能被其他請求借用，因此中止動作只在區塊內有效
+
+        Args:
+            callback: 中止動作
+
+        Raises:
+            StallError: 傳輸已被中止（不再送出新的請求）
+        """
+        with self._lock:
+            if self.stalled:
+                raise StallError(f"{self.name} 傳輸已因停滯中止（{self.reason}）")
+            self._aborts.append(callback)
+        try:
+            yield
+        finally:
+            with self._lock:
+                if callback in self._aborts:
+                    self._aborts.remove(callback)
+
+    def stall_reason(self, rate_floor: float) -> Optional[str]:
+        """
+        檢查是否停滯
+
+        Args:
+            rate_floor: 速率下限（bytes/s）
+
+        Returns:
+            Optional[str]: 停滯的原因（沒有停滯時為 None）
+        """
+        with self._lock:
+            if self.stalled or self._paused_since is not None:
+                return None
+            active = self._active(self._clock())
+            if active > self.timeout:
+                return f"超過 {self.timeout:.0f} 秒仍未完成"
+            if self._body_sent or active < self.grace:
+                return None
+            window_start = active - self.grace
+            sent_before = next(
+                (sent for at, sent in reversed(self._samples) if at <= window_start), 0
+            )
+            rate = (self.bytes_sent - sent_before) / self.grace
+            if rate < rate_floor:
+                return f"最近 {self.grace:.0f} 秒只送出 {rate / 1024:.1f} KB/s"
+            return None
+
+    def abort(self, reason: str):
+        """
+        標記停滯並執行中止動作
+
+        Args:
+            reason: 停滯的原因
+        """
+        with self._lock:
+            if self.stalled:
+                return
+            self.stalled = True
+            self.reason = reason
+            aborts, self._aborts = self._aborts, []
+        for callback in aborts:
+            try:
+                callback()
+            except Exception as e:
+                print(f"中止停滯的連線失敗: {str(e)}")
+
+
+class WatchedReader:
+    """
+    回報讀取進度給目前執行緒的 Transfer 的檔案物件包裝
+
+    作為請求 body 交給傳送端時，每讀一段代表前一段已送進 socket；
+    沒有監視中的傳輸時直接讀取
+    """
+
+    def __init__(self, fileobj):
+        """
+        初始化讀取包裝
+
+        Args:
+            fileobj: 被包裝的檔案物件（需支援 read / seek / tell）
+        """
+        self._fileobj = fileobj
+
+    def read(self, size: int = -1):
+        """讀取資料（讀取期間暫停傳輸計時）"""
+        transfer = current_transfer()
+        if transfer is None:
+            return self._fileobj.read(size)
+        transfer.pause()
+        data = b""
+        try:
+            data = self._fileobj.read(size)
+        finally:
+            transfer.resume(len(data))
+        return data
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        """移動讀取位置"""
+        return self._fileobj.seek(offset, whence)
+
+    def tell(self) -> int:
+        """目前讀取位置"""
+        return self._fileobj.tell()
+
+    def close(self):
+        """關閉被包裝的檔案物件"""
+        self._fileobj.close()
+
+
+class _WatchedPoolMixin:
+    """送出請求期間讓目前執行緒的 Transfer 可以關閉使用中的連線"""
+
+    def _make_request(self, conn, *args, **kwargs):
+        transfer = current_transfer()
+        if transfer is None:
+            return super()._make_request(conn, *args, **kwargs)
+        with transfer.aborting(lambda: shutdown_socket(getattr(conn, "sock", None))):
+            return super()._make_request(conn, *args, **kwargs)
+
+
+class _WatchedHTTPConnectionPool(_WatchedPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _WatchedHTTPSConnectionPool(_WatchedPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class WatchedHTTPAdapter(HTTPAdapter):
+    """requests 的連線配接器：在 StallWatchdog.watch 內送出的請求停滯時會被中止"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _WatchedHTTPConnectionPool,
+            "https": _WatchedHTTPSConnectionPool,
+        }
+
+
+class StallWatchdog:
+    """
+    監視所有傳送中的請求，中止停滯的連線
+
+    監視執行緒在有傳輸時才執行；各端點的連線速度由完成的請求量測，用來計算之後請求的逾時
+    """
+
+    def __init__(self, rate_floor: float = STALL_RATE_FLOOR, grace: float = STALL_GRACE_SECONDS,
+                 poll_interval: float = WATCHDOG_POLL_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        初始化監視
+
+        Args:
+            rate_floor: 速率下限（bytes/s）
+            grace: 速率低於下限多久視為停滯（秒）
+            poll_interval: 檢查間隔（秒）
+            clock: 單調時鐘（測試時可替換）
+        """
+        self.rate_floor = rate_floor
+        self.grace = grace
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._transfers: List[Transfer] = []
+        self._link_rates: Dict[str, float] = {}
+        self._thread: Optional[threading.Thread] = None
+        # 只用來等待檢查間隔（不會被設定）
+        self._idle = threading.Event()
+        self.aborted = 0
+
+    def link_rate(self, name: str) -> Optional[float]:
+        """
+        取得端點量測到的連線速度
+
+        Args:
+            name: 端點
+
+        Returns:
+            Optional[float]: bytes/s（還沒有量測值時為 None）
+        """
+        with self._lock:
+            return self._link_rates.get(name)
+
+    def timeout_for(self, name: str, num_bytes: int) -> float:
+        """
+        依資料量與端點的連線速度計算請求逾時
+
+        Args:
+            name: 端點
+            num_bytes: 資料量
+
+        Returns:
+            float: 秒數
+        """
+        return transfer_timeout(num_bytes, self.link_rate(name))
+
+    @contextmanager
+    def watch(self, name: str, num_bytes: int) -> Iterator[Transfer]:
+        """
+        在 with 區塊內監視目前執行緒送出的請求
+
+        Args:
+            name: 端點
+            num_bytes: 預計送出的位元組數
+
+        Yields:
+            Transfer: 傳輸狀態（timeout 可作為請求本身的 socket 逾時）
+
+        Raises:
+            StallError: 請求因停滯被中止
+        """
+        transfer = Transfer(name, num_bytes, self.timeout_for(name, num_bytes), self.grace, self._clock)
+        previous = current_transfer()
+        _local.transfer = transfer
+        with self._lock:
+            self._transfers.append(transfer)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stall-watchdog", daemon=True)
+                self._thread.start()
+        try:
+            yield transfer
+        except Exception as e:
+            if transfer.stalled:
+                raise StallError(f"{name} 傳輸停滯（{transfer.reason}），已中止連線") from e
+            raise
+        else:
+            self._record_rate(transfer)
+        finally:
+            _local.transfer = previous
+            with self._lock:
+                self._transfers.remove(transfer)
+
+    def check(self) -> List[Transfer]:
+        """
+        檢查所有傳輸並中止停滯的連線
+
+        Returns:
+            List[Transfer]: 這次中止的傳輸
+        """
+        with self._lock:
+            transfers = list(self._transfers)
+        stalled = []
+        for transfer in transfers:
+            reason = transfer.stall_reason(self.rate_floor)
+            if reason is None:
+                continue
+            print(f"⚠️ {transfer.name} 傳輸停滯（{reason}），中止連線後重新連線")
+            transfer.abort(reason)
+            stalled.append(transfer)
+        with self._lock:
+            self.aborted += len(stalled)
+        return stalled
+
+    def _record_rate(self, transfer: Transfer):
+        """以完成的請求更新端點的連線速度"""
+        active = transfer.active_seconds
+        if transfer.bytes_sent < MIN_RATE_SAMPLE_BYTES or active <= 0:
+            return
+        rate = transfer.bytes_sent / active
+        with self._lock:
+            previous = self._link_rates.get(transfer.name)
+            self._link_rates[transfer.name] = (
+                rate if previous is None else previous + LINK_RATE_SMOOTHING * (rate - previous)
+            )
+
+    def _run(self):
+        """監視執行緒：定期檢查，沒有傳輸時結束"""
+        while True:
+            self._idle.wait(self.poll_interval)
+            with self._lock:
+                if not self._transfers:
+                    self._thread = None
+                    return
+            self.check()
+
+
+_watchdog = StallWatchdog()
+
+
+def get_watchdog() -> StallWatchdog:
+    """
+    取得所有上傳器共用的停滯監視
+
+    Returns:
+        StallWatchdog: 行程內唯一的停滯監視
+    """
+    return _watchdog
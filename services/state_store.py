@@ -0,0 +1,119 @@
+"""
+本地 JSON 狀態檔
+提供上傳流程在程式重啟後仍需保留的狀態（續傳紀錄等）的簡單持久化
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+
+def file_state_key(path: str) -> str:
+    """
+    以檔案路徑、大小與修改時間組成狀態 key
+
+    檔案被覆寫或重新輸出後 key 會改變，避免沿用過期的續傳狀態
+
+    Args:
+        path: 檔案路徑
+
+    Returns:
+        str: 狀態 key
+    """
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+class JsonStateStore:
+    """執行緒安全的 key-value JSON 檔案"""
+
+    def __init__(self, path: str):
+        """
+        初始化狀態檔
+
+        Args:
+            path: JSON 檔案路徑（第一次寫入時才會建立）
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        讀取指定 key 的值
+
+        Args:
+            key: 狀態 key
+            default: key 不存在時的預設值
+
+        Returns:
+            Any: 儲存的值
+        """
+        with self._lock:
+            return self._load().get(key, default)
+
+    def set(self, key: str, value: Any):
+        """
+        寫入指定 key 的值並立即存檔
+
+        Args:
+            key: 狀態 key
+            value: 可序列化為 JSON 的值
+        """
+        with self._lock:
+            self._load()[key] = value
+            self._save()
+
+    def update(self, values: Dict[str, Any]):
+        """
+        一次寫入多個 key 並只存檔一次
+
+        Args:
+            values: key 對應的值
+        """
+        with self._lock:
+            self._load().update(values)
+            self._save()
+
+    def delete(self, key: str):
+        """
+        刪除指定 key 並立即存檔
+
+        Args:
+            key: 狀態 key
+        """
+        with self._lock:
+            data = self._load()
+            if key in data:
+                del data[key]
+                self._save()
+
+    def items(self) -> Dict[str, Any]:
+        """
+        取得所有狀態的複本
+
+        Returns:
+            Dict[str, Any]: key 對應的值
+        """
+        with self._lock:
+            return dict(self._load())
+
+    def _load(self) -> Dict[str, Any]:
+        """載入狀態檔（只在第一次存取時讀檔）"""
+        if self._data is None:
+            self._data = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._data = json.load(f)
+                except Exception as e:
+                    print(f"載入 {self.path} 失敗，將重新建立: {str(e)}")
+        return self._data
+
+    def _save(self):
+        """以暫存檔 + 取代的方式寫入，程式中斷時不會留下寫到一半的檔案"""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
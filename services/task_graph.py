@@ -0,0 +1,366 @@
+"""
+任務相依圖執行器
+每個任務宣告所屬的階段與相依的任務，相依的任務都成功後才會執行；
+各階段有各自的並行上限，讓慢的位元組傳輸與較快的 metadata 步驟互相重疊；
+任務可以拋出 RetryLater 讓出工作執行緒，時間到時再重新排入
+"""
+
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Collection, Dict, Hashable, List, Optional, Tuple
+
+
+class TaskState(Enum):
+    """任務狀態"""
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    SKIPPED = "skipped"  # 相依的任務失敗或整個圖被取消，沒有執行
+
+
+class RetryLater(Exception):
+    """任務暫時無法完成：拋出後任務讓出工作執行緒與階段名額，delay 秒後重新排入所屬階段"""
+
+    def __init__(self, delay: float, message: str = ""):
+        super().__init__(message or f"{delay:.0f} 秒後重試")
+        self.delay = max(0.0, delay)
+
+
+@dataclass
+class Task:
+    """相依圖中的一個任務"""
+    key: Hashable
+    stage: str
+    fn: Callable[[], Any]
+    deps: Tuple[Hashable, ...] = ()
+    group: Hashable = None
+    state: TaskState = TaskState.PENDING
+    result: Any = None
+    error: Optional[BaseException] = None
+    order: int = 0
+    # 拋出 RetryLater 後重新排入的次數
+    retries: int = 0
+    dependents: List[Hashable] = field(default_factory=list)
+
+    @property
+    def is_finished(self) -> bool:
+        """是否已經結束（成功、失敗或略過）"""
+        return self.state in (TaskState.SUCCEEDED, TaskState.FAILED, TaskState.SKIPPED)
+
+
+class TaskGraphExecutor:
+    """
+    依相依關係與階段並行上限執行任務
+
+    任務依加入的先後排隊，同一階段有空位時先加入的先執行；
+    ordered_stages 中的階段嚴格依加入順序開始（前面的任務尚未可執行時後面的任務也等待；
+    等待重試的任務已經開始過，不會擋住後面的任務）。
+    任務失敗時所有直接或間接相依它的任務都會被略過；
+    任務拋出 RetryLater 時回到待執行，等待期間不佔用工作執行緒，由單一排程執行緒在時間到時排入。
+    同一個 group 的任務全部結束時呼叫 on_group_done(group, {key: Task})
+    """
+
+    def __init__(self, stage_limits: Dict[str, int],
+                 on_group_done: Optional[Callable[[Hashable, Dict[Hashable, Task]], None]] = None,
+                 ordered_stages: Collection[str] = (),
+                 thread_name_prefix: str = "task"):
+        """
+        初始化執行器
+
+        Args:
+            stage_limits: 各階段同時執行的任務數上限
+            on_group_done: group 的所有任務結束時的回呼（在工作執行緒或呼叫 cancel 的執行緒中執行）
+            ordered_stages: 必須依加入順序開始的階段
+            thread_name_prefix: 工作執行緒名稱前綴
+        """
+        self.stage_limits = {stage: max(1, limit) for stage, limit in stage_limits.items()}
+        self.on_group_done = on_group_done
+        self.ordered_stages = set(ordered_stages)
+        self._thread_name_prefix = thread_name_prefix
+
+        self._lock = threading.Lock()
+        self._tasks: Dict[Hashable, Task] = {}
+        self._groups: Dict[Hashable, List[Hashable]] = {}
+        self._ready: Dict[str, List[Tuple[int, Hashable]]] = {stage: [] for stage in self.stage_limits}
+        self._running: Dict[str, int] = {stage: 0 for stage in self.stage_limits}
+        # 各階段所有尚未開始的任務（依加入順序），用來維持 ordered_stages 的順序
+        self._not_started: Dict[str, List[Tuple[int, Hashable]]] = {stage: [] for stage in self.stage_limits}
+        self._unfinished = 0
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # 等待重試的任務 (可重新排入的 monotonic 時間, 加入順序, key) 與負責排入的執行緒
+        self._deferred: List[Tuple[float, int, Hashable]] = []
+        self._deferred_changed = threading.Condition(self._lock)
+        self._scheduler: Optional[threading.Thread] = None
+        self._cancelled = False
+        self._done = threading.Event()
+
+    def add(self, key: Hashable, stage: str, fn: Callable[[], Any],
+            deps: Tuple[Hashable, ...] = (), group: Hashable = None) -> Task:
+        """
+        加入任務（需在 start 之前，相依的任務必須先加入）
+
+        Args:
+            key: 任務 key（整個圖中唯一）
+            stage: 階段名稱（必須在 stage_limits 中）
+            fn: 任務內容，拋出例外表示失敗
+            deps: 相依的任務 key
+            group: 任務所屬的群組（例如同一部影片）
+
+        Returns:
+            Task: 加入的任務
+
+        Raises:
+            ValueError: key 重複、階段或相依任務不存在
+        """
+        with self._lock:
+            if self._pool is not None:
+                raise ValueError("執行器已開始，無法再加入任務")
+            if key in self._tasks:
+                raise ValueError(f"任務重複: {key}")
+            if stage not in self.stage_limits:
+                raise ValueError(f"未知的階段: {stage}")
+            missing = [dep for dep in deps if dep not in self._tasks]
+            if missing:
+                raise ValueError(f"相依的任務不存在: {missing}")
+
+            task = Task(key=key, stage=stage, fn=fn, deps=tuple(deps), group=group, order=len(self._tasks))
+            self._tasks[key] = task
+            self._groups.setdefault(group, []).append(key)
+            heapq.heappush(self._not_started[stage], (task.order, key))
+            for dep in task.deps:
+                self._tasks[dep].dependents.append(key)
+            self._unfinished += 1
+            return task
+
+    def start(self):
+        """開始執行（立即返回）"""
+        with self._lock:
+            self._pool = ThreadPoolExecutor(
+                max_workers=sum(self.stage_limits.values()),
+                thread_name_prefix=self._thread_name_prefix,
+            )
+            for task in self._tasks.values():
+                if not task.deps:
+                    heapq.heappush(self._ready[task.stage], (task.order, task.key))
+            self._dispatch()
+            finished = self._unfinished == 0
+        if finished:
+            self._finish()
+
+    def cancel(self):
+        """取消：不再開始新的任務，尚未開始的任務全部略過（執行中的任務由任務自己的取消機制結束）"""
+        with self._lock:
+            self._cancelled = True
+            completed_groups = []
+            for task in self._tasks.values():
+                if task.state == TaskState.PENDING:
+                    completed_groups += self._mark_skipped(task)
+            for ready in self._ready.values():
+                ready.clear()
+            self._deferred.clear()
+            self._deferred_changed.notify_all()
+            finished = self._unfinished == 0
+        self._notify_groups(completed_groups)
+        if finished:
+            self._finish()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待所有任務結束
+
+        Args:
+            timeout: 等待秒數上限
+
+        Returns:
+            bool: 是否全部結束
+        """
+        return self._done.wait(timeout)
+
+    @property
+    def is_cancelled(self) -> bool:
+        """是否已被取消"""
+        with self._lock:
+            return self._cancelled
+
+    def tasks_in(self, group: Hashable) -> Dict[Hashable, Task]:
+        """
+        取得群組內的任務
+
+        Args:
+            group: 群組
+
+        Returns:
+            Dict[Hashable, Task]: 任務 key 對應的任務
+        """
+        with self._lock:
+            return {key: self._tasks[key] for key in self._groups.get(group, [])}
+
+    def _dispatch(self):
+        """在各階段的空位中開始可執行的任務（呼叫端需持有鎖）"""
+        for stage, ready in self._ready.items():
+            not_started = self._not_started[stage]
+            while ready and self._running[stage] < self.stage_limits[stage]:
+                while not_started and (self._tasks[not_started[0][1]].state != TaskState.PENDING
+                                       or self._tasks[not_started[0][1]].retries):
+                    heapq.heappop(not_started)
+                if (stage in self.ordered_stages and not self._tasks[ready[0][1]].retries
+                        and ready[0] != not_started[0]):
+                    # 更早加入的任務還在等相依的任務
+                    break
+                _, key = heapq.heappop(ready)
+                task = self._tasks[key]
+                task.state = TaskState.RUNNING
+                self._running[stage] += 1
+                self._pool.submit(self._run, task)
+
+    def _run(self, task: Task):
+        """
+        在工作執行緒中執行任務
+
+        Args:
+            task: 任務
+        """
+        try:
+            result = task.fn()
+        except RetryLater as e:
+            self._on_task_deferred(task, e.delay)
+        except BaseException as e:
+            self._on_task_finished(task, None, e)
+        else:
+            self._on_task_finished(task, result, None)
+
+    def _on_task_finished(self, task: Task, result: Any, error: Optional[BaseException]):
+        """
+        記錄任務結果，排入已滿足相依的任務或略過失敗任務的下游
+
+        Args:
+            task: 任務
+            result: 回傳值
+            error: 例外（None 表示成功）
+        """
+        with self._lock:
+            self._running[task.stage] -= 1
+            task.result = result
+            task.error = error
+            task.state = TaskState.SUCCEEDED if error is None else TaskState.FAILED
+            self._unfinished -= 1
+            completed_groups = self._group_if_complete(task.group)
+
+            for key in task.dependents:
+                dependent = self._tasks[key]
+                if dependent.state != TaskState.PENDING:
+                    continue
+                if error is not None or self._cancelled:
+                    completed_groups += self._mark_skipped(dependent)
+                elif all(self._tasks[dep].state == TaskState.SUCCEEDED for dep in dependent.deps):
+                    heapq.heappush(self._ready[dependent.stage], (dependent.order, key))
+
+            if not self._cancelled:
+                self._dispatch()
+            finished = self._unfinished == 0
+
+        self._notify_groups(completed_groups)
+        if finished:
+            self._finish()
+
+    def _on_task_deferred(self, task: Task, delay: float):
+        """
+        任務要求稍後重試：釋放階段名額，delay 秒後由排程執行緒重新排入（已取消時略過）
+
+        Args:
+            task: 任務
+            delay: 等待秒數
+        """
+        with self._lock:
+            self._running[task.stage] -= 1
+            task.state = TaskState.PENDING
+            task.retries += 1
+            if self._cancelled:
+                completed_groups = self._mark_skipped(task)
+            else:
+                completed_groups = []
+                heapq.heappush(self._deferred, (time.monotonic() + delay, task.order, task.key))
+                self._deferred_changed.notify_all()
+                if self._scheduler is None:
+                    self._scheduler = threading.Thread(
+                        target=self._schedule_deferred, name=f"{self._thread_name_prefix}-retry", daemon=True
+                    )
+                    self._scheduler.start()
+                self._dispatch()
+            finished = self._unfinished == 0
+
+        self._notify_groups(completed_groups)
+        if finished:
+            self._finish()
+
+    def _schedule_deferred(self):
+        """排程執行緒：等待重試的任務時間到時排入所屬階段，沒有等待中的任務時結束"""
+        with self._lock:
+            while self._deferred:
+                due, order, key = self._deferred[0]
+                remaining = due - time.monotonic()
+                if remaining > 0:
+                    self._deferred_changed.wait(remaining)
+                    continue
+                heapq.heappop(self._deferred)
+                task = self._tasks[key]
+                if task.state == TaskState.PENDING and not self._cancelled:
+                    heapq.heappush(self._ready[task.stage], (order, key))
+                    self._dispatch()
+            self._scheduler = None
+
+    def _mark_skipped(self, task: Task) -> List[Hashable]:
+        """
+        略過任務與所有下游任務（呼叫端需持有鎖）
+
+        Args:
+            task: 任務
+
+        Returns:
+            List[Hashable]: 因此全部結束的群組
+        """
+        completed_groups = []
+        pending = [task]
+        while pending:
+            current = pending.pop()
+            if current.state != TaskState.PENDING:
+                continue
+            current.state = TaskState.SKIPPED
+            self._unfinished -= 1
+            completed_groups += self._group_if_complete(current.group)
+            pending.extend(self._tasks[key] for key in current.dependents)
+        return completed_groups
+
+    def _group_if_complete(self, group: Hashable) -> List[Hashable]:
+        """群組的任務是否全部結束（呼叫端需持有鎖），是則返回 [group]"""
+        if all(self._tasks[key].is_finished for key in self._groups[group]):
+            return [group]
+        return []
+
+    def _notify_groups(self, groups: List[Hashable]):
+        """
+        呼叫群組完成的回呼
+
+        Args:
+            groups: 全部結束的群組
+        """
+        if self.on_group_done is None:
+            return
+        for group in groups:
+            try:
+                self.on_group_done(group, self.tasks_in(group))
+            except Exception as e:
+                print(f"任務群組完成回呼失敗: {str(e)}")
+
+    def _finish(self):
+        """所有任務結束：關閉執行緒池並喚醒等待者"""
+        with self._lock:
+            pool = self._pool
+        if pool is not None:
+            pool.shutdown(wait=False)
+        self._done.set()
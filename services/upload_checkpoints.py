@@ -0,0 +1,87 @@
+"""
+上傳步驟檢查點
+每次步驟狀態改變時以影片檔案為 key 保存各平台已完成的步驟；
+程式重啟後重新加入同一個檔案，只重試未完成的步驟，不必重新上傳影片
+"""
+
+from typing import Optional
+
+from services.state_store import JsonStateStore, file_state_key
+from video_item import VideoItem
+
+
+UPLOAD_CHECKPOINTS_PATH = "upload_checkpoints.json"
+
+
+class UploadCheckpoints:
+    """
+    影片檔案對應上傳步驟狀態的本地紀錄
+
+    key 為檔案路徑、大小與修改時間，檔案重新輸出後不會沿用舊的檢查點
+    """
+
+    def __init__(self, path: str = UPLOAD_CHECKPOINTS_PATH):
+        """
+        初始化檢查點紀錄
+
+        Args:
+            path: 紀錄檔路徑
+        """
+        self.store = JsonStateStore(path)
+
+    def save(self, video: VideoItem):
+        """
+        保存影片目前的步驟狀態（可作為 VideoItem.on_checkpoint 使用）
+
+        Args:
+            video: 影片資料
+        """
+        key = self._key(video)
+        if key:
+            self.store.set(key, video.checkpoint_dict())
+
+    def restore(self, video: VideoItem) -> bool:
+        """
+        把保存的步驟狀態套用到還沒有任何步驟紀錄的影片
+
+        Args:
+            video: 影片資料
+
+        Returns:
+            bool: 有套用檢查點時為 True
+        """
+        if video.upload_steps:
+            return False
+        key = self._key(video)
+        data = self.store.get(key) if key else None
+        if not data:
+            return False
+        video.restore_checkpoint(data)
+        return True
+
+    def delete(self, video: VideoItem):
+        """
+        刪除影片的檢查點（所有步驟都完成後呼叫）
+
+        Args:
+            video: 影片資料
+        """
+        key = self._key(video)
+        if key:
+            self.store.delete(key)
+
+    @staticmethod
+    def _key(video: VideoItem) -> Optional[str]:
+        """
+        取得影片檔案對應的檢查點 key
+
+        Args:
+            video: 影片資料
+
+        Returns:
+            Optional[str]: 檢查點 key，檔案不存在時返回 None
+        """
+        try:
+            return file_state_key(video.video_path)
+        except OSError:
+            return None
@@ -0,0 +1,204 @@
+"""
+上傳參數自動調整
+依每個分塊的耗時、吞吐量與錯誤，以 AIMD（加法增加、乘法減少）調整分塊並行數與分塊大小，
+並依端點保存表現最好的設定，下次批次直接從該設定開始
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from services.state_store import JsonStateStore
+
+
+TUNER_STATE_PATH = "upload_tuning.json"
+
+# 每累積幾個分塊評估一次並調整
+DEFAULT_WINDOW = 4
+# 吞吐量至少要變化這個比例才視為提升 / 下降
+THROUGHPUT_TOLERANCE = 0.05
+# 發生錯誤時乘上的比例
+DECREASE_FACTOR = 0.5
+
+
+class AimdController:
+    """
+    單一端點、單一參數的 AIMD 調整器
+
+    每個評估區間內：
+    - 有錯誤：數值乘以 DECREASE_FACTOR
+    - 吞吐量比目前最佳值更高：記為最佳值，數值加一個 step 繼續嘗試
+    - 吞吐量明顯低於最佳值：退回最佳值
+    - 其他（持平）：維持不變
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, step: int,
+                 granularity: int = 1, window: int = DEFAULT_WINDOW,
+                 on_best=None):
+        """
+        初始化調整器
+
+        Args:
+            initial: 起始數值
+            minimum: 最小值
+            maximum: 最大值
+            step: 每次加法增加的量
+            granularity: 數值必須是它的倍數（例如 YouTube 分塊需對齊 256 KB）
+            window: 每累積幾個分塊評估一次
+            on_best: 找到新的最佳值時呼叫，參數為 (數值, 每秒位元組數)
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step
+        self.granularity = granularity
+        self.window = window
+        self.on_best = on_best
+
+        self._lock = threading.Lock()
+        self._value = self._clamp(initial)
+        self._best_value = self._value
+        self._best_throughput: Optional[float] = None
+        self._reset_window()
+
+    @property
+    def value(self) -> int:
+        """目前建議的數值"""
+        with self._lock:
+            return self._value
+
+    @property
+    def best_value(self) -> int:
+        """目前吞吐量最好的數值"""
+        with self._lock:
+            return self._best_value
+
+    def stats(self) -> Dict[str, float]:
+        """
+        取得目前評估區間的統計
+
+        Returns:
+            Dict[str, float]: 分塊數、平均耗時（秒）與錯誤率
+        """
+        with self._lock:
+            total = self._samples + self._errors
+            return {
+                'samples': total,
+                'average_latency': self._latency / self._samples if self._samples else 0.0,
+                'error_rate': self._errors / total if total else 0.0,
+            }
+
+    def record_success(self, num_bytes: int, latency: float):
+        """
+        記錄一個成功的分塊
+
+        Args:
+            num_bytes: 分塊位元組數
+            latency: 該分塊從送出到完成的秒數
+        """
+        best = None
+        with self._lock:
+            self._samples += 1
+            self._bytes += num_bytes
+            self._latency += latency
+            if self._samples + self._errors >= self.window:
+                best = self._evaluate()
+        if best and self.on_best:
+            self.on_best(*best)
+
+    def record_failure(self):
+        """記錄一個失敗的分塊（立即乘法減少）"""
+        with self._lock:
+            self._errors += 1
+            self._value = self._clamp(int(self._value * DECREASE_FACTOR))
+            self._reset_window()
+
+    def _evaluate(self):
+        """評估目前區間並調整數值（呼叫端需持有鎖），找到新的最佳值時返回 (數值, 吞吐量)"""
+        elapsed = max(time.monotonic() - self._window_start, 1e-6)
+        throughput = self._bytes / elapsed
+        best = None
+
+        if self._best_throughput is None or throughput > self._best_throughput * (1 + THROUGHPUT_TOLERANCE):
+            self._best_value = self._value
+            self._best_throughput = throughput
+            best = (self._value, throughput)
+            self._value = self._clamp(self._value + self.step)
+        elif throughput < self._best_throughput * (1 - THROUGHPUT_TOLERANCE):
+            self._value = self._best_value
+
+        self._reset_window()
+        return best
+
+    def _reset_window(self):
+        """開始新的評估區間（呼叫端需持有鎖）"""
+        self._window_start = time.monotonic()
+        self._samples = 0
+        self._errors = 0
+        self._bytes = 0
+        self._latency = 0.0
+
+    def _clamp(self, value: int) -> int:
+        """限制在範圍內並對齊 granularity"""
+        value = max(self.minimum, min(value, self.maximum))
+        return max(self.granularity, value // self.granularity * self.granularity)
+
+
+class UploadTuner:
+    """依端點管理 AIMD 調整器，並把各端點的最佳設定保存到本地"""
+
+    def __init__(self, state_path: str = TUNER_STATE_PATH):
+        """
+        初始化自動調整
+
+        Args:
+            state_path: 保存最佳設定的 JSON 檔案
+        """
+        self.store = JsonStateStore(state_path)
+        self._lock = threading.Lock()
+        self._controllers: Dict[str, AimdController] = {}
+
+    def controller(self, endpoint: str, default: int, minimum: int, maximum: int,
+                   step: int, granularity: int = 1) -> AimdController:
+        """
+        取得端點的調整器（同一端點的上傳共用同一個調整器）
+
+        Args:
+            endpoint: 端點名稱（例如 'bilibili-concurrency:upos-sz-upcdnbda2.bilivideo.com'）
+            default: 沒有保存的設定時的起始數值
+            minimum: 最小值
+            maximum: 最大值
+            step: 每次加法增加的量
+            granularity: 數值必須是它的倍數
+
+        Returns:
+            AimdController: 調整器
+        """
+        with self._lock:
+            controller = self._controllers.get(endpoint)
+            if controller is None:
+                saved = self.store.get(endpoint) or {}
+                controller = AimdController(
+                    initial=saved.get('value', default),
+                    minimum=minimum,
+                    maximum=maximum,
+                    step=step,
+                    granularity=granularity,
+                    on_best=lambda value, throughput: self._save_best(endpoint, value, throughput),
+                )
+                self._controllers[endpoint] = controller
+            return controller
+
+    def _save_best(self, endpoint: str, value: int, throughput: float):
+        """
+        保存端點的最佳設定
+
+        Args:
+            endpoint: 端點名稱
+            value: 數值
+            throughput: 該數值量到的每秒位元組數
+        """
+        self.store.set(endpoint, {
+            'value': value,
+            'throughput': throughput,
+            'updated_at': time.time(),
+        })
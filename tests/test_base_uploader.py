@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from uploaders.base_uploader import BaseUploader, CancellationToken, UploadCancelledError
+from uploaders.bilibili_uploader import BilibiliUploader
+from video_item import VideoItem
+
+
+class FakeUploader(BaseUploader):
+    def upload(self, video, progress_callback=None, cancel_token=None):
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        return f"id-{video.title}"
+
+    def set_thumbnail(self, video_id, thumbnail_path):
+        return True
+
+    def add_to_playlist(self, video_id, playlist_ids):
+        return True
+
+
+class CancellationTokenTest(unittest.TestCase):
+    def test_raise_if_cancelled(self):
+        token = CancellationToken()
+        token.raise_if_cancelled()
+        token.cancel()
+        self.assertTrue(token.is_cancelled)
+        with self.assertRaises(UploadCancelledError):
+            token.raise_if_cancelled()
+
+    def test_sleep_is_interrupted(self):
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(UploadCancelledError):
+            token.sleep(10)
+
+
+class UploadAsyncTest(unittest.TestCase):
+    def test_upload_async_returns_future(self):
+        future = FakeUploader().upload_async(VideoItem(video_path="v.mp4", title="t"))
+        self.assertEqual(future.result(timeout=5), "id-t")
+
+    def test_upload_async_propagates_cancellation(self):
+        token = CancellationToken()
+        token.cancel()
+        future = FakeUploader().upload_async(VideoItem(video_path="v.mp4", title="t"), cancel_token=token)
+        with self.assertRaises(UploadCancelledError):
+            future.result(timeout=5)
+
+
+class BilibiliCancellationTest(unittest.TestCase):
+    def test_chunks_stop_after_cancel(self):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"x" * 1000)
+        self.addCleanup(os.remove, path)
+
+        token = CancellationToken()
+        uploader = BilibiliUploader(chunk_concurrency=1)
+        sent = []
+
+        def fake_upload_chunk(**kwargs):
+            sent.append(kwargs["part_number"])
+            if kwargs["part_number"] == 2:
+                token.cancel()
+
+        uploader._upload_chunk = fake_upload_chunk
+
+        with self.assertRaises(UploadCancelledError):
+            uploader._upload_parts(path, "https://upos", "auth", "uid", 100, 1000, cancel_token=token)
+        self.assertEqual(sent, [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
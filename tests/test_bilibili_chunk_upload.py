@@ -0,0 +1,196 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from uploaders import bilibili_uploader
+from uploaders.bilibili_uploader import BilibiliUploader, ChunkUploadError
+
+
+class BilibiliChunkUploadTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.video_path = tempfile.mkstemp(suffix=".mp4")
+        with os.fdopen(fd, "wb") as f:
+            f.write(bytes(range(256)) * 4)  # 1024 bytes
+        self.addCleanup(os.remove, self.video_path)
+
+    def _run_upload(self, uploader, chunk_size):
+        received = {}
+        in_flight = []
+        peak = [0]
+        lock = threading.Lock()
+
+        def fake_upload_chunk(**kwargs):
+            with lock:
+                in_flight.append(kwargs["part_number"])
+                peak[0] = max(peak[0], len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.remove(kwargs["part_number"])
+                received[kwargs["chunk_index"]] = kwargs
+
+        uploader._upload_chunk = fake_upload_chunk
+        parts = uploader._upload_parts(
+            self.video_path, "https://upos", "auth", "uid", chunk_size, 1024
+        )
+        return parts, received, peak[0]
+
+    def test_concurrent_parts_are_complete_and_ordered(self):
+        uploader = BilibiliUploader(chunk_concurrency=4)
+
+        parts, received, peak = self._run_upload(uploader, chunk_size=100)
+
+        self.assertEqual([p["partNumber"] for p in parts], list(range(1, 12)))
+        self.assertLessEqual(peak, 4)
+        self.assertGreater(peak, 1)
+        with open(self.video_path, "rb") as f:
+            content = f.read()
+        for index, kwargs in received.items():
+            self.assertEqual(kwargs["data"], content[index * 100:(index + 1) * 100])
+            self.assertEqual(kwargs["start"], index * 100)
+            self.assertEqual(kwargs["end"], index * 100 + len(kwargs["data"]))
+            self.assertEqual(kwargs["chunks"], 11)
+        self.assertEqual(len(received[10]["data"]), 24)
+
+    def test_single_concurrency_is_sequential(self):
+        uploader = BilibiliUploader(chunk_concurrency=1)
+
+        parts, _, peak = self._run_upload(uploader, chunk_size=300)
+
+        self.assertEqual(peak, 1)
+        self.assertEqual([p["partNumber"] for p in parts], [1, 2, 3, 4])
+
+    def test_chunk_failure_propagates(self):
+        uploader = BilibiliUploader(chunk_concurrency=2)
+
+        def failing_upload_chunk(**kwargs):
+            if kwargs["part_number"] == 2:
+                raise RuntimeError("Chunk upload failed")
+
+        uploader._upload_chunk = failing_upload_chunk
+
+        with self.assertRaises(RuntimeError):
+            uploader._upload_parts(self.video_path, "https://upos", "auth", "uid", 100, 1024)
+
+
+@mock.patch.object(bilibili_uploader, "BILIBILI_RETRY_BASE_DELAY", 0.001)
+@mock.patch.object(bilibili_uploader, "BILIBILI_THROTTLE_BASE_DELAY", 0.001)
+class BilibiliChunkRetryTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.video_path = tempfile.mkstemp(suffix=".mp4")
+        with os.fdopen(fd, "wb") as f:
+            f.write(bytes(range(256)) * 4)
+        self.addCleanup(os.remove, self.video_path)
+
+    def _upload(self, uploader, chunk_upload, chunk_size=300):
+        uploader._upload_chunk = chunk_upload
+        return uploader._upload_parts(self.video_path, "https://upos", "auth", "uid", chunk_size, 1024)
+
+    def test_transient_failures_resend_only_that_chunk(self):
+        attempts = {}
+        received = {}
+
+        def flaky(**kwargs):
+            part = kwargs["part_number"]
+            attempts[part] = attempts.get(part, 0) + 1
+            if part == 2 and attempts[part] == 1:
+                raise ChunkUploadError("bad gateway", status_code=502)
+            if part == 2 and attempts[part] == 2:
+                raise requests.Timeout("slow")
+            received[part] = bytes(kwargs["data"])
+
+        parts = self._upload(BilibiliUploader(chunk_concurrency=2), flaky)
+
+        self.assertEqual([p["partNumber"] for p in parts], [1, 2, 3, 4])
+        self.assertEqual(attempts, {1: 1, 2: 3, 3: 1, 4: 1})
+        # 重送時從來源重新讀取同一段位元組
+        with open(self.video_path, "rb") as f:
+            self.assertEqual(received[2], f.read()[300:600])
+
+    def test_each_error_class_has_its_own_budget(self):
+        calls = []
+
+        def throttled(**kwargs):
+            calls.append(kwargs["part_number"])
+            raise ChunkUploadError("slow down", status_code=429)
+
+        with mock.patch.dict(bilibili_uploader.BILIBILI_CHUNK_RETRY_BUDGETS, {"throttled": 2}):
+            with self.assertRaises(ChunkUploadError):
+                self._upload(BilibiliUploader(chunk_concurrency=1), throttled, chunk_size=1024)
+
+        self.assertEqual(calls, [1, 1, 1])
+
+    def test_permanent_failure_is_not_resent(self):
+        calls = []
+
+        def rejected(**kwargs):
+            calls.append(kwargs["part_number"])
+            raise ChunkUploadError("bad request", status_code=400)
+
+        with self.assertRaises(ChunkUploadError):
+            self._upload(BilibiliUploader(chunk_concurrency=1), rejected, chunk_size=1024)
+
+        self.assertEqual(calls, [1])
+
+    def test_long_backoff_is_waited_out_by_default(self):
+        calls = []
+
+        def throttled_once(**kwargs):
+            calls.append(kwargs["part_number"])
+            if len(calls) == 1:
+                raise ChunkUploadError("slow down", status_code=429, retry_after=1.5)
+
+        started = time.monotonic()
+        parts = self._upload(BilibiliUploader(chunk_concurrency=1), throttled_once, chunk_size=1024)
+
+        # 沒有呼叫端可以重新排程：在這裡等完退避後重送同一個分塊
+        self.assertEqual([p["partNumber"] for p in parts], [1])
+        self.assertEqual(calls, [1, 1])
+        self.assertGreaterEqual(time.monotonic() - started, 1.4)
+
+    def test_long_backoff_releases_the_worker_when_deferring(self):
+        calls = []
+
+        def throttled(**kwargs):
+            calls.append(kwargs["part_number"])
+            raise ChunkUploadError("slow down", status_code=429, retry_after=30)
+
+        with mock.patch.object(BilibiliUploader, "_wait_for_retry") as mock_wait:
+            with self.assertRaises(ChunkUploadError):
+                self._upload(BilibiliUploader(chunk_concurrency=1, defer_long_retries=True), throttled,
+                             chunk_size=1024)
+
+        # 沒有其他分塊在傳送時不在工作執行緒中等 30 秒，交給呼叫端排程
+        self.assertEqual(calls, [1])
+        mock_wait.assert_not_called()
+
+    def test_retry_after_overrides_backoff(self):
+        used = {}
+
+        delay = BilibiliUploader._chunk_retry_delay(
+            ChunkUploadError("throttled", status_code=406, retry_after=7), used
+        )
+
+        self.assertEqual(delay, 7)
+        self.assertEqual(used, {"throttled": 1})
+
+    def test_put_failure_carries_status_and_retry_after(self):
+        uploader = BilibiliUploader()
+        uploader.session = mock.Mock()
+        uploader.session.put.return_value = mock.Mock(
+            status_code=503, text="busy", headers={"Retry-After": "3"}
+        )
+
+        with self.assertRaises(ChunkUploadError) as ctx:
+            uploader._upload_chunk("https://upos", "auth", "uid", 1, 0, 1, 3, 0, 3, 3, memoryview(b"abc"))
+
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertEqual(ctx.exception.retry_after, 3.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,24 @@
+import os
+import tempfile
 import unittest
 from unittest import mock
 
+from services.replay_service import ReplayService
 from uploaders.bilibili_uploader import BilibiliUploader
 from video_item import VideoItem
 
 
 class BilibiliReplayReuseTest(unittest.TestCase):
-    @mock.patch("uploaders.bilibili_uploader.google_drive.upload_replay")
+    def setUp(self):
+        fd, self.replay_path = tempfile.mkstemp(suffix=".SC2Replay")
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"replay")
+        self.addCleanup(os.remove, self.replay_path)
+
+    @mock.patch("services.replay_service.google_drive.upload_replay")
     def test_reuses_existing_replay_url_without_reuploading(self, mock_upload_replay):
-        uploader = BilibiliUploader()
-        video = VideoItem(video_path="video.mp4", title="t", replay_path="replay.SC2Replay")
+        uploader = BilibiliUploader(replay_service=ReplayService())
+        video = VideoItem(video_path="video.mp4", title="t", replay_path=self.replay_path)
         video.set_replay_url("https://drive.google.com/existing-link")
 
         result = uploader._ensure_replay_uploaded(video)
@@ -17,21 +26,21 @@ class BilibiliReplayReuseTest(unittest.TestCase):
         self.assertEqual(result, "https://drive.google.com/existing-link")
         mock_upload_replay.assert_not_called()
 
-    @mock.patch("uploaders.bilibili_uploader.google_drive.upload_replay")
+    @mock.patch("services.replay_service.google_drive.upload_replay")
     def test_uploads_replay_when_not_already_set(self, mock_upload_replay):
         mock_upload_replay.return_value = "https://drive.google.com/new-link"
-        uploader = BilibiliUploader()
-        video = VideoItem(video_path="video.mp4", title="t", replay_path="replay.SC2Replay")
+        uploader = BilibiliUploader(replay_service=ReplayService())
+        video = VideoItem(video_path="video.mp4", title="t", replay_path=self.replay_path)
 
         result = uploader._ensure_replay_uploaded(video)
 
         self.assertEqual(result, "https://drive.google.com/new-link")
-        mock_upload_replay.assert_called_once_with("replay.SC2Replay")
+        mock_upload_replay.assert_called_once_with(self.replay_path)
         self.assertEqual(video.replay_url, "https://drive.google.com/new-link")
 
-    @mock.patch("uploaders.bilibili_uploader.google_drive.upload_replay")
+    @mock.patch("services.replay_service.google_drive.upload_replay")
     def test_no_replay_path_returns_empty_string(self, mock_upload_replay):
-        uploader = BilibiliUploader()
+        uploader = BilibiliUploader(replay_service=ReplayService())
         video = VideoItem(video_path="video.mp4", title="t")
 
         result = uploader._ensure_replay_uploaded(video)
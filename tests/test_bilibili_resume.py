@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from uploaders.bilibili_uploader import BilibiliUploader, UposSessionExpiredError
+
+
+class BilibiliResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.video_path = os.path.join(self.tmpdir.name, "video.mp4")
+        with open(self.video_path, "wb") as f:
+            f.write(b"x" * 1000)
+        self.ledger_path = os.path.join(self.tmpdir.name, "ledger.json")
+
+    def _make_uploader(self, upload_id="uid-1"):
+        uploader = BilibiliUploader(chunk_concurrency=1, ledger_path=self.ledger_path)
+        uploader._preupload = mock.Mock(return_value={
+            "auth": "auth",
+            "upos_uri": "upos://ugc/n123.mp4",
+            "endpoint": "//upos.example",
+            "biz_id": 42,
+            "chunk_size": 100,
+        })
+        uploader._create_upos_upload = mock.Mock(return_value={"upload_id": upload_id})
+        uploader._complete_upos_upload = mock.Mock()
+        return uploader
+
+    def test_restarted_upload_continues_from_first_missing_part(self):
+        first = self._make_uploader()
+
+        def crash_at_part_4(**kwargs):
+            if kwargs["part_number"] == 4:
+                raise RuntimeError("process died")
+
+        first._upload_chunk = mock.Mock(side_effect=crash_at_part_4)
+        with self.assertRaises(RuntimeError):
+            first._upload_video_file(self.video_path)
+
+        second = self._make_uploader()
+        second._upload_chunk = mock.Mock()
+        uploaded = second._upload_video_file(self.video_path)
+
+        second._preupload.assert_not_called()
+        sent = [call.kwargs["part_number"] for call in second._upload_chunk.call_args_list]
+        self.assertEqual(sent, [4, 5, 6, 7, 8, 9, 10])
+        self.assertTrue(all(call.kwargs["upload_id"] == "uid-1" for call in second._upload_chunk.call_args_list))
+        parts = second._complete_upos_upload.call_args.args[5]
+        self.assertEqual([p["partNumber"] for p in parts], list(range(1, 11)))
+        self.assertEqual(uploaded.filename, "n123")
+        self.assertEqual(uploaded.cid, 42)
+        self.assertEqual(second.ledger.items(), {})
+
+    def test_expired_session_falls_back_to_fresh_upload(self):
+        first = self._make_uploader()
+        first._upload_chunk = mock.Mock(side_effect=RuntimeError("process died"))
+        with self.assertRaises(RuntimeError):
+            first._upload_video_file(self.video_path)
+
+        second = self._make_uploader(upload_id="uid-2")
+
+        def reject_old_session(**kwargs):
+            if kwargs["upload_id"] == "uid-1":
+                raise UposSessionExpiredError("HTTP 404")
+
+        second._upload_chunk = mock.Mock(side_effect=reject_old_session)
+        second._upload_video_file(self.video_path)
+
+        second._preupload.assert_called_once()
+        fresh = [c.kwargs["part_number"] for c in second._upload_chunk.call_args_list if c.kwargs["upload_id"] == "uid-2"]
+        self.assertEqual(fresh, list(range(1, 11)))
+        self.assertEqual(second._complete_upos_upload.call_args.args[2], "uid-2")
+
+    def test_modified_file_does_not_reuse_ledger(self):
+        first = self._make_uploader()
+        first._upload_chunk = mock.Mock(side_effect=RuntimeError("process died"))
+        with self.assertRaises(RuntimeError):
+            first._upload_video_file(self.video_path)
+
+        with open(self.video_path, "ab") as f:
+            f.write(b"y" * 10)
+
+        second = self._make_uploader(upload_id="uid-2")
+        second._upload_chunk = mock.Mock()
+        second._upload_video_file(self.video_path)
+
+        second._preupload.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
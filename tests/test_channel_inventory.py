@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from googleapiclient import discovery
+from googleapiclient.http import HttpMockSequence
+
+from services.channel_inventory import ChannelInventory
+from tests.test_youtube_metadata import batch_response
+from upload_manager import UploadManager
+from uploaders.youtube_uploader import YouTubeUploader
+from video_item import VideoItem
+
+
+def page(etag, items, next_token=None):
+    body = {"etag": etag, "items": [
+        {"snippet": {"title": title, "resourceId": {"videoId": video_id}}} for video_id, title in items
+    ]}
+    if next_token:
+        body["nextPageToken"] = next_token
+    return ({"status": "200"}, json.dumps(body))
+
+
+NOT_MODIFIED = ({"status": "304"}, "")
+CHANNEL = ({"status": "200"}, json.dumps(
+    {"items": [{"contentDetails": {"relatedPlaylists": {"uploads": "UU1"}}}]}
+))
+
+
+class ChannelInventoryTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, "inventory.json")
+
+    def _youtube(self, responses):
+        self.http = HttpMockSequence(responses)
+        return discovery.build("youtube", "v3", http=self.http, static_discovery=True)
+
+    def _headers(self):
+        return [headers for uri, _, _, headers in self.http.request_sequence if "playlistItems" in uri]
+
+    def test_resync_sends_etags_and_keeps_unchanged_pages(self):
+        inventory = ChannelInventory(self.path)
+        inventory.sync(self._youtube([
+            page('"e1"', [("v1", "Game 1")], next_token="p2"),
+            page('"e2"', [("v2", "Game 2")]),
+        ]), ["PL1"], include_uploads=False)
+        self.assertTrue(inventory.contains("PL1", "v2"))
+
+        reloaded = ChannelInventory(self.path)
+        reloaded.sync(self._youtube([
+            page('"e1b"', [("v3", "Game 3")], next_token="p2"),
+            NOT_MODIFIED,
+        ]), ["PL1"], include_uploads=False)
+
+        self.assertEqual([h.get("If-None-Match") for h in self._headers()], ['"e1"', '"e2"'])
+        self.assertTrue(reloaded.contains("PL1", "v3"))
+        self.assertTrue(reloaded.contains("PL1", "v2"))
+        self.assertFalse(reloaded.contains("PL1", "v1"))
+
+    def test_uploads_resync_stops_at_the_first_known_video(self):
+        inventory = ChannelInventory(self.path)
+        inventory.sync(self._youtube([
+            CHANNEL,
+            page('"e1"', [("v2", "Game 2")], next_token="p2"),
+            page('"e2"', [("v1", "Game 1")]),
+        ]))
+
+        reloaded = ChannelInventory(self.path)
+        # 新上傳的 v3 讓所有分頁位移；讀到含有已知影片的第一頁即停止
+        reloaded.sync(self._youtube([page('"e1b"', [("v3", "Game 3"), ("v2", "Game 2")], next_token="p2")]))
+
+        self.assertEqual(len(self._headers()), 1)
+        self.assertEqual(self._headers()[0].get("If-None-Match"), '"e1"')
+        self.assertEqual(reloaded.find_title("Game 3"), "v3")
+        self.assertEqual(reloaded.find_title("Game 1"), "v1")
+
+        ChannelInventory(self.path).sync(self._youtube([NOT_MODIFIED]))
+        self.assertEqual(self._headers()[0].get("If-None-Match"), '"e1b"')
+
+    def test_recorded_items_are_visible_until_next_sync(self):
+        inventory = ChannelInventory(self.path)
+        inventory.sync(self._youtube([page('"e1"', [])]), ["PL1"], include_uploads=False)
+
+        inventory.record("PL1", "v1")
+
+        self.assertTrue(ChannelInventory(self.path).contains("PL1", "v1"))
+        self.assertFalse(inventory.contains("PL2", "v1"))
+
+    def test_playlist_insert_skips_existing_members(self):
+        youtube = self._youtube([
+            page('"e1"', [("v1", "Game 1")]),
+            batch_response((200, '{"id": "item"}')),
+        ])
+        inventory = ChannelInventory(self.path)
+        uploader = YouTubeUploader(mock.Mock(), inventory=inventory)
+
+        with mock.patch("uploaders.youtube_uploader.get_service", return_value=youtube):
+            results = uploader.add_videos_to_playlists([("v1", "PL1"), ("v2", "PL1")])
+
+        self.assertEqual(results, {("v1", "PL1"): None, ("v2", "PL1"): None})
+        # 批次請求中只有 v2 的 insert
+        batches = [body for uri, method, body, _ in self.http.request_sequence if method == "POST"]
+        self.assertEqual(len(batches), 1)
+        self.assertIn('"videoId": "v2"', batches[0])
+        self.assertNotIn('"videoId": "v1"', batches[0])
+        self.assertTrue(inventory.contains("PL1", "v2"))
+
+    def test_manager_flags_titles_already_on_channel(self):
+        inventory = ChannelInventory(self.path)
+        inventory.sync(self._youtube([CHANNEL, page('"e1"', [("v1", "Game 1")])]))
+        manager = UploadManager(mock.Mock(), channel_inventory=inventory)
+        videos = [VideoItem(video_path="a.mp4", title="Game 1"), VideoItem(video_path="b.mp4", title="Game 2")]
+
+        self.assertEqual(manager.find_duplicates(videos), [(videos[0], {"youtube": "v1"})])
+
+
+if __name__ == "__main__":
+    unittest.main()
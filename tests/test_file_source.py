@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from googleapiclient.http import _StreamSlice
+
+from services import file_source
+from services.file_source import FileSource, ViewReader, open_source, release_source, shared_source
+from uploaders.youtube_uploader import SourceMediaUpload
+
+
+class FileSourceTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".mp4")
+        self.data = bytes(range(256)) * 40
+        with os.fdopen(fd, "wb") as f:
+            f.write(self.data)
+        self.addCleanup(os.remove, self.path)
+
+    def test_view_returns_file_range_without_copy(self):
+        source = FileSource(self.path)
+        self.addCleanup(source.close)
+
+        view = source.view(1000, 500)
+
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(view.tobytes(), self.data[1000:1500])
+        self.assertEqual(len(source.view(len(self.data) - 10, 100)), 10)
+
+    def test_view_reader_seeks_and_reads_slices(self):
+        reader = ViewReader(memoryview(self.data)[:100])
+
+        self.assertEqual(bytes(reader.read(30)), self.data[:30])
+        reader.seek(-10, os.SEEK_END)
+        self.assertEqual(bytes(reader.read()), self.data[90:100])
+        self.assertEqual(reader.tell(), 100)
+
+    def test_registry_shares_one_source_until_last_release(self):
+        first = open_source(self.path)
+        second = open_source(self.path)
+        self.assertIs(first, second)
+
+        with mock.patch.object(FileSource, "close") as mock_close:
+            release_source(first)
+            mock_close.assert_not_called()
+            release_source(second)
+            mock_close.assert_called_once()
+        first.close()
+
+        with shared_source(self.path) as third:
+            self.assertIsNot(third, first)
+        self.assertEqual(file_source._sources, {})
+
+    def test_reader_prefetches_ahead_of_reads(self):
+        source = FileSource(self.path)
+        self.addCleanup(source.close)
+        with mock.patch.object(source, "prefetch") as mock_prefetch:
+            reader = source.reader(readahead=1000)
+            reader.read(400)
+            reader.read(400)   # 過了預讀範圍的一半，預讀下一段
+            reader.seek(5000)  # 跳出預讀範圍，從新位置重新預讀
+
+        self.assertEqual([c.args for c in mock_prefetch.call_args_list],
+                         [(0, 1000), (1000, 1000), (5000, 1000)])
+
+    def test_source_media_upload_through_stream_slice(self):
+        media = SourceMediaUpload(self.path, chunksize=1024, resumable=True)
+        self.addCleanup(media.close)
+
+        stream = media.stream()
+        stream.seek(2048)
+        body = _StreamSlice(stream, 2048, media.chunksize())
+
+        self.assertEqual(media.size(), len(self.data))
+        self.assertEqual(bytes(body.read()), self.data[2048:3072])
+        self.assertEqual(media.getbytes(10, 5), self.data[10:15])
+
+    def test_disk_is_charged_once_for_all_consumers(self):
+        governor = mock.Mock()
+        with mock.patch.object(file_source, "TEE_BLOCK_SIZE", 1024):
+            source = FileSource(self.path)
+        self.addCleanup(source.close)
+
+        # YouTube 的串流先讀了前 3000 位元組（涵蓋 3 個區塊）
+        reader = source.reader(readahead=0, governor=governor)
+        self.assertEqual(bytes(reader.read(3000)), self.data[:3000])
+        # B站的分塊與已讀過的區塊重疊，只扣新的區塊
+        self.assertEqual(source.charge_disk(2048, 2048, governor), 1024)
+        self.assertEqual(source.charge_disk(0, 4096, governor), 0)
+
+        self.assertEqual([c.args[0] for c in governor.acquire_disk.call_args_list], [3072, 1024])
+        self.assertEqual(source.disk_bytes_charged, 4096)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from PyQt5 import QtCore
+
+from services.fingerprint_index import FingerprintIndex, sample_fingerprint
+from upload_manager import UploadManager
+from video_item import UploadStatus, VideoItem
+
+
+def setUpModule():
+    global _app
+    _app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+class FingerprintIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.index_path = os.path.join(self.dir.name, "fingerprints.json")
+
+    def _write(self, name, data):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_fingerprint_samples_head_and_tail(self):
+        data = bytes(range(256)) * 100
+        a = self._write("a.mp4", data)
+        copy = self._write("copy.mp4", data)
+        tail_changed = self._write("b.mp4", data[:-1] + b"x")
+        middle_changed = self._write("c.mp4", data[:10000] + b"x" + data[10001:])
+
+        self.assertEqual(sample_fingerprint(a, 1024), sample_fingerprint(copy, 1024))
+        self.assertNotEqual(sample_fingerprint(a, 1024), sample_fingerprint(tail_changed, 1024))
+        # 只取樣開頭與結尾，中間的差異不影響指紋
+        self.assertEqual(sample_fingerprint(a, 1024), sample_fingerprint(middle_changed, 1024))
+
+    def test_records_persist_per_platform(self):
+        path = self._write("a.mp4", b"video")
+        FingerprintIndex(self.index_path).record(path, "youtube", "yt-1", "Game 1")
+        FingerprintIndex(self.index_path).record(path, "bilibili", "BV1", "Game 1")
+
+        copy = self._write("copy.mp4", b"video")
+        self.assertEqual(FingerprintIndex(self.index_path).lookup(copy), {"youtube": "yt-1", "bilibili": "BV1"})
+        self.assertEqual(FingerprintIndex(self.index_path).lookup(os.path.join(self.dir.name, "missing.mp4")), {})
+
+    def test_manager_flags_uploaded_and_repeated_videos(self):
+        index = FingerprintIndex(self.index_path)
+        uploaded = self._write("uploaded.mp4", b"old")
+        index.record(uploaded, "youtube", "yt-old")
+        new = self._write("new.mp4", b"new")
+        again = self._write("again.mp4", b"new")
+        manager = UploadManager(mock.Mock(), fingerprint_index=index)
+        videos = [VideoItem(video_path=p, title=os.path.basename(p)) for p in (uploaded, new, again)]
+
+        duplicates = manager.find_duplicates(videos)
+
+        self.assertEqual(duplicates, [(videos[0], {"youtube": "yt-old"}), (videos[2], {})])
+
+    def test_bilibili_only_duplicate_is_flagged_when_uploading_to_bilibili(self):
+        index = FingerprintIndex(self.index_path)
+        path = self._write("a.mp4", b"video")
+        index.record(path, "bilibili", "BV1")
+        videos = [VideoItem(video_path=path, title="a")]
+
+        self.assertEqual(UploadManager(mock.Mock(), fingerprint_index=index).find_duplicates(videos), [])
+        manager = UploadManager(mock.Mock(), bilibili_uploader=mock.Mock(), fingerprint_index=index)
+        self.assertEqual(manager.find_duplicates(videos), [(videos[0], {"bilibili": "BV1"})])
+
+    def test_skipped_platform_is_not_uploaded_again(self):
+        youtube = mock.Mock()
+        youtube.upload.return_value = "yt-1"
+        bilibili = mock.Mock()
+        manager = UploadManager(youtube, bilibili_uploader=bilibili)
+        results = []
+        finished = threading.Event()
+        manager.batch_finished.connect(lambda success, fail: (results.append((success, fail)), finished.set()),
+                                       QtCore.Qt.DirectConnection)
+        video = VideoItem(video_path="a.mp4", title="a")
+        video.set_skipped("bilibili", "BV1")
+
+        manager.start([video])
+
+        self.assertTrue(finished.wait(5))
+        self.assertEqual(results, [(1, 0)])
+        bilibili.upload.assert_not_called()
+        self.assertEqual(video.bilibili_status, UploadStatus.SKIPPED)
+        self.assertEqual(video.status, UploadStatus.COMPLETED)
+
+    def test_manager_records_completed_uploads(self):
+        index = FingerprintIndex(self.index_path)
+        path = self._write("a.mp4", b"video")
+        youtube = mock.Mock()
+        youtube.upload.return_value = "yt-1"
+        bilibili = mock.Mock()
+        bilibili.upload.return_value = "BV1"
+        manager = UploadManager(youtube, bilibili_uploader=bilibili, fingerprint_index=index)
+        finished = threading.Event()
+        manager.batch_finished.connect(lambda success, fail: finished.set(), QtCore.Qt.DirectConnection)
+
+        manager.start([VideoItem(video_path=path, title="a")])
+
+        self.assertTrue(finished.wait(5))
+
+        self.assertEqual(index.lookup(path), {"youtube": "yt-1", "bilibili": "BV1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import http.server
+import threading
+import unittest
+from unittest import mock
+
+from google.auth.credentials import AnonymousCredentials
+
+from services.google_api import AuthorizedTransport, GoogleServiceFactory, HttpPool
+
+
+class KeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class GoogleServiceFactoryTest(unittest.TestCase):
+    @mock.patch("services.google_api.discovery.build")
+    def test_service_is_built_once_per_credentials(self, mock_build):
+        factory = GoogleServiceFactory()
+        creds = mock.Mock()
+
+        first = factory.get("youtube", "v3", creds)
+        second = factory.get("youtube", "v3", creds)
+
+        self.assertIs(first, second)
+        mock_build.assert_called_once()
+        kwargs = mock_build.call_args.kwargs
+        self.assertTrue(kwargs["static_discovery"])
+        self.assertIs(kwargs["http"].credentials, creds)
+        self.assertIs(kwargs["http"].pool, factory.pool)
+
+    @mock.patch("services.google_api.discovery.build")
+    def test_rotated_credentials_rebuild_service(self, mock_build):
+        mock_build.side_effect = lambda *args, **kwargs: mock.Mock()
+        factory = GoogleServiceFactory()
+
+        first = factory.get("youtube", "v3", mock.Mock())
+        second = factory.get("youtube", "v3", mock.Mock())
+        factory.get("drive", "v3", mock.Mock())
+
+        self.assertIsNot(first, second)
+        self.assertEqual(factory.build_count, 3)
+
+    def test_static_discovery_builds_without_network(self):
+        factory = GoogleServiceFactory()
+
+        with mock.patch("httplib2.Http.request", side_effect=AssertionError("network used")):
+            youtube = factory.get("youtube", "v3", AnonymousCredentials())
+            drive = factory.get("drive", "v3", AnonymousCredentials())
+
+        self.assertTrue(hasattr(youtube, "videos"))
+        self.assertTrue(hasattr(drive, "files"))
+
+
+class HttpPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def test_sequential_requests_reuse_connection(self):
+        pool = HttpPool()
+        self.addCleanup(pool.close)
+        transport = AuthorizedTransport(AnonymousCredentials(), pool)
+
+        for _ in range(3):
+            response, content = transport.request(self.url)
+            self.assertEqual(response.status, 200)
+
+        self.assertEqual(pool.stats(), {'requests': 3, 'reused': 2, 'reuse_ratio': 2 / 3, 'created': 1})
+
+    def test_credentials_share_the_same_connections(self):
+        pool = HttpPool()
+        self.addCleanup(pool.close)
+
+        AuthorizedTransport(AnonymousCredentials(), pool).request(self.url)
+        AuthorizedTransport(AnonymousCredentials(), pool).request(self.url)
+
+        self.assertEqual(pool.stats()['reused'], 1)
+
+    def test_concurrent_requests_borrow_separate_connections(self):
+        pool = HttpPool(max_idle=2)
+        self.addCleanup(pool.close)
+        transport = AuthorizedTransport(AnonymousCredentials(), pool)
+        barrier = threading.Barrier(4)
+        borrowed = []
+
+        def borrow():
+            with pool.connection() as http:
+                borrowed.append(http)
+                barrier.wait(2)
+
+        threads = [threading.Thread(target=borrow) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        transport.request(self.url)
+
+        self.assertEqual(len({id(http) for http in borrowed}), 4)
+        # 超過 max_idle 的 Http 歸還時直接關閉
+        self.assertEqual(len(pool._idle), 2)
+        self.assertEqual(pool.stats()['created'], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
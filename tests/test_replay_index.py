@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from services.google_drive import share_url
+from services.replay_index import SYNC_TOKEN_KEY, ReplayIndex
+from services.replay_service import ReplayService, replay_content_hash
+
+
+def drive_service(files_pages=(), changes_pages=(), start_token="t1"):
+    service = mock.Mock()
+    service.files.return_value.list.return_value.execute.side_effect = list(files_pages)
+    service.changes.return_value.getStartPageToken.return_value.execute.return_value = {
+        'startPageToken': start_token,
+    }
+    service.changes.return_value.list.return_value.execute.side_effect = list(changes_pages)
+    return service
+
+
+class ReplayIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, "replay_index.json")
+
+    def _index(self, service):
+        return ReplayIndex(self.path, folder_id="folder", service_factory=lambda: service)
+
+    def test_first_sync_lists_folder_pages_then_saves_change_token(self):
+        service = drive_service(files_pages=[
+            {'files': [{'id': 'a', 'md5Checksum': 'm1'}], 'nextPageToken': 'p2'},
+            {'files': [{'id': 'b', 'md5Checksum': 'm2'}, {'id': 'folder2'}]},
+        ])
+        index = self._index(service)
+
+        self.assertEqual(index.find('m2'), share_url('b'))
+
+        self.assertEqual(index.lookup('m1'), share_url('a'))
+        self.assertEqual(index.store.get(SYNC_TOKEN_KEY), 't1')
+        self.assertEqual(service.files.return_value.list.call_args_list[1].kwargs['pageToken'], 'p2')
+        # 本地已有記錄時不再呼叫 Drive
+        self.assertEqual(ReplayIndex(self.path, service_factory=mock.Mock()).find('m1'), share_url('a'))
+
+    def test_later_syncs_only_apply_changes(self):
+        service = drive_service(changes_pages=[
+            {'changes': [{'fileId': 'c', 'file': {'md5Checksum': 'm3', 'parents': ['folder']}},
+                         {'fileId': 'a', 'removed': True}],
+             'nextPageToken': 't2'},
+            {'changes': [{'fileId': 'd', 'file': {'md5Checksum': 'm4', 'parents': ['other']}}],
+             'newStartPageToken': 't3'},
+        ])
+        index = self._index(service)
+        index.store.update({SYNC_TOKEN_KEY: 't1', 'm1': {'url': share_url('a')}})
+
+        self.assertEqual(index.find('m3'), share_url('c'))
+
+        service.files.return_value.list.assert_not_called()
+        self.assertIsNone(index.lookup('m1'))
+        self.assertIsNone(index.lookup('m4'))
+        self.assertEqual(index.store.get(SYNC_TOKEN_KEY), 't3')
+
+    def test_sync_failure_counts_as_not_found(self):
+        index = ReplayIndex(self.path, service_factory=mock.Mock(side_effect=RuntimeError("offline")))
+
+        self.assertIsNone(index.find('m1'))
+
+
+class ReplayServiceIndexTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.replay = tempfile.mkstemp(suffix=".SC2Replay")
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"replay")
+        self.addCleanup(os.remove, self.replay)
+        self.md5 = replay_content_hash(self.replay)
+
+    def test_existing_drive_file_is_reused_without_upload(self):
+        index = mock.Mock()
+        index.find.return_value = "https://drive/existing"
+        upload = mock.Mock()
+
+        self.assertEqual(ReplayService(upload, index).get_url(self.replay), "https://drive/existing")
+
+        index.find.assert_called_once_with(self.md5)
+        upload.assert_not_called()
+
+    def test_new_upload_is_recorded(self):
+        index = mock.Mock()
+        index.find.return_value = None
+        upload = mock.Mock(return_value="https://drive/new")
+
+        self.assertEqual(ReplayService(upload, index).get_url(self.replay), "https://drive/new")
+
+        index.record.assert_called_once_with(self.md5, "https://drive/new")
+
+
+if __name__ == "__main__":
+    unittest.main()
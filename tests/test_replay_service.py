@@ -0,0 +1,82 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from services.replay_service import ReplayService
+from uploaders.bilibili_uploader import BilibiliUploader
+from uploaders.youtube_uploader import YouTubeUploader
+from video_item import VideoItem
+
+
+class ReplayServiceTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".SC2Replay")
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"replay-v1")
+        self.addCleanup(os.remove, self.path)
+
+    def test_concurrent_callers_share_one_upload(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_upload(path):
+            started.set()
+            release.wait(5)
+            return "https://drive/one"
+
+        upload = mock.Mock(side_effect=slow_upload)
+        service = ReplayService(upload)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(service.get_url(self.path)))
+                   for _ in range(3)]
+        threads[0].start()
+        self.assertTrue(started.wait(5))
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(results, ["https://drive/one"] * 3)
+        upload.assert_called_once_with(self.path)
+        # 之後的呼叫直接返回記住的連結
+        self.assertEqual(service.get_url(self.path), "https://drive/one")
+        self.assertEqual(service.upload_count, 1)
+
+    def test_failure_is_not_memoized(self):
+        upload = mock.Mock(side_effect=[RuntimeError("quota"), "https://drive/ok"])
+        service = ReplayService(upload)
+
+        with self.assertRaises(RuntimeError):
+            service.get_url(self.path)
+        self.assertEqual(service.get_url(self.path), "https://drive/ok")
+
+    def test_changed_content_is_uploaded_again(self):
+        upload = mock.Mock(side_effect=["https://drive/v1", "https://drive/v2"])
+        service = ReplayService(upload)
+
+        self.assertEqual(service.get_url(self.path), "https://drive/v1")
+        with open(self.path, "wb") as f:
+            f.write(b"replay-v2")
+
+        self.assertEqual(service.get_url(self.path), "https://drive/v2")
+
+    def test_both_uploaders_share_the_replay_upload(self):
+        upload = mock.Mock(return_value="https://drive/shared")
+        service = ReplayService(upload)
+        youtube = YouTubeUploader(mock.Mock(), replay_service=service)
+        bilibili = BilibiliUploader(replay_service=service)
+
+        first = VideoItem(video_path="a.mp4", title="a", replay_path=self.path)
+        second = VideoItem(video_path="b.mp4", title="b", replay_path=self.path)
+        youtube._saved_replay_url = mock.Mock(return_value=None)
+
+        self.assertEqual(youtube.ensure_replay_uploaded(first), "https://drive/shared")
+        self.assertEqual(bilibili._ensure_replay_uploaded(second), "https://drive/shared")
+        upload.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,247 @@
+import json
+import threading
+import unittest
+from unittest import mock
+
+import httplib2
+import requests
+from googleapiclient.errors import HttpError
+from PyQt5 import QtCore
+
+from services import resilience
+from services.resilience import (
+    QUOTA_RETRY_DELAY, CircuitBreaker, CircuitOpenError, RetryBudget, call_endpoint, classify_error,
+)
+from services.task_graph import RetryLater
+from upload_manager import UploadManager
+from uploaders.bilibili_uploader import BilibiliUploader
+from uploaders.youtube_uploader import YouTubeUploader
+from video_item import UploadStatus, VideoItem
+
+
+def setUpModule():
+    global _app
+    _app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def http_error(status, reason="", headers=None):
+    resp = httplib2.Response(dict({"status": str(status)}, **(headers or {})))
+    content = json.dumps({"error": {"errors": [{"reason": reason}]}}).encode()
+    return HttpError(resp, content)
+
+
+class ErrorTaxonomyTest(unittest.TestCase):
+    def test_transient_errors_are_classified(self):
+        self.assertEqual(classify_error(http_error(503)), "server")
+        self.assertEqual(classify_error(http_error(429)), "throttled")
+        self.assertEqual(classify_error(http_error(403, "rateLimitExceeded")), "throttled")
+        self.assertEqual(classify_error(http_error(403, "quotaExceeded")), "quota")
+        self.assertEqual(classify_error(ConnectionResetError("reset")), "timeout")
+        self.assertEqual(classify_error(requests.Timeout("slow")), "timeout")
+
+    def test_permanent_errors_are_not_retried(self):
+        self.assertIsNone(classify_error(http_error(403, "forbidden")))
+        self.assertIsNone(classify_error(http_error(400)))
+        self.assertIsNone(classify_error(FileNotFoundError("gone")))
+        self.assertIsNone(classify_error(requests.exceptions.InvalidURL("bad")))
+        self.assertIsNone(classify_error(ValueError("bug")))
+
+    def test_budget_honors_retry_after_and_runs_out(self):
+        budget = RetryBudget({"server": 2})
+        error = http_error(503, headers={"retry-after": "7"})
+
+        self.assertEqual(budget.delay_for(error), 7)
+        self.assertEqual(budget.delay_for(error), 7)
+        self.assertIsNone(budget.delay_for(error))
+        self.assertIsNone(budget.delay_for(http_error(400)))
+
+    def test_quota_waits_for_the_quota_delay(self):
+        self.assertGreaterEqual(RetryBudget().delay_for(http_error(403, "quotaExceeded")), QUOTA_RETRY_DELAY)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_after_consecutive_failures_and_probes_once(self):
+        clock = [0.0]
+        breaker = CircuitBreaker("api", failure_threshold=2, reset_timeout=10, clock=lambda: clock[0])
+
+        breaker.record_failure()
+        breaker.check()
+        breaker.record_failure()
+        with self.assertRaises(CircuitOpenError) as ctx:
+            breaker.check()
+        self.assertEqual(ctx.exception.retry_in, 10)
+
+        clock[0] = 10
+        breaker.check()  # 半開：第一個呼叫試探
+        with self.assertRaises(CircuitOpenError):
+            breaker.check()
+        breaker.record_success()
+
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.check()
+
+    def test_failed_probe_reopens(self):
+        clock = [0.0]
+        breaker = CircuitBreaker("api", failure_threshold=1, reset_timeout=10, clock=lambda: clock[0])
+        breaker.record_failure()
+        clock[0] = 10
+        breaker.check()
+
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    @mock.patch.object(resilience, "_breakers", {})
+    def test_call_endpoint_turns_transient_errors_into_retry_later(self):
+        def fail():
+            raise http_error(502)
+
+        with self.assertRaises(RetryLater) as ctx:
+            call_endpoint("drive", fail, RetryBudget({"server": 1}))
+        self.assertIsInstance(ctx.exception.__cause__, HttpError)
+
+        with self.assertRaises(HttpError):
+            call_endpoint("drive", fail, RetryBudget({"server": 0}))
+        with self.assertRaises(ValueError):
+            call_endpoint("drive", lambda: (_ for _ in ()).throw(ValueError("bug")), RetryBudget())
+        self.assertEqual(call_endpoint("drive", lambda: "ok", RetryBudget()), "ok")
+
+
+@mock.patch.object(resilience, "_breakers", {})
+@mock.patch.object(resilience, "RETRY_BASE_DELAY", 0.01)
+class UploadManagerRetryTest(unittest.TestCase):
+    def _run(self, manager, videos):
+        finished = threading.Event()
+        results = []
+        manager.batch_finished.connect(
+            lambda success, fail: (results.append((success, fail)), finished.set()),
+            QtCore.Qt.DirectConnection,
+        )
+        manager.start(videos)
+        self.assertTrue(finished.wait(5))
+        return results
+
+    def test_transient_upload_failure_is_retried_without_blocking_others(self):
+        order = []
+
+        def upload(video, **kwargs):
+            order.append(video.title)
+            if order.count(video.title) < 3 and video.title == "a":
+                raise http_error(503)
+            return f"id-{video.title}"
+
+        youtube = mock.Mock()
+        youtube.upload.side_effect = upload
+        manager = UploadManager(youtube, max_workers=1)
+        videos = [VideoItem(video_path="a.mp4", title="a"), VideoItem(video_path="b.mp4", title="b")]
+
+        results = self._run(manager, videos)
+
+        self.assertEqual(results, [(2, 0)])
+        self.assertEqual(order.count("a"), 3)
+        # a 退避等待時 b 已開始上傳
+        self.assertLess(order.index("b"), len(order) - 1)
+        self.assertEqual([v.video_id for v in videos], ["id-a", "id-b"])
+
+    @mock.patch.dict(resilience.RETRY_BUDGETS, {"server": 0})
+    @mock.patch("upload_manager.REQUEUE_DELAY", 0.05)
+    def test_exhausted_budget_marks_failed_then_requeues(self):
+        statuses = []
+        youtube = mock.Mock()
+        youtube.upload.side_effect = [http_error(503), "vid"]
+        manager = UploadManager(youtube, max_workers=1)
+        manager.video_status_changed.connect(
+            lambda video: statuses.append(video.status), QtCore.Qt.DirectConnection
+        )
+        video = VideoItem(video_path="a.mp4", title="a")
+
+        results = self._run(manager, [video])
+
+        self.assertEqual(results, [(1, 0)])
+        self.assertIn(UploadStatus.FAILED, statuses)
+        self.assertEqual(video.status, UploadStatus.COMPLETED)
+        self.assertEqual(video.video_id, "vid")
+
+    @mock.patch("upload_manager.MAX_REQUEUES", 0)
+    def test_permanent_failure_is_not_requeued(self):
+        youtube = mock.Mock()
+        youtube.upload.side_effect = http_error(400)
+        manager = UploadManager(youtube, max_workers=1)
+        video = VideoItem(video_path="a.mp4", title="a")
+
+        results = self._run(manager, [video])
+
+        self.assertEqual(results, [(0, 1)])
+        self.assertEqual(youtube.upload.call_count, 1)
+
+    def test_long_drive_backoff_gives_up_the_replay_link(self):
+        youtube = mock.Mock()
+        youtube.ensure_replay_uploaded.side_effect = http_error(403, "quotaExceeded")
+        youtube.upload.return_value = "vid"
+        manager = UploadManager(youtube, max_workers=1)
+        video = VideoItem(video_path="a.mp4", title="a", replay_path="a.SC2Replay")
+
+        results = self._run(manager, [video])
+
+        # 配額用完要等一小時：不擋住 YouTube 上傳
+        self.assertEqual(results, [(1, 0)])
+        self.assertEqual(youtube.ensure_replay_uploaded.call_count, 1)
+        self.assertIsNone(video.replay_url)
+
+    def test_open_drive_breaker_skips_replay_without_failing_video(self):
+        resilience.get_breaker("drive").record_failure(open_for=60)
+        youtube = mock.Mock()
+        youtube.upload.return_value = "vid"
+        manager = UploadManager(youtube, max_workers=1)
+        video = VideoItem(video_path="a.mp4", title="a")
+
+        results = self._run(manager, [video])
+
+        self.assertEqual(results, [(1, 0)])
+        youtube.ensure_replay_uploaded.assert_not_called()
+
+
+class RetryDeferralOptInTest(unittest.TestCase):
+    def test_manager_opts_its_uploaders_into_deferral(self):
+        youtube = YouTubeUploader(mock.Mock())
+        bilibili = BilibiliUploader()
+        self.assertFalse(youtube.defer_long_retries)
+        self.assertFalse(bilibili.defer_long_retries)
+
+        UploadManager(youtube, bilibili_uploader=bilibili)
+
+        self.assertTrue(youtube.defer_long_retries)
+        self.assertTrue(bilibili.defer_long_retries)
+
+
+class YouTubeRetryHandOffTest(unittest.TestCase):
+    @mock.patch.object(resilience, "RETRY_BASE_DELAY", 10.0)
+    def test_long_backoff_is_waited_out_by_default(self):
+        uploader = YouTubeUploader(mock.Mock())
+        request = mock.Mock(resumable_uri=None, resumable_progress=0)
+        request.resumable.size.return_value = 300
+        request.next_chunk.side_effect = [ConnectionResetError("reset"), (None, {"id": "vid"})]
+
+        with mock.patch("uploaders.youtube_uploader.time.sleep") as mock_sleep:
+            self.assertEqual(uploader._resumable_upload(request), "vid")
+
+        mock_sleep.assert_called_once()
+        self.assertGreaterEqual(mock_sleep.call_args.args[0], 5)
+
+    @mock.patch.object(resilience, "RETRY_BASE_DELAY", 10.0)
+    def test_long_backoff_is_handed_to_the_caller(self):
+        uploader = YouTubeUploader(mock.Mock(), defer_long_retries=True)
+        request = mock.Mock(resumable_uri=None, resumable_progress=0)
+        request.resumable.size.return_value = 300
+        request.next_chunk.side_effect = ConnectionResetError("reset")
+
+        with mock.patch("uploaders.youtube_uploader.time.sleep") as mock_sleep:
+            with self.assertRaises(ConnectionResetError):
+                uploader._resumable_upload(request)
+
+        self.assertEqual(request.next_chunk.call_count, 1)
+        mock_sleep.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
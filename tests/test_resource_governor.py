@@ -0,0 +1,235 @@
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from googleapiclient.http import MediaFileUpload
+
+from services.resource_governor import GovernedReader, MemoryBudget, ResourceGovernor, TokenBucket
+from uploaders.base_uploader import CancellationToken, UploadCancelledError
+from uploaders.bilibili_uploader import BilibiliUploader
+from uploaders.youtube_uploader import GovernedMediaUpload, YouTubeUploader
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_acquire_is_paced_to_rate(self):
+        clock = FakeClock()
+        with mock.patch("services.resource_governor.time", clock):
+            bucket = TokenBucket(rate=1000, burst_seconds=0)
+            bucket.acquire(500)
+            bucket.acquire(500)
+            bucket.acquire(1000)
+
+        # 每次申請要等前面申請的位元組依 1000 B/s 送完才放行
+        self.assertAlmostEqual(clock.now, 101.0)
+
+    def test_burst_allows_immediate_acquire(self):
+        clock = FakeClock()
+        with mock.patch("services.resource_governor.time", clock):
+            bucket = TokenBucket(rate=1000, burst_seconds=1.0)
+            bucket.acquire(1000)
+
+        self.assertEqual(clock.sleeps, [])
+
+    def test_unlimited_never_waits(self):
+        bucket = TokenBucket()
+        bucket.acquire(10 ** 12)
+
+        bucket.set_rate(1000)
+        self.assertEqual(bucket.rate, 1000)
+        bucket.set_rate(0)
+        self.assertIsNone(bucket.rate)
+        bucket.acquire(10 ** 12)
+
+    def test_set_rate_reschedules_waiting_acquirer(self):
+        bucket = TokenBucket(rate=1, burst_seconds=0)
+        bucket.acquire(1)
+        done = threading.Event()
+
+        def worker():
+            bucket.acquire(10 ** 6)
+            done.set()
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        self.assertFalse(done.wait(0.3))
+
+        bucket.set_rate(None)
+
+        self.assertTrue(done.wait(2))
+
+    def test_cancel_interrupts_wait(self):
+        bucket = TokenBucket(rate=1, burst_seconds=0)
+        bucket.acquire(1)
+        token = CancellationToken()
+        errors = []
+
+        def worker():
+            try:
+                bucket.acquire(10 ** 6, token)
+            except UploadCancelledError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        token.cancel()
+        thread.join(2)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+
+class MemoryBudgetTest(unittest.TestCase):
+    def test_acquire_blocks_until_release(self):
+        budget = MemoryBudget(100)
+        budget.acquire(80)
+        acquired = threading.Event()
+
+        def worker():
+            budget.acquire(50)
+            acquired.set()
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        self.assertFalse(acquired.wait(0.3))
+
+        budget.release(80)
+
+        self.assertTrue(acquired.wait(2))
+        self.assertEqual(budget.in_use, 50)
+
+    def test_oversized_reservation_is_clamped_to_capacity(self):
+        budget = MemoryBudget(100)
+
+        with budget.reserve(500) as granted:
+            self.assertEqual(granted, 100)
+            self.assertEqual(budget.in_use, 100)
+        self.assertEqual(budget.in_use, 0)
+
+    def test_raising_capacity_wakes_waiters(self):
+        budget = MemoryBudget(100)
+        budget.acquire(100)
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (budget.acquire(100), acquired.set()), daemon=True)
+        thread.start()
+
+        budget.set_capacity(None)
+
+        self.assertTrue(acquired.wait(2))
+
+    def test_cancel_interrupts_wait(self):
+        budget = MemoryBudget(10)
+        budget.acquire(10)
+        token = CancellationToken()
+        token.cancel()
+
+        with self.assertRaises(UploadCancelledError):
+            budget.acquire(10, token)
+        self.assertEqual(budget.in_use, 10)
+
+
+class BilibiliMemoryBudgetTest(unittest.TestCase):
+    def test_in_flight_chunks_stay_within_budget(self):
+        fd, path = tempfile.mkstemp(suffix=".mp4")
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"x" * 1000)
+        self.addCleanup(os.remove, path)
+        governor = ResourceGovernor(memory_limit=200)
+        uploader = BilibiliUploader(chunk_concurrency=4, governor=governor)
+        peak = [0]
+        lock = threading.Lock()
+
+        def fake_upload_chunk(**kwargs):
+            with lock:
+                peak[0] = max(peak[0], governor.memory.in_use)
+            time.sleep(0.01)
+
+        uploader._upload_chunk = fake_upload_chunk
+        parts = uploader._upload_parts(path, "https://upos.example/ugc/x", "auth", "uid", 100, 1000)
+
+        self.assertEqual(len(parts), 10)
+        # 4 個並行但預算只夠 2 個分塊
+        self.assertEqual(peak[0], 200)
+        self.assertEqual(governor.memory.in_use, 0)
+
+
+class GovernedReaderTest(unittest.TestCase):
+    def test_reads_are_charged_to_both_budgets(self):
+        governor = mock.Mock(spec=ResourceGovernor)
+        reader = GovernedReader(io.BytesIO(b"x" * 250), governor)
+
+        self.assertEqual(len(reader.read(100)), 100)
+        self.assertEqual(len(reader.read(-1)), 150)
+
+        self.assertEqual([c.args[0] for c in governor.acquire_disk.call_args_list], [100, 150])
+        self.assertEqual([c.args[0] for c in governor.acquire_network.call_args_list], [100, 150])
+
+    def test_in_memory_body_skips_disk_budget(self):
+        governor = mock.Mock(spec=ResourceGovernor)
+        reader = GovernedReader(io.BytesIO(b"x" * 10), governor, charge_disk=False)
+
+        reader.read(4)
+
+        governor.acquire_disk.assert_not_called()
+        governor.acquire_network.assert_called_once_with(4, None)
+
+
+class YouTubeGovernedUploadTest(unittest.TestCase):
+    def test_unchunked_media_is_throttled_while_streaming(self):
+        fd, path = tempfile.mkstemp(suffix=".mp4")
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"x" * 4096)
+        self.addCleanup(os.remove, path)
+        governor = mock.Mock(spec=ResourceGovernor)
+        media = GovernedMediaUpload(MediaFileUpload(path, chunksize=-1, resumable=True), governor)
+
+        stream = media.stream()
+        stream.seek(0)
+        while stream.read(1024):
+            pass
+
+        # 不分塊時不會一次申請整個檔案，而是跟著傳送端的每次讀取扣配額
+        self.assertEqual([c.args[0] for c in governor.acquire_network.call_args_list],
+                         [1024, 1024, 1024, 1024, 0])
+
+    def test_non_transport_errors_are_not_retried(self):
+        uploader = YouTubeUploader(mock.Mock())
+        request = mock.Mock(resumable_uri=None, resumable_progress=0)
+        request.resumable.size.return_value = 300
+        request.next_chunk.side_effect = TypeError("bug")
+
+        with mock.patch("uploaders.youtube_uploader.time.sleep") as mock_sleep:
+            with self.assertRaises(TypeError):
+                uploader._resumable_upload(request)
+
+        self.assertEqual(request.next_chunk.call_count, 1)
+        mock_sleep.assert_not_called()
+
+    def test_transport_errors_are_retried(self):
+        uploader = YouTubeUploader(mock.Mock())
+        request = mock.Mock(resumable_uri=None, resumable_progress=0)
+        request.resumable.size.return_value = 300
+        request.next_chunk.side_effect = [ConnectionResetError("reset"), (None, {"id": "vid"})]
+
+        with mock.patch("uploaders.youtube_uploader.time.sleep"):
+            self.assertEqual(uploader._resumable_upload(request), "vid")
+
+
+if __name__ == "__main__":
+    unittest.main()
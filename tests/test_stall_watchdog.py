@@ -0,0 +1,157 @@
+import io
+import socket
+import threading
+import unittest
+from unittest import mock
+
+from services.stall_watchdog import (
+    MAX_TRANSFER_TIMEOUT, StallError, StallWatchdog, WatchedReader, transfer_timeout,
+)
+from services.google_api import AuthorizedTransport, HttpPool
+from uploaders.bilibili_uploader import BilibiliUploader
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TransferTimeoutTest(unittest.TestCase):
+    def test_timeout_scales_with_chunk_size_and_link_speed(self):
+        small = transfer_timeout(4 * 1024 * 1024, 1024 * 1024)
+        large = transfer_timeout(64 * 1024 * 1024, 1024 * 1024)
+        faster = transfer_timeout(64 * 1024 * 1024, 8 * 1024 * 1024)
+
+        self.assertLess(small, large)
+        self.assertLess(faster, large)
+        self.assertEqual(transfer_timeout(10 ** 12, 1), MAX_TRANSFER_TIMEOUT)
+
+    def test_completed_transfers_update_link_rate(self):
+        clock = FakeClock()
+        watchdog = StallWatchdog(clock=clock)
+
+        with watchdog.watch("upos", 1024 * 1024):
+            reader = WatchedReader(io.BytesIO(b"x" * 1024 * 1024))
+            clock.now += 2
+            while reader.read(64 * 1024):
+                pass
+
+        self.assertAlmostEqual(watchdog.link_rate("upos"), 512 * 1024)
+        # 量測到比預設快的連線，逾時也較短
+        self.assertLess(watchdog.timeout_for("upos", 8 * 1024 * 1024),
+                        watchdog.timeout_for("other", 8 * 1024 * 1024))
+
+
+class StallWatchdogTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.watchdog = StallWatchdog(rate_floor=1024, grace=10, clock=self.clock)
+
+    def test_slow_transfer_is_aborted_and_raises_stall_error(self):
+        aborted = []
+
+        with self.assertRaises(StallError):
+            with self.watchdog.watch("youtube", 1024 * 1024) as transfer:
+                with transfer.aborting(lambda: aborted.append(True)):
+                    reader = WatchedReader(io.BytesIO(b"x" * 1024 * 1024))
+                    reader.read(64 * 1024)
+                    self.clock.now += 5
+                    self.assertEqual(self.watchdog.check(), [])
+                    reader.read(100)
+                    self.clock.now += 10
+                    # 最近 10 秒只送出 100 bytes
+                    self.assertEqual(self.watchdog.check(), [transfer])
+                    raise ConnectionResetError("socket shut down")
+
+        self.assertEqual(aborted, [True])
+        self.assertEqual(self.watchdog.aborted, 1)
+
+    def test_time_waiting_for_bandwidth_is_not_a_stall(self):
+        clock = self.clock
+
+        class PacedReader(io.BytesIO):
+            def read(self, size=-1):
+                clock.now += 60  # 等待頻寬配額
+                return super().read(size)
+
+        with self.watchdog.watch("bilibili", 1024 * 1024) as transfer:
+            reader = WatchedReader(PacedReader(b"x" * 1024 * 1024))
+            reader.read(1024)
+            reader.read(1024)
+
+            self.assertEqual(self.watchdog.check(), [])
+            self.assertFalse(transfer.stalled)
+
+    def test_waiting_for_response_is_bounded_by_timeout(self):
+        with self.watchdog.watch("youtube", 1024) as transfer:
+            reader = WatchedReader(io.BytesIO(b"x" * 1024))
+            reader.read(1024)
+            self.clock.now += 20
+            # body 已送完，不套用速率下限
+            self.assertEqual(self.watchdog.check(), [])
+            self.clock.now += transfer.timeout
+            self.assertEqual(self.watchdog.check(), [transfer])
+            self.assertIn("仍未完成", transfer.reason)
+
+    def test_new_requests_are_refused_after_abort(self):
+        with self.watchdog.watch("youtube", 1024) as transfer:
+            transfer.abort("test")
+            with self.assertRaises(StallError):
+                with transfer.aborting(lambda: None):
+                    pass
+
+
+class HalfOpenConnectionTest(unittest.TestCase):
+    def setUp(self):
+        # 接受連線但從不讀取：模擬網路中斷後對方不再回應的連線
+        self.server = socket.socket()
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(1)
+        self.addCleanup(self.server.close)
+        self.connections = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        try:
+            self.connections.append(self.server.accept()[0])
+        except OSError:
+            pass
+
+    def test_stalled_chunk_put_is_aborted(self):
+        watchdog = StallWatchdog(rate_floor=64 * 1024, grace=0.3, poll_interval=0.05)
+        uploader = BilibiliUploader(watchdog=watchdog)
+        data = memoryview(b"x" * 16 * 1024 * 1024)
+        url = "http://127.0.0.1:%d/upos" % self.server.getsockname()[1]
+
+        with self.assertRaises(StallError):
+            uploader._upload_chunk(url, "auth", "uid", 1, 0, 1, len(data), 0, len(data), len(data), data)
+
+        self.assertEqual(watchdog.aborted, 1)
+        for connection in self.connections:
+            connection.close()
+
+    def test_google_transport_shuts_down_the_borrowed_connection(self):
+        sock = mock.Mock()
+        http = mock.Mock(connections={"https:www.googleapis.com": mock.Mock(sock=sock)})
+        transport = AuthorizedTransport(mock.Mock(), HttpPool(http_factory=lambda: http))
+        watchdog = StallWatchdog()
+
+        def stalled_request(*args, **kwargs):
+            watchdog_transfer.abort("test")
+            raise ConnectionResetError("reset")
+
+        with mock.patch("services.google_api.AuthorizedHttp") as authorized:
+            authorized.return_value.request.side_effect = stalled_request
+            with self.assertRaises(StallError):
+                with watchdog.watch("youtube", 1024) as watchdog_transfer:
+                    transport.request("https://www.googleapis.com/upload", "PUT")
+
+        sock.shutdown.assert_called_once_with(socket.SHUT_RDWR)
+
+
+if __name__ == "__main__":
+    unittest.main()
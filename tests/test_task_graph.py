@@ -0,0 +1,157 @@
+import threading
+import time
+import unittest
+
+from services.task_graph import RetryLater, TaskGraphExecutor, TaskState
+
+
+class TaskGraphExecutorTest(unittest.TestCase):
+    def test_tasks_run_after_their_dependencies(self):
+        order = []
+        graph = TaskGraphExecutor({"a": 2, "b": 2})
+        graph.add("first", "a", lambda: order.append("first"))
+        graph.add("second", "b", lambda: order.append("second"), deps=["first"])
+        graph.add("third", "a", lambda: order.append("third"), deps=["second"])
+
+        graph.start()
+
+        self.assertTrue(graph.wait(5))
+        self.assertEqual(order, ["first", "second", "third"])
+
+    def test_stage_limit_bounds_concurrency(self):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def work():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+        graph = TaskGraphExecutor({"upload": 2})
+        for i in range(6):
+            graph.add(i, "upload", work)
+
+        graph.start()
+
+        self.assertTrue(graph.wait(5))
+        self.assertEqual(peak[0], 2)
+
+    def test_failure_skips_dependents_and_reports_group(self):
+        groups = {}
+        done = threading.Event()
+
+        def on_group_done(group, tasks):
+            groups[group] = {key: task.state for key, task in tasks.items()}
+            if len(groups) == 2:
+                done.set()
+
+        def boom():
+            raise RuntimeError("boom")
+
+        graph = TaskGraphExecutor({"s": 2}, on_group_done=on_group_done)
+        graph.add("a1", "s", boom, group="a")
+        graph.add("a2", "s", lambda: None, deps=["a1"], group="a")
+        graph.add("a3", "s", lambda: None, deps=["a2"], group="a")
+        graph.add("b1", "s", lambda: None, group="b")
+
+        graph.start()
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual(groups["a"], {"a1": TaskState.FAILED, "a2": TaskState.SKIPPED, "a3": TaskState.SKIPPED})
+        self.assertEqual(groups["b"], {"b1": TaskState.SUCCEEDED})
+        self.assertIsInstance(graph.tasks_in("a")["a1"].error, RuntimeError)
+
+    def test_ordered_stage_starts_in_insertion_order(self):
+        release_slow = threading.Event()
+        order = []
+        graph = TaskGraphExecutor({"prepare": 2, "upload": 1}, ordered_stages=["upload"])
+        graph.add("prep-a", "prepare", lambda: release_slow.wait(5))
+        graph.add("up-a", "upload", lambda: order.append("a"), deps=["prep-a"])
+        graph.add("prep-b", "prepare", lambda: None)
+        graph.add("up-b", "upload", lambda: order.append("b"), deps=["prep-b"])
+
+        graph.start()
+        time.sleep(0.1)
+        # b 已可執行，但 a 還沒準備好，b 不能插隊
+        self.assertEqual(order, [])
+        release_slow.set()
+
+        self.assertTrue(graph.wait(5))
+        self.assertEqual(order, ["a", "b"])
+
+    def test_cancel_skips_tasks_not_started(self):
+        started = threading.Event()
+        release = threading.Event()
+        graph = TaskGraphExecutor({"s": 1})
+        graph.add("running", "s", lambda: (started.set(), release.wait(5)))
+        graph.add("queued", "s", lambda: None)
+        graph.add("dependent", "s", lambda: None, deps=["running"])
+
+        graph.start()
+        self.assertTrue(started.wait(5))
+        graph.cancel()
+        release.set()
+
+        self.assertTrue(graph.wait(5))
+        states = {key: task.state for key, task in graph.tasks_in(None).items()}
+        self.assertEqual(states, {"running": TaskState.SUCCEEDED, "queued": TaskState.SKIPPED,
+                                  "dependent": TaskState.SKIPPED})
+
+    def test_retry_later_frees_the_slot_while_waiting(self):
+        order = []
+        attempts = [0]
+
+        def flaky():
+            attempts[0] += 1
+            order.append(f"a{attempts[0]}")
+            if attempts[0] == 1:
+                raise RetryLater(0.2)
+
+        graph = TaskGraphExecutor({"s": 1}, ordered_stages=["s"])
+        graph.add("a", "s", flaky)
+        graph.add("b", "s", lambda: order.append("b"))
+
+        graph.start()
+
+        self.assertTrue(graph.wait(5))
+        # a 等待重試時不佔名額，後面的 b 先執行
+        self.assertEqual(order, ["a1", "b", "a2"])
+        task = graph.tasks_in(None)["a"]
+        self.assertEqual(task.state, TaskState.SUCCEEDED)
+        self.assertEqual(task.retries, 1)
+
+    def test_cancel_skips_tasks_waiting_for_retry(self):
+        started = threading.Event()
+
+        def always_later():
+            started.set()
+            raise RetryLater(60)
+
+        graph = TaskGraphExecutor({"s": 1})
+        graph.add("a", "s", always_later)
+        graph.add("b", "s", lambda: None, deps=["a"])
+
+        graph.start()
+        self.assertTrue(started.wait(5))
+        time.sleep(0.05)
+        graph.cancel()
+
+        self.assertTrue(graph.wait(5))
+        states = {key: task.state for key, task in graph.tasks_in(None).items()}
+        self.assertEqual(states, {"a": TaskState.SKIPPED, "b": TaskState.SKIPPED})
+
+    def test_unknown_dependency_is_rejected(self):
+        graph = TaskGraphExecutor({"s": 1})
+
+        with self.assertRaises(ValueError):
+            graph.add("a", "s", lambda: None, deps=["missing"])
+        with self.assertRaises(ValueError):
+            graph.add("b", "unknown-stage", lambda: None)
+
+
+if __name__ == "__main__":
+    unittest.main()
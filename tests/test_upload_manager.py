@@ -0,0 +1,214 @@
+import threading
+import unittest
+from unittest import mock
+
+from PyQt5 import QtCore
+
+from upload_manager import UploadManager
+from uploaders.progress import UploadProgress, UploadStage
+from video_item import UploadStatus, VideoItem
+
+
+def setUpModule():
+    # UploadManager 的進度計時器需要 Qt 應用程式實例
+    global _app
+    _app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+class UploadManagerTest(unittest.TestCase):
+    def _make_manager(self, youtube_uploader, max_workers=2, bilibili_uploader=None):
+        manager = UploadManager(youtube_uploader, bilibili_uploader=bilibili_uploader, max_workers=max_workers)
+        finished = threading.Event()
+        results = []
+        manager.batch_finished.connect(
+            lambda success, fail: (results.append((success, fail)), finished.set()),
+            QtCore.Qt.DirectConnection,
+        )
+        return manager, finished, results
+
+    def test_uploads_run_off_the_calling_thread_in_parallel(self):
+        caller = threading.get_ident()
+        barrier = threading.Barrier(2, timeout=5)
+        threads = []
+
+        def fake_upload(video, **kwargs):
+            threads.append(threading.get_ident())
+            barrier.wait()
+            return f"id-{video.title}"
+
+        youtube = mock.Mock()
+        youtube.upload.side_effect = fake_upload
+        manager, finished, results = self._make_manager(youtube, max_workers=2)
+        videos = [VideoItem(video_path="a.mp4", title="a"), VideoItem(video_path="b.mp4", title="b")]
+
+        manager.start(videos)
+
+        self.assertTrue(finished.wait(5))
+        self.assertEqual(results, [(2, 0)])
+        self.assertNotIn(caller, threads)
+        self.assertEqual([v.video_id for v in videos], ["id-a", "id-b"])
+        self.assertTrue(all(v.status == UploadStatus.COMPLETED for v in videos))
+        self.assertFalse(manager.is_running)
+
+    def test_failed_video_does_not_stop_the_batch(self):
+        youtube = mock.Mock()
+        youtube.upload.side_effect = [RuntimeError("boom"), "vid"]
+        manager, finished, results = self._make_manager(youtube, max_workers=1)
+        videos = [VideoItem(video_path="a.mp4", title="a"), VideoItem(video_path="b.mp4", title="b")]
+
+        manager.start(videos)
+
+        self.assertTrue(finished.wait(5))
+        self.assertEqual(results, [(1, 1)])
+        self.assertEqual(videos[0].status, UploadStatus.FAILED)
+        self.assertEqual(videos[0].error_message, "boom")
+        self.assertEqual(videos[1].status, UploadStatus.COMPLETED)
+
+    def test_stop_on_failure_cancels_remaining_videos(self):
+        youtube = mock.Mock()
+        youtube.upload.side_effect = [RuntimeError("boom"), "vid"]
+        manager, finished, results = self._make_manager(youtube, max_workers=1)
+        manager.stop_on_failure = True
+        videos = [VideoItem(video_path="a.mp4", title="a"), VideoItem(video_path="b.mp4", title="b")]
+
+        manager.start(videos)
+
+        self.assertTrue(finished.wait(5))
+        self.assertTrue(manager.was_cancelled)
+        self.assertEqual(results, [(0, 2)])
+        self.assertEqual(videos[0].status, UploadStatus.FAILED)
+        self.assertEqual(videos[1].status, UploadStatus.PENDING)
+        self.assertEqual(youtube.upload.call_count, 1)
+
+    def test_playlist_items_are_sent_in_one_batch_when_batch_finishes(self):
+        youtube = mock.Mock()
+        youtube.upload.side_effect = ["id-a", "id-b"]
+        manager, finished, results = self._make_manager(youtube, max_workers=1)
+        videos = [
+            VideoItem(video_path="a.mp4", title="a", playlist_ids=["PL1", "PL2"]),
+            VideoItem(video_path="b.mp4", title="b", playlist_ids=["PL1"]),
+        ]
+
+        manager.start(videos)
+
+        self.assertTrue(finished.wait(5))
+        youtube.add_to_playlist.assert_not_called()
+        youtube.add_videos_to_playlists.assert_called_once_with(
+            [("id-a", "PL1"), ("id-a", "PL2"), ("id-b", "PL1")]
+        )
+
+    def test_thumbnail_overlaps_next_video_upload(self):
+        thumbnail_started = threading.Event()
+        overlapped = []
+
+        def fake_upload(video, **kwargs):
+            if video.title == "b":
+                overlapped.append(thumbnail_started.wait(5))
+            return f"id-{video.title}"
+
+        youtube = mock.Mock()
+        youtube.upload.side_effect = fake_upload
+        youtube.set_thumbnail.side_effect = lambda *args: thumbnail_started.set()
+        manager, finished, results = self._make_manager(youtube, max_workers=1)
+        videos = [
+            VideoItem(video_path="a.mp4", title="a", thumbnail_path="a.jpg"),
+            VideoItem(video_path="b.mp4", title="b"),
+        ]
+
+        manager.start(videos)
+
+        self.assertTrue(finished.wait(5))
+        self.assertEqual(results, [(2, 0)])
+        # b 的上傳（只有一個上傳名額）進行中時，a 的縮圖已經開始
+        self.assertEqual(overlapped, [True])
+        youtube.set_thumbnail.assert_called_once_with("id-a", "a.jpg")
+
+    def test_bilibili_status_advances_independently(self):
+        youtube = mock.Mock()
+        youtube.upload.return_value = "vid"
+        bilibili = mock.Mock()
+        bilibili.upload.side_effect = RuntimeError("cookie expired")
+        manager, finished, results = self._make_manager(youtube, max_workers=1, bilibili_uploader=bilibili)
+        video = VideoItem(video_path="a.mp4", title="a")
+
+        manager.start([video])
+
+        self.assertTrue(finished.wait(5))
+        self.assertEqual(results, [(1, 0)])
+
+        self.assertEqual(video.status, UploadStatus.COMPLETED)
+        self.assertEqual(video.bilibili_status, UploadStatus.FAILED)
+        self.assertEqual(video.bilibili_error_message, "cookie expired")
+
+    def test_youtube_and_bilibili_upload_at_the_same_time(self):
+        # 兩個平台都在等對方開始時才結束，依序執行會逾時
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fake_upload(video, **kwargs):
+            barrier.wait()
+            return "id"
+
+        youtube = mock.Mock()
+        youtube.upload.side_effect = fake_upload
+        bilibili = mock.Mock()
+        bilibili.upload.side_effect = fake_upload
+        manager, finished, results = self._make_manager(youtube, max_workers=1, bilibili_uploader=bilibili)
+        video = VideoItem(video_path="a.mp4", title="a")
+
+        manager.start([video])
+
+        self.assertTrue(finished.wait(5))
+        self.assertEqual(results, [(1, 0)])
+
+        self.assertEqual(video.status, UploadStatus.COMPLETED)
+        self.assertEqual(video.bilibili_status, UploadStatus.COMPLETED)
+
+    def test_cancel_returns_in_flight_video_to_pending(self):
+        started = threading.Event()
+
+        def fake_upload(video, progress_callback=None, cancel_token=None):
+            started.set()
+            while True:
+                cancel_token.sleep(0.01)
+
+        youtube = mock.Mock()
+        youtube.upload.side_effect = fake_upload
+        manager, finished, results = self._make_manager(youtube, max_workers=1)
+        videos = [VideoItem(video_path="a.mp4", title="a"), VideoItem(video_path="b.mp4", title="b")]
+
+        manager.start(videos)
+        self.assertTrue(started.wait(5))
+        manager.cancel()
+
+        self.assertTrue(finished.wait(5))
+        self.assertTrue(manager.was_cancelled)
+        self.assertEqual(results, [(0, 2)])
+        self.assertEqual([v.status for v in videos], [UploadStatus.PENDING, UploadStatus.PENDING])
+        self.assertEqual(youtube.upload.call_count, 1)
+
+    def test_progress_is_coalesced_per_video_and_platform(self):
+        manager = UploadManager(mock.Mock())
+        video = VideoItem(video_path="a.mp4", title="a")
+        events = []
+        manager.video_progress.connect(lambda v, p: events.append(p), QtCore.Qt.DirectConnection)
+
+        for sent in range(1, 101):
+            manager._report_progress(video, UploadProgress("youtube", sent, 100))
+        manager._report_progress(video, UploadProgress("youtube", 0, 0, stage=UploadStage.THUMBNAIL))
+        manager._flush_progress()
+
+        self.assertEqual([(e.bytes_sent, e.stage) for e in events],
+                         [(100, UploadStage.BYTES), (0, UploadStage.THUMBNAIL)])
+        events.clear()
+        manager._flush_progress()
+        self.assertEqual(events, [])
+
+    def test_max_workers_is_clamped(self):
+        manager = UploadManager(mock.Mock(), max_workers=0)
+        self.assertEqual(manager.max_workers, 1)
+        manager.max_workers = 100
+        self.assertLessEqual(manager.max_workers, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
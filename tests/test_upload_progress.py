@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+
+from googleapiclient.http import MediaUploadProgress
+
+from uploaders.progress import ProgressTracker
+from uploaders.youtube_uploader import YOUTUBE_CHUNK_ALIGNMENT, YouTubeUploader
+
+
+class ProgressTrackerTest(unittest.TestCase):
+    @mock.patch("uploaders.progress.time.monotonic")
+    def test_reports_rate_and_eta(self, mock_monotonic):
+        mock_monotonic.side_effect = [0.0, 2.0, 4.0]
+        events = []
+        tracker = ProgressTracker("youtube", 1000, events.append)
+
+        tracker.update(200)
+        progress = tracker.update(400)
+
+        self.assertEqual(len(events), 2)
+        self.assertEqual(progress.bytes_sent, 400)
+        self.assertAlmostEqual(progress.bytes_per_second, 100.0)
+        self.assertAlmostEqual(progress.eta_seconds, 6.0)
+        self.assertAlmostEqual(progress.fraction, 0.4)
+
+    def test_advance_accumulates_from_initial_bytes(self):
+        tracker = ProgressTracker("bilibili", 1000, initial_bytes=300)
+
+        tracker.advance(100)
+        progress = tracker.advance(600)
+
+        self.assertEqual(progress.bytes_sent, 1000)
+        self.assertTrue(progress.is_complete)
+
+
+class YouTubeChunkedUploadTest(unittest.TestCase):
+    def test_chunk_size_is_aligned(self):
+        uploader = YouTubeUploader(mock.Mock(), chunk_size=YOUTUBE_CHUNK_ALIGNMENT + 1)
+        self.assertEqual(uploader.chunk_size, 2 * YOUTUBE_CHUNK_ALIGNMENT)
+        uploader.chunk_size = -1
+        self.assertEqual(uploader.chunk_size, -1)
+
+    def test_progress_callback_called_for_every_chunk(self):
+        uploader = YouTubeUploader(mock.Mock())
+        request = mock.Mock(resumable_uri=None, resumable_progress=0)
+        request.resumable.size.return_value = 300
+        request.next_chunk.side_effect = [
+            (MediaUploadProgress(100, 300), None),
+            (MediaUploadProgress(200, 300), None),
+            (None, {"id": "vid"}),
+        ]
+        events = []
+
+        video_id = uploader._resumable_upload(request, progress_callback=events.append)
+
+        self.assertEqual(video_id, "vid")
+        self.assertEqual([e.bytes_sent for e in events], [100, 200, 300])
+        self.assertTrue(all(e.total_bytes == 300 for e in events))
+
+
+if __name__ == "__main__":
+    unittest.main()
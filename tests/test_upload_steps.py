@@ -0,0 +1,163 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from PyQt5 import QtCore
+
+from services.upload_checkpoints import UploadCheckpoints
+from upload_manager import UploadManager
+from uploaders.bilibili_uploader import BilibiliUploadFile, BilibiliUploader
+from video_item import (
+    STEP_BYTES, STEP_COVER, STEP_SUBMIT, STEP_THUMBNAIL, StepState, UploadStatus, VideoItem, playlist_step,
+)
+
+
+def setUpModule():
+    global _app
+    _app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+class VideoItemStepsTest(unittest.TestCase):
+    def test_steps_survive_to_dict_and_from_dict(self):
+        video = VideoItem(video_path="v.mp4", title="t", playlist_ids=["PL1", "PL2"])
+        video.set_video_id("vid")
+        video.set_step_state("youtube", STEP_THUMBNAIL, StepState.FAILED)
+        video.set_step_state("youtube", playlist_step("PL1"), StepState.DONE)
+        video.bilibili_filename = "n123"
+        video.bilibili_cid = 42
+
+        restored = VideoItem.from_dict(video.to_dict())
+
+        self.assertTrue(restored.is_step_done("youtube", STEP_BYTES))
+        self.assertEqual(restored.step_state("youtube", STEP_THUMBNAIL), StepState.FAILED)
+        self.assertEqual(restored.pending_playlist_ids, ["PL2"])
+        self.assertEqual((restored.bilibili_filename, restored.bilibili_cid), ("n123", 42))
+
+    def test_missing_or_unknown_steps_are_pending(self):
+        restored = VideoItem.from_dict({"video_path": "v.mp4", "title": "t",
+                                        "upload_steps": {"youtube": {"bytes": "bogus"}}})
+
+        self.assertEqual(restored.step_state("youtube", STEP_BYTES), StepState.PENDING)
+
+
+class UploadManagerStepsTest(unittest.TestCase):
+    def _run(self, manager, videos):
+        finished = threading.Event()
+        results = []
+        manager.batch_finished.connect(
+            lambda success, fail: (results.append((success, fail)), finished.set()),
+            QtCore.Qt.DirectConnection,
+        )
+        manager.start(videos)
+        self.assertTrue(finished.wait(5))
+        return results
+
+    def test_failed_thumbnail_is_retried_without_reuploading(self):
+        youtube = mock.Mock()
+        youtube.upload.return_value = "vid"
+        youtube.set_thumbnail.side_effect = [ValueError("bad image"), True]
+        video = VideoItem(video_path="a.mp4", title="a", thumbnail_path="a.jpg")
+
+        self.assertEqual(self._run(UploadManager(youtube, max_workers=1), [video]), [(0, 1)])
+        self.assertEqual(video.status, UploadStatus.FAILED)
+        self.assertIn("縮圖", video.error_message)
+        self.assertTrue(video.needs_upload)
+
+        self.assertEqual(self._run(UploadManager(youtube, max_workers=1), [video]), [(1, 0)])
+
+        self.assertEqual(youtube.upload.call_count, 1)
+        self.assertEqual(youtube.set_thumbnail.call_count, 2)
+        self.assertEqual(video.status, UploadStatus.COMPLETED)
+        self.assertTrue(video.is_step_done("youtube", STEP_THUMBNAIL))
+
+    def test_rerun_only_adds_the_playlists_that_failed(self):
+        youtube = mock.Mock()
+        youtube.upload.return_value = "vid"
+        youtube.add_videos_to_playlists.side_effect = [
+            {("vid", "PL1"): None, ("vid", "PL2"): "forbidden"},
+            {("vid", "PL2"): None},
+        ]
+        video = VideoItem(video_path="a.mp4", title="a", playlist_ids=["PL1", "PL2"])
+
+        self.assertEqual(self._run(UploadManager(youtube, max_workers=1), [video]), [(0, 1)])
+        self.assertEqual(video.status, UploadStatus.FAILED)
+        self.assertEqual(video.pending_playlist_ids, ["PL2"])
+
+        self._run(UploadManager(youtube, max_workers=1), [video])
+
+        self.assertEqual(youtube.upload.call_count, 1)
+        youtube.add_videos_to_playlists.assert_called_with([("vid", "PL2")])
+        self.assertEqual(video.pending_playlist_ids, [])
+
+    def test_checkpoint_survives_a_restart(self):
+        youtube = mock.Mock()
+        youtube.upload.return_value = "vid"
+        youtube.set_thumbnail.side_effect = [ValueError("bad image"), True]
+        with tempfile.TemporaryDirectory() as tmp:
+            video_path = os.path.join(tmp, "a.mp4")
+            with open(video_path, "wb") as f:
+                f.write(b"video")
+            checkpoints_path = os.path.join(tmp, "checkpoints.json")
+
+            video = VideoItem(video_path=video_path, title="a", thumbnail_path="a.jpg")
+            manager = UploadManager(youtube, max_workers=1, checkpoints=UploadCheckpoints(checkpoints_path))
+            self.assertEqual(self._run(manager, [video]), [(0, 1)])
+
+            # 重新啟動後由檔案重新建立的影片
+            video = VideoItem(video_path=video_path, title="a", thumbnail_path="a.jpg")
+            checkpoints = UploadCheckpoints(checkpoints_path)
+            manager = UploadManager(youtube, max_workers=1, checkpoints=checkpoints)
+            self.assertEqual(self._run(manager, [video]), [(1, 0)])
+
+            self.assertEqual(youtube.upload.call_count, 1)
+            self.assertEqual(video.video_id, "vid")
+            self.assertEqual(youtube.set_thumbnail.call_count, 2)
+            self.assertEqual(checkpoints.store.items(), {})
+
+    def test_submitted_bilibili_archive_is_not_uploaded_again(self):
+        youtube = mock.Mock()
+        youtube.upload.return_value = "vid"
+        bilibili = mock.Mock()
+        video = VideoItem(video_path="a.mp4", title="a")
+        video.set_bilibili_video_id("BV1xx")
+
+        self._run(UploadManager(youtube, bilibili_uploader=bilibili, max_workers=1), [video])
+
+        bilibili.upload.assert_not_called()
+        self.assertEqual(video.bilibili_status, UploadStatus.COMPLETED)
+
+
+class BilibiliStepsTest(unittest.TestCase):
+    def _make_uploader(self):
+        uploader = BilibiliUploader()
+        uploader._ensure_auth = mock.Mock()
+        uploader.cookies = mock.Mock(csrf="csrf")
+        uploader._upload_cover = mock.Mock(return_value="https://cover")
+        uploader._upload_video_file = mock.Mock(return_value=BilibiliUploadFile(filename="n123", cid=42))
+        return uploader
+
+    def test_failed_submit_is_retried_without_reuploading_file_or_cover(self):
+        uploader = self._make_uploader()
+        uploader._post_json = mock.Mock(side_effect=[RuntimeError("archive rejected"),
+                                                     {"data": {"bvid": "BV1xx", "aid": 1}}])
+        video = VideoItem(video_path="a.mp4", title="a", thumbnail_path="a.jpg")
+
+        with self.assertRaises(RuntimeError):
+            uploader.upload(video)
+        self.assertTrue(video.is_step_done("bilibili", STEP_BYTES))
+        self.assertTrue(video.is_step_done("bilibili", STEP_COVER))
+        self.assertFalse(video.is_step_done("bilibili", STEP_SUBMIT))
+
+        self.assertEqual(uploader.upload(video), "BV1xx")
+
+        uploader._upload_video_file.assert_called_once()
+        uploader._upload_cover.assert_called_once()
+        payload = uploader._post_json.call_args.kwargs["json_body"]
+        self.assertEqual(payload["videos"][0]["filename"], "n123")
+        self.assertEqual(payload["cover"], "https://cover")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+from googleapiclient.http import MediaUploadProgress
+
+from services.upload_tuner import AimdController, UploadTuner
+from uploaders.bilibili_uploader import BilibiliUploader
+from uploaders.youtube_uploader import YOUTUBE_CHUNK_ALIGNMENT, YouTubeUploader
+
+
+class AimdControllerTest(unittest.TestCase):
+    def _feed_window(self, controller, clock, num_bytes, seconds):
+        for _ in range(controller.window):
+            clock[0] += seconds / controller.window
+            controller.record_success(num_bytes // controller.window, seconds / controller.window)
+
+    @mock.patch("services.upload_tuner.time.monotonic")
+    def test_additive_increase_then_revert_to_best(self, mock_monotonic):
+        clock = [0.0]
+        mock_monotonic.side_effect = lambda: clock[0]
+        controller = AimdController(initial=2, minimum=1, maximum=8, step=1, window=2)
+
+        self._feed_window(controller, clock, 1000, 1.0)   # 1000 B/s at 2
+        self.assertEqual(controller.value, 3)
+        self._feed_window(controller, clock, 2000, 1.0)   # 2000 B/s at 3
+        self.assertEqual(controller.value, 4)
+        self._feed_window(controller, clock, 1000, 1.0)   # worse at 4: back to 3
+
+        self.assertEqual(controller.value, 3)
+        self.assertEqual(controller.best_value, 3)
+
+    def test_failure_is_multiplicative_decrease(self):
+        controller = AimdController(initial=8, minimum=1, maximum=8, step=1)
+
+        controller.record_failure()
+        self.assertEqual(controller.value, 4)
+        controller.record_failure()
+        controller.record_failure()
+        controller.record_failure()
+        self.assertEqual(controller.value, 1)
+
+    def test_values_are_aligned_to_granularity(self):
+        controller = AimdController(initial=1000, minimum=256, maximum=4096, step=256, granularity=256)
+
+        self.assertEqual(controller.value, 768)
+        controller.record_failure()
+        self.assertEqual(controller.value, 256)
+
+
+class UploadTunerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.state_path = os.path.join(self.tmpdir.name, "tuning.json")
+
+    def test_best_value_is_remembered_per_endpoint(self):
+        tuner = UploadTuner(self.state_path)
+        controller = tuner.controller("bilibili-concurrency:a", default=3, minimum=1, maximum=8, step=1)
+        for _ in range(controller.window):
+            controller.record_success(1000, 0.1)
+
+        restarted = UploadTuner(self.state_path)
+
+        self.assertEqual(restarted.controller("bilibili-concurrency:a", 3, 1, 8, 1).value, 3)
+        self.assertEqual(restarted.controller("bilibili-concurrency:b", 5, 1, 8, 1).value, 5)
+        self.assertIs(tuner.controller("bilibili-concurrency:a", 3, 1, 8, 1), controller)
+
+    def test_bilibili_in_flight_limit_follows_controller(self):
+        fd, video_path = tempfile.mkstemp(suffix=".mp4")
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"x" * 1000)
+        self.addCleanup(os.remove, video_path)
+        tuner = UploadTuner(self.state_path)
+        tuner.store.set("bilibili-concurrency:upos.example", {"value": 1})
+        uploader = BilibiliUploader(chunk_concurrency=4, tuner=tuner)
+        in_flight = []
+        peak = [0]
+        lock = threading.Lock()
+
+        def fake_upload_chunk(**kwargs):
+            with lock:
+                in_flight.append(kwargs["part_number"])
+                peak[0] = max(peak[0], len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.remove(kwargs["part_number"])
+
+        uploader._upload_chunk = fake_upload_chunk
+        parts = uploader._upload_parts(video_path, "https://upos.example/ugc/x", "auth", "uid", 100, 1000)
+
+        self.assertEqual(len(parts), 10)
+        # 起始為保存的 1，之後每 4 個分塊最多加 1
+        self.assertLess(peak[0], 4)
+
+    # 逾時的分塊會先在重試額度內重送，縮短重送前的等待
+    @mock.patch("uploaders.bilibili_uploader.BILIBILI_RETRY_BASE_DELAY", 0.001)
+    def test_bilibili_chunk_failure_backs_off(self):
+        fd, video_path = tempfile.mkstemp(suffix=".mp4")
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"x" * 200)
+        self.addCleanup(os.remove, video_path)
+        tuner = UploadTuner(self.state_path)
+        uploader = BilibiliUploader(chunk_concurrency=4, tuner=tuner)
+        uploader._upload_chunk = mock.Mock(side_effect=requests.Timeout("slow"))
+
+        with self.assertRaises(requests.Timeout):
+            uploader._upload_parts(video_path, "https://upos.example/ugc/x", "auth", "uid", 100, 200)
+
+        controller = tuner.controller("bilibili-concurrency:upos.example", 4, 1, 8, 1)
+        self.assertLess(controller.value, 4)
+
+    def test_youtube_chunk_size_is_adjusted_between_chunks(self):
+        tuner = UploadTuner(self.state_path)
+        uploader = YouTubeUploader(mock.Mock(), chunk_size=8 * YOUTUBE_CHUNK_ALIGNMENT, tuner=tuner)
+        request = mock.Mock(resumable_uri=None, resumable_progress=0)
+        request.resumable.size.return_value = 300
+        request.next_chunk.side_effect = [
+            (MediaUploadProgress(100, 300), None),
+            ConnectionResetError("reset"),
+            (None, {"id": "vid"}),
+        ]
+
+        with mock.patch("uploaders.youtube_uploader.time.sleep"):
+            self.assertEqual(uploader._resumable_upload(request), "vid")
+
+        sizes = [c.args[0] for c in request.resumable.set_chunksize.call_args_list]
+        self.assertEqual(sizes[0], 8 * YOUTUBE_CHUNK_ALIGNMENT)
+        # 失敗後分塊減半
+        self.assertEqual(sizes[1], 4 * YOUTUBE_CHUNK_ALIGNMENT)
+        self.assertEqual(uploader._initial_chunk_size(), sizes[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from googleapiclient import discovery
+from googleapiclient.http import HttpMockSequence
+
+from uploaders.youtube_uploader import YouTubeUploader
+from video_item import VideoItem
+
+
+BOUNDARY = "batch_boundary"
+
+
+def batch_response(*parts):
+    """組成 YouTube 批次端點的 multipart 回應，parts 為 (狀態碼, JSON 字串)"""
+    body = ""
+    for index, (status, payload) in enumerate(parts, start=1):
+        body += (
+            f"--{BOUNDARY}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <response-x + {index}>\r\n\r\n"
+            f"HTTP/1.1 {status} OK\r\n"
+            "Content-Type: application/json\r\n\r\n"
+            f"{payload}\r\n"
+        )
+    body += f"--{BOUNDARY}--"
+    return ({"status": "200", "content-type": f'multipart/mixed; boundary="{BOUNDARY}"'}, body.encode())
+
+
+class YouTubeMetadataTest(unittest.TestCase):
+    def _make_uploader(self, responses):
+        self.http = HttpMockSequence(responses)
+        youtube = discovery.build("youtube", "v3", http=self.http, static_discovery=True)
+        patcher = mock.patch("uploaders.youtube_uploader.get_service", return_value=youtube)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return YouTubeUploader(mock.Mock())
+
+    def test_playlist_inserts_share_one_request_and_report_errors_per_item(self):
+        uploader = self._make_uploader([
+            batch_response((200, '{"id": "item-1"}'), (404, '{"error": {"code": 404, "message": "playlist not found"}}'),
+                           (200, '{"id": "item-3"}')),
+        ])
+
+        results = uploader.add_videos_to_playlists([("v1", "PL1"), ("v1", "PL2"), ("v2", "PL1")])
+
+        self.assertEqual(results[("v1", "PL1")], None)
+        self.assertIn("playlist not found", results[("v1", "PL2")])
+        self.assertEqual(results[("v2", "PL1")], None)
+        # 三個插入只用了一個 HTTP 請求
+        self.assertEqual(self.http._iterable, [])
+
+    def test_add_to_playlist_is_false_when_any_item_fails(self):
+        uploader = self._make_uploader([
+            batch_response((200, '{"id": "item-1"}'), (403, '{"error": {"code": 403, "message": "forbidden"}}')),
+        ])
+
+        self.assertFalse(uploader.add_to_playlist("v1", ["PL1", "PL2"]))
+
+    @mock.patch("uploaders.youtube_uploader.YOUTUBE_BATCH_LIMIT", 2)
+    def test_large_batches_are_split(self):
+        uploader = self._make_uploader([
+            batch_response((200, '{"id": "a"}'), (200, '{"id": "b"}')),
+            batch_response((200, '{"id": "c"}')),
+        ])
+
+        results = uploader.add_videos_to_playlists([("v1", "PL1"), ("v2", "PL1"), ("v3", "PL1")])
+
+        self.assertEqual(list(results.values()), [None, None, None])
+
+
+class YouTubeLocalizationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.video_path = os.path.join(self.tmpdir.name, "video.mp4")
+        with open(self.video_path, "wb") as f:
+            f.write(b"x" * 100)
+        self.uploader = YouTubeUploader(
+            mock.Mock(), session_store_path=os.path.join(self.tmpdir.name, "sessions.json")
+        )
+        self.uploader._resumable_upload = mock.Mock(return_value="vid")
+        self.uploader.add_localizations = mock.Mock()
+
+    @mock.patch("services.google_api.discovery.build")
+    def test_localizations_are_sent_with_insert(self, mock_build):
+        video = VideoItem(video_path=self.video_path, title="[PvZ] Protoss vs Zerg")
+
+        self.uploader.upload(video)
+
+        insert = mock_build.return_value.videos.return_value.insert
+        kwargs = insert.call_args.kwargs
+        self.assertEqual(kwargs["part"], "snippet,status,localizations")
+        self.assertEqual(kwargs["body"]["snippet"]["defaultLanguage"], "en")
+        localizations = kwargs["body"]["localizations"]
+        self.assertEqual(set(localizations), {"zh-TW", "ja", "ko"})
+        self.assertIn("神族", localizations["zh-TW"]["title"])
+        self.assertIn("プロトス", localizations["ja"]["description"])
+        self.uploader.add_localizations.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import httplib2
+
+from uploaders.youtube_uploader import YouTubeUploader
+from video_item import VideoItem
+
+
+class YouTubeResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.video_path = os.path.join(self.tmpdir.name, "video.mp4")
+        with open(self.video_path, "wb") as f:
+            f.write(b"x" * 1000)
+        self.session_path = os.path.join(self.tmpdir.name, "sessions.json")
+
+    def _make_uploader(self):
+        return YouTubeUploader(mock.Mock(), session_store_path=self.session_path)
+
+    def _interrupted_upload(self, uploader, video):
+        request = mock.Mock(resumable_uri="https://upload.example/session-1", resumable_progress=400)
+        request.next_chunk.side_effect = KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            uploader._resumable_upload(request, video)
+
+    def test_interrupted_upload_persists_session(self):
+        uploader = self._make_uploader()
+        video = VideoItem(video_path=self.video_path, title="t")
+
+        self._interrupted_upload(uploader, video)
+
+        self.assertEqual(video.youtube_upload_uri, "https://upload.example/session-1")
+        self.assertEqual(video.youtube_uploaded_bytes, 400)
+        restored = VideoItem.from_dict(video.to_dict())
+        self.assertEqual(restored.youtube_upload_uri, "https://upload.example/session-1")
+        self.assertEqual(restored.youtube_uploaded_bytes, 400)
+
+    def test_restart_resumes_from_committed_range(self):
+        self._interrupted_upload(self._make_uploader(), VideoItem(video_path=self.video_path, title="t"))
+
+        uploader = self._make_uploader()
+        video = VideoItem(video_path=self.video_path, title="t")
+        request = mock.Mock(resumable_uri=None, resumable_progress=0)
+        request.http.request.return_value = (
+            httplib2.Response({"status": 308, "range": "bytes=0-511"}),
+            b"",
+        )
+
+        result = uploader._restore_upload_session(video, request)
+
+        self.assertIsNone(result)
+        self.assertEqual(request.resumable_uri, "https://upload.example/session-1")
+        self.assertEqual(request.resumable_progress, 512)
+        args, kwargs = request.http.request.call_args
+        self.assertEqual(args[0], "https://upload.example/session-1")
+        self.assertEqual(kwargs["headers"]["Content-Range"], "bytes */1000")
+
+    def test_restart_returns_video_id_when_upload_had_completed(self):
+        self._interrupted_upload(self._make_uploader(), VideoItem(video_path=self.video_path, title="t"))
+
+        uploader = self._make_uploader()
+        video = VideoItem(video_path=self.video_path, title="t")
+        request = mock.Mock(resumable_uri=None, resumable_progress=0)
+        request.http.request.return_value = (httplib2.Response({"status": 200}), b'{"id": "abc"}')
+
+        self.assertEqual(uploader._restore_upload_session(video, request), "abc")
+
+    def test_failed_status_query_defers_to_upload_retry(self):
+        self._interrupted_upload(self._make_uploader(), VideoItem(video_path=self.video_path, title="t"))
+
+        for failure in (httplib2.ServerNotFoundError("dns"), ConnectionResetError("reset")):
+            uploader = self._make_uploader()
+            video = VideoItem(video_path=self.video_path, title="t")
+            request = mock.Mock(resumable_uri=None, resumable_progress=0, _in_error_state=False)
+            request.http.request.side_effect = failure
+
+            self.assertIsNone(uploader._restore_upload_session(video, request))
+            self.assertEqual(request.resumable_uri, "https://upload.example/session-1")
+            self.assertEqual(request.resumable_progress, 400)
+            self.assertTrue(request._in_error_state)
+            self.assertIn(uploader._session_key(video), uploader.session_store.items())
+
+    def test_unparsable_completion_defers_to_upload_retry(self):
+        self._interrupted_upload(self._make_uploader(), VideoItem(video_path=self.video_path, title="t"))
+
+        uploader = self._make_uploader()
+        video = VideoItem(video_path=self.video_path, title="t")
+        request = mock.Mock(resumable_uri=None, resumable_progress=0, _in_error_state=False)
+        request.http.request.return_value = (httplib2.Response({"status": 200}), b"<html>proxy</html>")
+
+        self.assertIsNone(uploader._restore_upload_session(video, request))
+        self.assertTrue(request._in_error_state)
+
+    @mock.patch("services.google_api.discovery.build")
+    @mock.patch("uploaders.youtube_uploader.MediaFileUpload")
+    @mock.patch("services.replay_service.google_drive.upload_replay")
+    def test_resumed_upload_reuses_saved_replay_url(self, mock_upload_replay, mock_media, mock_build):
+        first = VideoItem(video_path=self.video_path, title="t", replay_path="game.SC2Replay")
+        first.set_replay_url("https://drive.example/replay")
+        self._interrupted_upload(self._make_uploader(), first)
+
+        uploader = self._make_uploader()
+        uploader._restore_upload_session = mock.Mock(return_value=None)
+        uploader._resumable_upload = mock.Mock(return_value="vid")
+        video = VideoItem(video_path=self.video_path, title="t", replay_path="game.SC2Replay")
+
+        self.assertEqual(uploader.upload(video), "vid")
+
+        mock_upload_replay.assert_not_called()
+        self.assertEqual(video.replay_url, "https://drive.example/replay")
+        self.assertIn("https://drive.example/replay", video.description)
+
+    def test_expired_session_starts_fresh(self):
+        self._interrupted_upload(self._make_uploader(), VideoItem(video_path=self.video_path, title="t"))
+
+        uploader = self._make_uploader()
+        video = VideoItem(video_path=self.video_path, title="t")
+        request = mock.Mock(resumable_uri=None, resumable_progress=0)
+        request.http.request.return_value = (httplib2.Response({"status": 404}), b"")
+
+        self.assertIsNone(uploader._restore_upload_session(video, request))
+        self.assertIsNone(request.resumable_uri)
+        self.assertEqual(uploader.session_store.items(), {})
+        self.assertIsNone(video.youtube_upload_uri)
+
+
+if __name__ == "__main__":
+    unittest.main()
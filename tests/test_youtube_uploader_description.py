@@ -1,14 +1,14 @@
 import unittest
 from unittest import mock
 
-from uploaders.youtube_uploader import YouTubeUploader
+from uploaders.youtube_uploader import GovernedMediaUpload, YouTubeUploader
 from video_item import VideoItem
 
 
 class YouTubeUploaderDescriptionTest(unittest.TestCase):
-    @mock.patch("uploaders.youtube_uploader.googleapiclient.discovery.build")
-    @mock.patch("uploaders.youtube_uploader.MediaFileUpload")
-    def test_upload_persists_description_onto_video(self, mock_media_upload, mock_build):
+    @mock.patch("services.google_api.discovery.build")
+    @mock.patch("uploaders.youtube_uploader.SourceMediaUpload")
+    def test_upload_persists_description_onto_video(self, mock_source_media, mock_build):
         token_manager = mock.Mock()
         token_manager.get_youtube_credentials.return_value = mock.Mock(valid=True)
 
@@ -22,6 +22,11 @@ class YouTubeUploaderDescriptionTest(unittest.TestCase):
         self.assertEqual(video_id, "fake_video_id")
         self.assertIn("Test Title", video.description)
         self.assertIn("#starcraft2", video.description)
+        # 影片位元組經由共用檔案來源讀取，再包上限速
+        self.assertEqual(mock_source_media.call_args.args, ("dummy.mp4",))
+        media_body = mock_build.return_value.videos.return_value.insert.call_args.kwargs["media_body"]
+        self.assertIsInstance(media_body, GovernedMediaUpload)
+        mock_source_media.return_value.close.assert_called_once()
 
 
 if __name__ == "__main__":
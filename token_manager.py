@@ -5,6 +5,7 @@ Token 管理器 - 統一管理所有 OAuth Token
 
 import os
 import pickle
+import threading
 from datetime import datetime
 from typing import Dict, Optional
 from dataclasses import dataclass
@@ -54,6 +55,8 @@ class TokenManager:
         """初始化 Token 管理器"""
         self._youtube_creds: Optional[Credentials] = None
         self._google_drive_creds: Optional[Credentials] = None
+        # 上傳工作執行緒會同時取得憑證，避免重複刷新同一個 token
+        self._lock = threading.RLock()
     
     def check_all_tokens(self) -> Dict[str, TokenStatus]:
         """
@@ -219,28 +222,29 @@ class TokenManager:
         Returns:
             Credentials: YouTube 憑證，如果無效則返回 None
         """
-        if self._youtube_creds and self._youtube_creds.valid:
-            return self._youtube_creds
+        with self._lock:
+            if self._youtube_creds and self._youtube_creds.valid:
+                return self._youtube_creds
         
-        creds = self._load_credentials(
-            self.YOUTUBE_TOKEN_FILE,
-            self.YOUTUBE_SCOPES
-        )
+            creds = self._load_credentials(
+                self.YOUTUBE_TOKEN_FILE,
+                self.YOUTUBE_SCOPES
+            )
         
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                try:
-                    creds.refresh(Request())
-                    self._save_credentials(creds, self.YOUTUBE_TOKEN_FILE)
-                    self._youtube_creds = creds
-                    return creds
-                except Exception as e:
-                    print(f"自動刷新 YouTube token 失敗: {str(e)}")
-                    return None
-            return None
+            if not creds or not creds.valid:
+                if creds and creds.expired and creds.refresh_token:
+                    try:
+                        creds.refresh(Request())
+                        self._save_credentials(creds, self.YOUTUBE_TOKEN_FILE)
+                        self._youtube_creds = creds
+                        return creds
+                    except Exception as e:
+                        print(f"自動刷新 YouTube token 失敗: {str(e)}")
+                        return None
+                return None
         
-        self._youtube_creds = creds
-        return creds
+            self._youtube_creds = creds
+            return creds
     
     def get_google_drive_credentials(self) -> Optional[Credentials]:
         """
@@ -249,28 +253,29 @@ class TokenManager:
         Returns:
             Credentials: Google Drive 憑證，如果無效則返回 None
         """
-        if self._google_drive_creds and self._google_drive_creds.valid:
-            return self._google_drive_creds
+        with self._lock:
+            if self._google_drive_creds and self._google_drive_creds.valid:
+                return self._google_drive_creds
         
-        creds = self._load_credentials(
-            self.GOOGLE_DRIVE_TOKEN_FILE,
-            self.GOOGLE_DRIVE_SCOPES
-        )
+            creds = self._load_credentials(
+                self.GOOGLE_DRIVE_TOKEN_FILE,
+                self.GOOGLE_DRIVE_SCOPES
+            )
         
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                try:
-                    creds.refresh(Request())
-                    self._save_credentials(creds, self.GOOGLE_DRIVE_TOKEN_FILE)
-                    self._google_drive_creds = creds
-                    return creds
-                except Exception as e:
-                    print(f"自動刷新 Google Drive token 失敗: {str(e)}")
-                    return None
-            return None
+            if not creds or not creds.valid:
+                if creds and creds.expired and creds.refresh_token:
+                    try:
+                        creds.refresh(Request())
+                        self._save_credentials(creds, self.GOOGLE_DRIVE_TOKEN_FILE)
+                        self._google_drive_creds = creds
+                        return creds
+                    except Exception as e:
+                        print(f"自動刷新 Google Drive token 失敗: {str(e)}")
+                        return None
+                return None
         
-        self._google_drive_creds = creds
-        return creds
+            self._google_drive_creds = creds
+            return creds
     
     def _load_credentials(self, token_file: str, scopes: list) -> Optional[Credentials]:
         """
@@ -0,0 +1,724 @@
+"""
+批次上傳管理器
+把每部影片拆成相依的任務（Replay、YouTube 上傳、縮圖、B站）交給任務相依圖在背景執行，
+透過 Qt 訊號回報狀態給 GUI；暫時性錯誤經由 services.resilience 退避後重新排入，不佔用工作執行緒；
+各步驟完成後記錄在 VideoItem 上，重新上傳時只執行未完成的步驟
+"""
+
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from PyQt5 import QtCore
+
+from services.channel_inventory import ChannelInventory
+from services.fingerprint_index import FingerprintIndex
+from services.google_api import get_transport_stats
+from services.resilience import CircuitOpenError, RetryBudget, call_endpoint, classify_error
+from services.task_graph import RetryLater, Task, TaskGraphExecutor, TaskState
+from services.upload_checkpoints import UploadCheckpoints
+from uploaders.base_uploader import CancellationToken, UploadCancelledError, check_cancelled
+from uploaders.bilibili_uploader import BilibiliUploader
+from uploaders.progress import UploadProgress, UploadStage, report_stage
+from uploaders.youtube_uploader import YouTubeUploader
+from video_item import (
+    STEP_BYTES, STEP_SUBMIT, STEP_THUMBNAIL, StepState, UploadStatus, VideoItem, playlist_step,
+)
+
+
+# 同時上傳的影片數
+DEFAULT_MAX_WORKERS = 2
+MAX_WORKERS_LIMIT = 8
+
+# 各階段同時執行的任務數（YouTube / B站的位元組傳輸由 max_workers 決定）
+DRIVE_STAGE_LIMIT = 2
+METADATA_STAGE_LIMIT = 4
+
+# 進度事件合併後送往 GUI 的間隔（毫秒）
+PROGRESS_FLUSH_INTERVAL_MS = 250
+
+# 重試額度用完的暫時性失敗：標記失敗後隔多久自動重新排入、最多重新排入幾次
+REQUEUE_DELAY = 10 * 60
+MAX_REQUEUES = 2
+
+# Replay 連結是選用的：退避超過這個秒數時不再等待，不附連結繼續
+# （YouTube 依列表順序上傳，等待中的 Replay 會擋住後面所有影片）
+REPLAY_MAX_RETRY_DELAY = 5
+
+
+class UploadManager(QtCore.QObject):
+    """
+    批次上傳管理器
+
+    每部影片是一組相依的任務：
+    - replay（Drive）：上傳 Replay，取得描述與 B站投稿需要的連結
+    - youtube：上傳影片位元組（相依 replay）
+    - metadata：縮圖等只需要影片 ID 的步驟（相依 youtube）
+    - bilibili：上傳 B站（相依 replay，與 YouTube 互相獨立）
+
+    各階段有各自的並行上限，一部影片的 metadata 會與下一部影片的上傳重疊。
+    replay、youtube、bilibili 任務經由各端點的斷路器呼叫：暫時性錯誤在退避後重新排入，
+    額度用完時先標記失敗，REQUEUE_DELAY 秒後再自動重新排入；等待期間不佔用工作執行緒，
+    一個端點故障時其他端點的任務照常進行。
+    影片位元組、縮圖、各播放清單等步驟完成後記錄在影片上：重新上傳失敗的影片時略過已完成的步驟，
+    例如只有縮圖失敗的影片只會重新設定縮圖，不會重新上傳影片。
+    訊號由工作執行緒發出，Qt 會自動以 queued connection 轉送到 GUI 執行緒。
+    """
+
+    # 單部影片狀態變更（參數為 VideoItem）
+    video_status_changed = QtCore.pyqtSignal(object)
+    # 單部影片進度 / 階段（參數為 VideoItem, UploadProgress），每秒最多數次
+    video_progress = QtCore.pyqtSignal(object, object)
+    # 批次進度（已完成數, 總數）
+    batch_progress = QtCore.pyqtSignal(int, int)
+    # 批次結束（成功數, 失敗數）
+    batch_finished = QtCore.pyqtSignal(int, int)
+
+    def __init__(self, youtube_uploader: YouTubeUploader,
+                 bilibili_uploader: Optional[BilibiliUploader] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 stop_on_failure: bool = False,
+                 fingerprint_index: Optional[FingerprintIndex] = None,
+                 channel_inventory: Optional[ChannelInventory] = None,
+                 checkpoints: Optional[UploadCheckpoints] = None,
+                 parent: Optional[QtCore.QObject] = None):
+        """
+        初始化上傳管理器
+
+        Args:
+            youtube_uploader: YouTube 上傳器
+            bilibili_uploader: B站上傳器（None 表示不上傳 B站）
+            max_workers: 同時上傳的影片數
+            stop_on_failure: 任一部影片失敗時是否停止整個批次（False 表示繼續上傳其餘影片）
+            fingerprint_index: 影片指紋索引（None 表示不記錄、不檢查重複）
+            channel_inventory: 頻道內容快取（None 表示不檢查頻道上標題相同的影片）
+            checkpoints: 上傳步驟檢查點（None 表示程式重啟後不保留已完成的步驟）
+            parent: Qt 父物件
+        """
+        super().__init__(parent)
+        self.youtube_uploader = youtube_uploader
+        # 長時間的退避交回任務相依圖重新排入，不在工作執行緒中等待
+        youtube_uploader.defer_long_retries = True
+        self.bilibili_uploader = bilibili_uploader
+        self.max_workers = max_workers
+        self.stop_on_failure = stop_on_failure
+        self.fingerprint_index = fingerprint_index
+        self.channel_inventory = channel_inventory
+        self.checkpoints = checkpoints
+
+        self._lock = threading.Lock()
+        self._graph: Optional[TaskGraphExecutor] = None
+        self._videos: List[VideoItem] = []
+        self._total = 0
+        self._success_count = 0
+        self._fail_count = 0
+        # 計為成功的影片（批次結束時加入播放清單失敗要改計為失敗）
+        self._succeeded: set = set()
+        self._cancel_token = CancellationToken()
+        # 已上傳完成、等批次結束時一併加入播放清單的 (影片, 播放清單 ID)
+        self._pending_playlist_items: List[Tuple[VideoItem, str]] = []
+        # 批次開始時的 Google API 連線統計（批次結束時回報這個批次的連線重用率）
+        self._transport_stats: Dict[str, float] = {}
+        # (影片, 端點) 的重試額度與已自動重新排入的次數
+        self._retry_budgets: Dict[Tuple[int, str], RetryBudget] = {}
+        self._requeues: Dict[Tuple[int, str], int] = {}
+
+        # 工作執行緒只記錄最新的進度，由 GUI 執行緒的計時器定期合併送出
+        self._pending_progress: Dict[Tuple[int, str, bool], Tuple[VideoItem, UploadProgress]] = {}
+        self._progress_timer = QtCore.QTimer(self)
+        self._progress_timer.setInterval(PROGRESS_FLUSH_INTERVAL_MS)
+        self._progress_timer.timeout.connect(self._flush_progress)
+
+    @property
+    def bilibili_uploader(self) -> Optional[BilibiliUploader]:
+        """B站上傳器（None 表示不上傳 B站）"""
+        return self._bilibili_uploader
+
+    @bilibili_uploader.setter
+    def bilibili_uploader(self, uploader: Optional[BilibiliUploader]):
+        # 長時間的分塊退避交回任務相依圖重新排入，不在工作執行緒中等待
+        if uploader is not None:
+            uploader.defer_long_retries = True
+        self._bilibili_uploader = uploader
+
+    @property
+    def max_workers(self) -> int:
+        """同時上傳的影片數"""
+        return self._max_workers
+
+    @max_workers.setter
+    def max_workers(self, value: int):
+        self._max_workers = max(1, min(int(value), MAX_WORKERS_LIMIT))
+
+    @property
+    def is_running(self) -> bool:
+        """是否有批次正在執行"""
+        with self._lock:
+            return self._graph is not None
+
+    @property
+    def was_cancelled(self) -> bool:
+        """目前（或上一次）批次是否被取消"""
+        return self._cancel_token.is_cancelled
+
+    def find_duplicates(self, videos: List[VideoItem]) -> List[Tuple[VideoItem, Dict[str, str]]]:
+        """
+        在送出任何位元組之前找出重複的影片
+
+        只讀取檔案開頭與結尾的取樣，並查詢本地的頻道內容快取（不呼叫 API）
+
+        Args:
+            videos: 待上傳的影片列表
+
+        Returns:
+            List[Tuple[VideoItem, Dict[str, str]]]: 重複的影片與其已上傳的平台影片 ID；
+            已在任一個要上傳的平台上（指紋相同，或 YouTube 頻道上有相同標題）的影片附上這些平台的 ID，
+            與批次中較前面的影片相同者為空 dict；已上傳位元組、只差後續步驟的影片不算重複
+        """
+        platforms = {"youtube"} if self.bilibili_uploader is None else {"youtube", "bilibili"}
+        duplicates = []
+        seen = set()
+        for video in videos:
+            self._restore_checkpoint(video)
+            if video.video_id and video.is_step_done("youtube", STEP_BYTES):
+                continue
+            uploaded = self.fingerprint_index.lookup(video.video_path) if self.fingerprint_index else {}
+            if not uploaded.get("youtube") and self.channel_inventory is not None:
+                video_id = self.channel_inventory.find_title(video.title)
+                if video_id:
+                    uploaded = dict(uploaded, youtube=video_id)
+            uploaded = {platform: video_id for platform, video_id in uploaded.items()
+                        if platform in platforms and video_id}
+            if uploaded:
+                duplicates.append((video, uploaded))
+                continue
+            if self.fingerprint_index is None:
+                continue
+            try:
+                fingerprint = self.fingerprint_index.fingerprint(video.video_path)
+            except OSError:
+                continue
+            if fingerprint in seen:
+                duplicates.append((video, {}))
+            seen.add(fingerprint)
+        return duplicates
+
+    def start(self, videos: List[VideoItem]):
+        """
+        開始批次上傳（立即返回，不會阻塞呼叫端）
+
+        Args:
+            videos: 待上傳的影片列表
+
+        Raises:
+            RuntimeError: 已有批次正在執行
+        """
+        with self._lock:
+            if self._graph is not None:
+                raise RuntimeError("已有批次上傳正在執行")
+            self._total = len(videos)
+            self._success_count = 0
+            self._fail_count = 0
+            self._succeeded = set()
+            self._cancel_token = CancellationToken()
+            self._pending_playlist_items = []
+            self._retry_budgets = {}
+            self._requeues = {}
+            self._transport_stats = get_transport_stats()
+            self._videos = list(videos)
+            graph = self._graph = self._create_graph(self._on_video_done)
+
+        if not videos:
+            self._finish_batch()
+            return
+
+        self._progress_timer.start()
+
+        for index, video in enumerate(videos):
+            self._restore_checkpoint(video)
+            if video.status != UploadStatus.SKIPPED:
+                video.set_status(UploadStatus.PENDING)
+            self._add_video_tasks(graph, index, video)
+        graph.start()
+
+    def _restore_checkpoint(self, video: VideoItem):
+        """
+        套用影片檔案保存的檢查點，並在之後每次步驟狀態改變時保存
+
+        Args:
+            video: 影片資料
+        """
+        if self.checkpoints is None:
+            return
+        self.checkpoints.restore(video)
+        video.on_checkpoint = self.checkpoints.save
+
+    def wait(self, timeout: Optional[float] = None):
+        """
+        等待目前批次的所有影片處理完成
+
+        Args:
+            timeout: 等待秒數上限
+        """
+        with self._lock:
+            graph = self._graph
+        if graph is not None:
+            graph.wait(timeout)
+
+    def cancel(self):
+        """
+        取消目前批次
+
+        尚未開始的影片直接取消；上傳中的影片在下一個分塊之前停止，
+        已上傳的部分保留在續傳紀錄中，影片狀態回到待上傳
+        """
+        self._cancel_token.cancel()
+        with self._lock:
+            graph = self._graph
+        if graph is not None:
+            graph.cancel()
+
+    def shutdown(self):
+        """取消所有影片（關閉程式時使用；執行中的任務在下一個分塊前停止，全部結束後執行緒池自動關閉）"""
+        self.cancel()
+
+    def _create_graph(self, on_video_done) -> TaskGraphExecutor:
+        """
+        建立依目前設定限制各階段並行數的任務相依圖
+
+        Args:
+            on_video_done: 一部影片的任務全部結束時的回呼
+
+        Returns:
+            TaskGraphExecutor: 任務相依圖
+        """
+        return TaskGraphExecutor(
+            {
+                "drive": DRIVE_STAGE_LIMIT,
+                "youtube": self.max_workers,
+                "metadata": METADATA_STAGE_LIMIT,
+                "bilibili": self.max_workers,
+            },
+            on_group_done=on_video_done,
+            # 影片依列表順序開始上傳
+            ordered_stages=("youtube", "bilibili"),
+            thread_name_prefix="upload-worker",
+        )
+
+    def _add_video_tasks(self, graph: TaskGraphExecutor, index: int, video: VideoItem):
+        """
+        把一部影片的任務加入相依圖（已略過的平台不加入）
+
+        Args:
+            graph: 任務相依圖
+            index: 影片在批次中的序號（作為任務群組）
+            video: 影片資料
+        """
+        graph.add((index, "replay"), "drive", lambda: self._run_replay(video), group=index)
+        if video.status != UploadStatus.SKIPPED:
+            graph.add((index, "youtube"), "youtube", lambda: self._run_youtube(video),
+                      deps=[(index, "replay")], group=index)
+            graph.add((index, "metadata"), "metadata", lambda: self._run_metadata(video),
+                      deps=[(index, "youtube")], group=index)
+        if self.bilibili_uploader is not None and video.bilibili_status != UploadStatus.SKIPPED:
+            graph.add((index, "bilibili"), "bilibili", lambda: self._process_bilibili(video),
+                      deps=[(index, "replay")], group=index)
+
+    def _run_replay(self, video: VideoItem):
+        """
+        replay 任務：上傳 Replay 到 Google Drive
+
+        暫時性錯誤只在退避不超過 REPLAY_MAX_RETRY_DELAY 秒時重試；較長的退避（例如配額用完）、
+        額度用完、Drive 暫停使用中或永久性錯誤時不附連結繼續上傳影片
+
+        Args:
+            video: 影片資料
+        """
+        check_cancelled(self._cancel_token)
+        try:
+            self._call_resilient(video, "drive", lambda: self.youtube_uploader.ensure_replay_uploaded(
+                video,
+                progress_callback=lambda progress: self._report_progress(video, progress),
+                raise_errors=True,
+            ), requeue=False)
+        except RetryLater as e:
+            if e.delay <= REPLAY_MAX_RETRY_DELAY:
+                raise
+            print(f"Replay 需要等待 {e.delay:.0f} 秒後重試，不附 Replay 連結繼續: {str(e)}")
+        except UploadCancelledError:
+            raise
+        except Exception as e:
+            print(f"Replay 上傳失敗，不附 Replay 連結繼續: {str(e)}")
+
+    def _run_youtube(self, video: VideoItem) -> str:
+        """
+        youtube 任務：上傳影片位元組（多國語言隨上傳送出），並把播放清單排入批次結束時的批次請求
+
+        位元組已上傳過（只有後續步驟失敗）的影片沿用原本的影片 ID，只排入尚未加入的播放清單
+
+        Args:
+            video: 影片資料
+
+        Returns:
+            str: YouTube 影片 ID
+        """
+        video.set_status(UploadStatus.UPLOADING)
+        self.video_status_changed.emit(video)
+
+        if video.video_id and video.is_step_done("youtube", STEP_BYTES):
+            print(f"影片已上傳（{video.video_id}），只執行未完成的步驟: {video.title}")
+            self._queue_playlist_items(video)
+            return video.video_id
+
+        print(f"\n{'='*60}")
+        print(f"開始上傳: {video.title}")
+        print(f"{'='*60}")
+
+        try:
+            video_id = self._call_resilient(video, "youtube", lambda: self.youtube_uploader.upload(
+                video,
+                progress_callback=lambda progress: self._report_progress(video, progress),
+                cancel_token=self._cancel_token,
+            ))
+        except RetryLater:
+            raise
+        except UploadCancelledError:
+            video.set_status(UploadStatus.PENDING)
+            print(f"⏹ 已取消: {video.title}")
+            self.video_status_changed.emit(video)
+            raise
+        except Exception as e:
+            video.set_status(UploadStatus.FAILED, str(e))
+            print(f"❌ 影片上傳失敗: {video.title}: {str(e)}")
+            self.video_status_changed.emit(video)
+            if self.stop_on_failure:
+                print("已設定失敗時停止，取消剩餘影片")
+                self.cancel()
+            raise
+        video.set_video_id(video_id)
+        self._record_fingerprint(video, "youtube", video_id)
+        self._queue_playlist_items(video)
+        return video_id
+
+    def _queue_playlist_items(self, video: VideoItem):
+        """
+        把影片尚未加入的播放清單排入批次結束時的批次請求
+
+        Args:
+            video: 影片資料
+        """
+        playlist_ids = video.pending_playlist_ids
+        if playlist_ids:
+            print(f"排入播放清單批次...")
+            with self._lock:
+                self._pending_playlist_items.extend((video, playlist_id) for playlist_id in playlist_ids)
+
+    def _run_metadata(self, video: VideoItem):
+        """
+        metadata 任務：執行縮圖等未完成的步驟後標記 YouTube 完成（與下一部影片的上傳重疊）
+
+        已完成的步驟略過；任一步驟失敗時任務失敗，影片標記為失敗，重新上傳時只重試失敗的步驟
+
+        Args:
+            video: 影片資料
+
+        Raises:
+            RetryLater: 步驟遇到暫時性錯誤，稍後重新執行任務
+            RuntimeError: 有步驟失敗
+        """
+        def on_progress(progress: UploadProgress):
+            self._report_progress(video, progress)
+
+        steps = []
+        if video.has_thumbnail and not video.is_step_done("youtube", STEP_THUMBNAIL):
+            steps.append((STEP_THUMBNAIL, "縮圖", UploadStage.THUMBNAIL,
+                          lambda: self.youtube_uploader.set_thumbnail(video.video_id, video.thumbnail_path)))
+
+        failures = []
+        for step, label, stage, fn in steps:
+            print(f"設定{label}...")
+            report_stage(on_progress, "youtube", stage)
+            try:
+                self._call_resilient(video, "youtube", fn)
+            except RetryLater:
+                raise
+            except Exception as e:
+                video.set_step_state("youtube", step, StepState.FAILED)
+                failures.append(f"{label}設定失敗: {str(e)}")
+                continue
+            video.set_step_state("youtube", step, StepState.DONE)
+        if failures:
+            raise RuntimeError(f"影片已上傳，但{'；'.join(failures)}（重新上傳時只重試未完成的步驟）")
+
+        report_stage(on_progress, "youtube", UploadStage.DONE)
+        video.set_status(UploadStatus.COMPLETED)
+        self.video_status_changed.emit(video)
+        print(f"✅ 影片上傳成功: {video.title}")
+
+    def _video_succeeded(self, video: VideoItem, tasks: Dict[Hashable, Task]) -> bool:
+        """
+        依影片的任務結果判斷 YouTube 是否成功，並把沒有開始的影片狀態歸位
+
+        Args:
+            video: 影片資料
+            tasks: 影片的所有任務
+
+        Returns:
+            bool: YouTube 是否成功（YouTube 已略過的影片依 B站是否成功）
+        """
+        states = {key[1]: task.state for key, task in tasks.items()}
+        if states.get("youtube") == TaskState.SKIPPED:
+            # 取消時還沒開始上傳
+            video.set_status(UploadStatus.PENDING)
+            self.video_status_changed.emit(video)
+        if states.get("bilibili") == TaskState.SKIPPED and video.bilibili_status != UploadStatus.PENDING:
+            video.bilibili_status = UploadStatus.PENDING
+            self.video_status_changed.emit(video)
+        metadata = next((task for key, task in tasks.items() if key[1] == "metadata"), None)
+        if metadata is not None and metadata.state == TaskState.FAILED:
+            video.set_status(UploadStatus.FAILED, str(metadata.error))
+            self.video_status_changed.emit(video)
+        if video.status == UploadStatus.SKIPPED:
+            return video.bilibili_status == UploadStatus.COMPLETED
+        return states.get("youtube") == TaskState.SUCCEEDED and states.get("metadata") == TaskState.SUCCEEDED
+
+    def _process_bilibili(self, video: VideoItem):
+        """
+        在工作執行緒中上傳單部影片到 B站（已投稿的影片直接略過）
+
+        Args:
+            video: 影片資料
+        """
+        def on_progress(progress: UploadProgress):
+            self._report_progress(video, progress)
+
+        check_cancelled(self._cancel_token)
+        if video.bilibili_video_id and video.is_step_done("bilibili", STEP_SUBMIT):
+            return
+        video.bilibili_status = UploadStatus.UPLOADING
+        self.video_status_changed.emit(video)
+        try:
+            video.set_bilibili_video_id(self._call_resilient(video, "bilibili", lambda: self.bilibili_uploader.upload(
+                video, progress_callback=on_progress, cancel_token=self._cancel_token
+            )))
+            self._record_fingerprint(video, "bilibili", video.bilibili_video_id)
+            report_stage(on_progress, "bilibili", UploadStage.DONE)
+        except RetryLater:
+            raise
+        except UploadCancelledError:
+            video.bilibili_status = UploadStatus.PENDING
+            print(f"⏹ B站已取消: {video.title}")
+        except Exception as e:
+            video.bilibili_status = UploadStatus.FAILED
+            video.bilibili_error_message = str(e)
+            print(f"❌ B站上傳失敗: {video.title}: {str(e)}")
+        self.video_status_changed.emit(video)
+
+    def _call_resilient(self, video: VideoItem, endpoint: str, fn, requeue: bool = True):
+        """
+        經由端點的斷路器與影片的重試額度呼叫 fn
+
+        暫時性錯誤與斷路器開啟時拋出 RetryLater（任務讓出工作執行緒，退避後重新排入）；
+        額度用完時標記失敗並在 REQUEUE_DELAY 秒後重新排入，最多 MAX_REQUEUES 次
+
+        Args:
+            video: 影片資料
+            endpoint: 端點（'drive'、'youtube' 或 'bilibili'）
+            fn: 呼叫內容
+            requeue: 額度用完或斷路器開啟時是否重新排入（False 時拋出錯誤，由呼叫端略過這一步）
+
+        Returns:
+            fn 的回傳值
+
+        Raises:
+            RetryLater: 稍後重新執行任務
+            Exception: 永久性錯誤，或不再重試的錯誤
+        """
+        key = (id(video), endpoint)
+        with self._lock:
+            budget = self._retry_budgets.setdefault(key, RetryBudget())
+        try:
+            return call_endpoint(endpoint, fn, budget)
+        except RetryLater as e:
+            self._on_retry_scheduled(video, endpoint, e)
+            raise
+        except CircuitOpenError as e:
+            if not requeue:
+                raise
+            retry = RetryLater(e.retry_in, str(e))
+            self._on_retry_scheduled(video, endpoint, retry)
+            raise retry from e
+        except Exception as e:
+            if not requeue or classify_error(e) is None or self._cancel_token.is_cancelled:
+                raise
+            with self._lock:
+                requeues = self._requeues.get(key, 0)
+                if requeues >= MAX_REQUEUES:
+                    raise
+                self._requeues[key] = requeues + 1
+                budget.reset()
+            self._mark_requeued(video, endpoint, e)
+            raise RetryLater(REQUEUE_DELAY, f"{endpoint} 重試額度用完，稍後重新排入: {str(e)}") from e
+
+    def _on_retry_scheduled(self, video: VideoItem, endpoint: str, retry: RetryLater):
+        """
+        回報影片正在等待重試
+
+        Args:
+            video: 影片資料
+            endpoint: 端點
+            retry: 重試要求
+        """
+        print(f"⚠️ {video.title}: {str(retry)}，{retry.delay:.0f} 秒後重試")
+        platform = "bilibili" if endpoint == "bilibili" else "youtube"
+        report_stage(lambda progress: self._report_progress(video, progress), platform, UploadStage.RETRY_WAIT)
+
+    def _mark_requeued(self, video: VideoItem, endpoint: str, error: Exception):
+        """
+        重試額度用完：把影片標記為失敗，並註明稍後自動重試
+
+        Args:
+            video: 影片資料
+            endpoint: 端點
+            error: 最後一次的錯誤
+        """
+        message = f"{str(error)}（{REQUEUE_DELAY // 60} 分鐘後自動重試）"
+        print(f"❌ {video.title}: {message}")
+        if endpoint == "bilibili":
+            video.bilibili_status = UploadStatus.FAILED
+            video.bilibili_error_message = message
+        else:
+            video.set_status(UploadStatus.FAILED, message)
+        self.video_status_changed.emit(video)
+
+    def _record_fingerprint(self, video: VideoItem, platform: str, video_id: str):
+        """
+        在指紋索引中記錄上傳完成的影片
+
+        Args:
+            video: 影片資料
+            platform: 平台
+            video_id: 平台上的影片 ID
+        """
+        if self.fingerprint_index is not None:
+            self.fingerprint_index.record(video.video_path, platform, video_id, video.title)
+
+    def _report_progress(self, video: VideoItem, progress: UploadProgress):
+        """
+        記錄最新進度（在工作執行緒中呼叫）
+
+        位元組進度與階段事件分開保存，合併時不會互相覆蓋，並依更新先後送出
+
+        Args:
+            video: 影片資料
+            progress: 進度快照
+        """
+        key = (id(video), progress.platform, progress.has_bytes)
+        with self._lock:
+            # 重新插入讓字典順序反映最後更新的先後
+            self._pending_progress.pop(key, None)
+            self._pending_progress[key] = (video, progress)
+
+    def _flush_progress(self):
+        """把累積的最新進度送往 GUI（由 GUI 執行緒的計時器呼叫）"""
+        with self._lock:
+            pending = list(self._pending_progress.values())
+            self._pending_progress.clear()
+            running = self._graph is not None
+
+        for video, progress in pending:
+            self.video_progress.emit(video, progress)
+
+        if not running and not pending:
+            self._progress_timer.stop()
+
+    def _on_video_done(self, index: int, tasks: Dict[Hashable, Task]):
+        """
+        單部影片的任務全部結束的回呼（在工作執行緒中執行）
+
+        Args:
+            index: 影片在批次中的序號
+            tasks: 影片的所有任務
+        """
+        video = self._videos[index]
+        success = self._video_succeeded(video, tasks)
+        with self._lock:
+            if success:
+                self._success_count += 1
+                self._succeeded.add(id(video))
+            else:
+                self._fail_count += 1
+            done = self._success_count + self._fail_count
+            total = self._total
+
+        self.batch_progress.emit(done, total)
+        if done >= total:
+            self._finish_batch()
+
+    def _flush_playlist_items(self) -> List[VideoItem]:
+        """
+        把整個批次累積的播放清單項目以批次請求送出（取消時已完成的影片也照常加入）
+
+        每個播放清單的結果記錄在影片上；有清單加入失敗的影片標記為失敗，重新上傳時只重新加入這些清單
+
+        Returns:
+            List[VideoItem]: 有清單加入失敗的影片
+        """
+        with self._lock:
+            pending, self._pending_playlist_items = self._pending_playlist_items, []
+        if not pending:
+            return []
+        items = [(video.video_id, playlist_id) for video, playlist_id in pending]
+        print(f"加入播放清單（{len(items)} 個項目）...")
+        try:
+            results = self.youtube_uploader.add_videos_to_playlists(items)
+        except Exception as e:
+            print(f"❌ 加入播放清單失敗: {str(e)}")
+            results = {item: str(e) for item in items}
+
+        failed: Dict[int, Tuple[VideoItem, List[str]]] = {}
+        for (video, playlist_id), item in zip(pending, items):
+            error = results.get(item, "沒有回應")
+            video.set_step_state("youtube", playlist_step(playlist_id),
+                                 StepState.DONE if error is None else StepState.FAILED)
+            if error is not None:
+                failed.setdefault(id(video), (video, []))[1].append(playlist_id)
+        for video, playlist_ids in failed.values():
+            video.set_status(
+                UploadStatus.FAILED,
+                f"影片已上傳，但加入播放清單失敗: {', '.join(playlist_ids)}（重新上傳時只重試未完成的步驟）",
+            )
+            self.video_status_changed.emit(video)
+        return [video for video, _ in failed.values()]
+
+    def _report_transport_stats(self):
+        """印出這個批次的 Google API 連線重用率"""
+        start = self._transport_stats
+        end = get_transport_stats()
+        requests = end['requests'] - start.get('requests', 0)
+        if requests:
+            reused = end['reused'] - start.get('reused', 0)
+            print(f"Google API 連線重用: {reused}/{requests} ({reused / requests * 100:.0f}%)")
+
+    def _finish_batch(self):
+        """結束批次並發出完成訊號"""
+        playlist_failures = self._flush_playlist_items()
+        if self.checkpoints is not None:
+            # 所有步驟都完成的影片不再需要檢查點
+            for video in self._videos:
+                if not video.needs_upload:
+                    self.checkpoints.delete(video)
+        if self.channel_inventory is not None:
+            # 更新頻道內容快取，下一個批次開始前檢查重複時使用
+            self.youtube_uploader.sync_inventory()
+        self._report_transport_stats()
+        with self._lock:
+            # 已計為成功、但加入播放清單失敗的影片改計為失敗
+            moved = sum(1 for video in playlist_failures if id(video) in self._succeeded)
+            self._success_count -= moved
+            self._fail_count += moved
+            self._graph = None
+            self._videos = []
+            success_count = self._success_count
+            fail_count = self._fail_count
+
+        self.batch_finished.emit(success_count, fail_count)
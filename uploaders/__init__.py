@@ -2,8 +2,11 @@
 上傳器模組初始化
 """
 
-from .base_uploader import BaseUploader
+from .base_uploader import BaseUploader, CancellationToken, UploadCancelledError
 from .youtube_uploader import YouTubeUploader
 from .bilibili_uploader import BilibiliUploader
 
-__all__ = ['BaseUploader', 'YouTubeUploader', 'BilibiliUploader']
+__all__ = [
+    'BaseUploader', 'CancellationToken', 'UploadCancelledError',
+    'YouTubeUploader', 'BilibiliUploader'
+]
@@ -3,30 +3,148 @@
 定義所有平台上傳器的統一介面
 """
 
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Optional
+from uploaders.progress import ProgressListener
 from video_item import VideoItem
 
 
+# upload_async 未指定執行緒池時使用的共用執行緒數
+DEFAULT_ASYNC_WORKERS = 4
+
+_default_executor: Optional[ThreadPoolExecutor] = None
+_default_executor_lock = threading.Lock()
+
+
+class UploadCancelledError(Exception):
+    """上傳被 CancellationToken 取消"""
+    pass
+
+
+class CancellationToken:
+    """
+    取消權杖
+    
+    由呼叫端持有並呼叫 cancel()，上傳器在每個分塊之間檢查，
+    已上傳的部分會保留在續傳紀錄中，之後可以從中斷處繼續
+    """
+    
+    def __init__(self):
+        """初始化取消權杖"""
+        self._event = threading.Event()
+    
+    def cancel(self):
+        """要求取消"""
+        self._event.set()
+    
+    @property
+    def is_cancelled(self) -> bool:
+        """是否已要求取消"""
+        return self._event.is_set()
+    
+    def raise_if_cancelled(self):
+        """
+        已要求取消時拋出例外
+        
+        Raises:
+            UploadCancelledError: 已要求取消
+        """
+        if self._event.is_set():
+            raise UploadCancelledError("上傳已取消")
+    
+    def sleep(self, seconds: float):
+        """
+        可被取消中斷的等待
+        
+        Args:
+            seconds: 等待秒數
+            
+        Raises:
+            UploadCancelledError: 等待期間被取消
+        """
+        if self._event.wait(seconds):
+            raise UploadCancelledError("上傳已取消")
+
+
+def check_cancelled(cancel_token: Optional[CancellationToken]):
+    """
+    若權杖已取消則拋出例外（權杖為 None 時不做任何事）
+    
+    Args:
+        cancel_token: 取消權杖
+        
+    Raises:
+        UploadCancelledError: 已要求取消
+    """
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
+
+
+def _get_default_executor() -> ThreadPoolExecutor:
+    """取得 upload_async 共用的執行緒池"""
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_ASYNC_WORKERS,
+                thread_name_prefix="uploader-async",
+            )
+        return _default_executor
+
+
 class BaseUploader(ABC):
     """上傳器基類"""
     
     @abstractmethod
-    def upload(self, video: VideoItem) -> str:
+    def upload(self, video: VideoItem,
+               progress_callback: Optional[ProgressListener] = None,
+               cancel_token: Optional[CancellationToken] = None) -> str:
         """
-        上傳影片
+        上傳影片（阻塞直到完成）
         
         Args:
             video: 影片資料
+            progress_callback: 進度監聽器（可能在其他執行緒中被呼叫）
+            cancel_token: 取消權杖，上傳器需在分塊之間檢查
             
         Returns:
             str: 影片 ID
             
         Raises:
+            UploadCancelledError: 上傳被取消
             Exception: 上傳失敗時拋出異常
         """
         pass
     
+    def upload_async(self, video: VideoItem,
+                     progress_callback: Optional[ProgressListener] = None,
+                     cancel_token: Optional[CancellationToken] = None,
+                     executor: Optional[ThreadPoolExecutor] = None) -> Future:
+        """
+        非阻塞上傳影片
+        
+        在執行緒池中執行 upload()，立即返回 Future；
+        asyncio 呼叫端可用 asyncio.wrap_future() 取得 awaitable
+        
+        Args:
+            video: 影片資料
+            progress_callback: 進度監聽器
+            cancel_token: 取消權杖
+            executor: 執行緒池（None 表示使用共用的執行緒池）
+            
+        Returns:
+            Future: 結果為影片 ID 的 Future
+        """
+        executor = executor or _get_default_executor()
+        return executor.submit(
+            self.upload,
+            video,
+            progress_callback=progress_callback,
+            cancel_token=cancel_token,
+        )
+    
     @abstractmethod
     def set_thumbnail(self, video_id: str, thumbnail_path: str) -> bool:
         """
@@ -1,21 +1,31 @@
 """Bilibili uploader using the web creator-center upload endpoints."""
 
 import base64
+import heapq
 import math
 import mimetypes
 import os
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
 from zoneinfo import ZoneInfo
 
 import requests
 
-from services import google_drive
 from services.browser_cookies import BilibiliCookies, get_bilibili_cookies
-from uploaders.base_uploader import BaseUploader
-from video_item import MatchType, VideoItem
+from services.file_source import ViewReader, shared_source
+from services.replay_service import ReplayService, get_replay_service
+from services.resilience import INLINE_RETRY_LIMIT, backoff_delay, classify_error
+from services.resource_governor import GovernedReader, ResourceGovernor, get_governor
+from services.stall_watchdog import StallError, StallWatchdog, WatchedHTTPAdapter, WatchedReader, get_watchdog
+from services.state_store import JsonStateStore, file_state_key
+from services.upload_tuner import AimdController, UploadTuner
+from uploaders.base_uploader import BaseUploader, CancellationToken, check_cancelled
+from uploaders.progress import ProgressListener, ProgressTracker, UploadStage, report_stage
+from video_item import STEP_BYTES, STEP_COVER, MatchType, StepState, VideoItem
 
 
 BILIBILI_ADD_URL = "https://member.bilibili.com/x/vu/web/add/v3"
@@ -25,8 +35,24 @@ BILIBILI_TID_ESPORTS = 171
 BILIBILI_DESC_FORMAT_PLAIN_TEXT = 9999
 BILIBILI_PROFILE = "ugcfx/bup"
 BILIBILI_CHUNK_FALLBACK = 10 * 1024 * 1024
+BILIBILI_CHUNK_CONCURRENCY = 3
+# Upper bound for the auto-tuner's in-flight chunk count.
+BILIBILI_MAX_CHUNK_CONCURRENCY = 8
 BILIBILI_TIMEZONE = ZoneInfo("Asia/Taipei")
 BILIBILI_MIN_SCHEDULE_DELTA = timedelta(hours=4)
+BILIBILI_LEDGER_PATH = "bilibili_upload_ledger.json"
+# UPOS auth tokens expire; don't try to resume sessions older than this.
+BILIBILI_LEDGER_TTL = timedelta(hours=12)
+# UPOS answers these statuses when the upload id or auth is no longer valid.
+UPOS_SESSION_EXPIRED_STATUSES = (401, 403, 404, 410)
+# UPOS answers these statuses when it is throttling the uploader.
+UPOS_THROTTLE_STATUSES = (406, 429)
+# Per-chunk retry budget for each class of transient failure.
+BILIBILI_CHUNK_RETRY_BUDGETS = {"timeout": 4, "server": 4, "throttled": 6}
+# Backoff doubles from the base delay per retry of the same class, with jitter, up to the cap.
+BILIBILI_RETRY_BASE_DELAY = 1.0
+BILIBILI_THROTTLE_BASE_DELAY = 5.0
+BILIBILI_RETRY_MAX_DELAY = 60.0
 
 
 @dataclass
@@ -35,32 +61,113 @@ class BilibiliUploadFile:
     cid: int
 
 
+class UposSessionExpiredError(RuntimeError):
+    """The UPOS upload id/auth saved in the ledger is no longer accepted."""
+
+
+class ChunkUploadError(RuntimeError):
+    """A chunk PUT was not answered with MULTIPART_PUT_SUCCESS."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def classify_chunk_error(exc: BaseException) -> Optional[str]:
+    """The retry budget a failed chunk PUT draws from, or None when resending can't help."""
+    return classify_error(exc, throttle_statuses=UPOS_THROTTLE_STATUSES)
+
+
+def _retry_after_seconds(response) -> Optional[float]:
+    """The Retry-After header in seconds, if the server sent a numeric one."""
+    try:
+        return max(0.0, float(response.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return None
+
+
 class BilibiliUploader(BaseUploader):
     """Upload videos to Bilibili through the web upload API."""
 
-    def __init__(self, cookie_config_path: str = "bilibili_cookies.json"):
+    def __init__(
+        self,
+        cookie_config_path: str = "bilibili_cookies.json",
+        chunk_concurrency: int = BILIBILI_CHUNK_CONCURRENCY,
+        ledger_path: str = BILIBILI_LEDGER_PATH,
+        governor: Optional[ResourceGovernor] = None,
+        tuner: Optional[UploadTuner] = None,
+        replay_service: Optional[ReplayService] = None,
+        watchdog: Optional[StallWatchdog] = None,
+        defer_long_retries: bool = False,
+    ):
         self.cookie_config_path = cookie_config_path
+        self.ledger = JsonStateStore(ledger_path)
+        self.governor = governor or get_governor()
+        # Without a tuner the in-flight chunk count stays at chunk_concurrency; with one it
+        # starts from the best value saved for the UPOS endpoint (or chunk_concurrency).
+        self.tuner = tuner
+        # Shared with the YouTube uploader so a replay is uploaded to Drive only once.
+        self.replay_service = replay_service or get_replay_service()
+        self.chunk_concurrency = max(1, chunk_concurrency)
+        # When the caller can reschedule the upload (UploadManager's task graph), a backoff
+        # longer than INLINE_RETRY_LIMIT is handed back to it instead of waited out here.
+        self.defer_long_retries = defer_long_retries
+        # Aborts chunk PUTs whose send rate collapses (half-open connections after a network drop).
+        self.watchdog = watchdog or get_watchdog()
         self.session = requests.Session()
+        # One pooled keep-alive connection per in-flight chunk, plus one for metadata calls.
+        max_in_flight = max(self.chunk_concurrency, BILIBILI_MAX_CHUNK_CONCURRENCY if tuner else 0)
+        adapter = WatchedHTTPAdapter(pool_connections=4, pool_maxsize=max_in_flight + 1)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.cookies: BilibiliCookies | None = None
 
-    def upload(self, video: VideoItem) -> str:
-        """Upload a video to Bilibili and return the BV id."""
+    def upload(
+        self,
+        video: VideoItem,
+        progress_callback: Optional[ProgressListener] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> str:
+        """Upload a video to Bilibili and return the BV id.
+
+        ``cancel_token`` is checked between chunks; parts already sent stay in
+        the ledger so a later call resumes where the cancelled one stopped.
+        The cover and the uploaded file are checkpointed on ``video``, so a
+        retry after a failed submit only resubmits the archive.
+        """
         if not self.validate_video(video):
             raise ValueError("Invalid video item")
 
         self._ensure_auth()
 
+        if video.has_replay:
+            report_stage(progress_callback, "bilibili", UploadStage.REPLAY)
         replay_url = self._ensure_replay_uploaded(video)
 
-        cover_url = ""
-        if video.has_thumbnail:
+        cover_url = video.bilibili_cover_url or ""
+        if video.has_thumbnail and not video.is_step_done("bilibili", STEP_COVER):
+            report_stage(progress_callback, "bilibili", UploadStage.BILIBILI_COVER)
             try:
                 cover_url = self._upload_cover(video.thumbnail_path)
+                video.bilibili_cover_url = cover_url
+                video.set_step_state("bilibili", STEP_COVER, StepState.DONE)
                 print(f"Bilibili cover URL: {cover_url}")
             except Exception as exc:
+                video.set_step_state("bilibili", STEP_COVER, StepState.FAILED)
                 print(f"Cover upload failed, Bilibili will auto-pick a cover: {exc}")
 
-        uploaded = self._upload_video_file(video.video_path)
+        check_cancelled(cancel_token)
+        if video.bilibili_filename and video.is_step_done("bilibili", STEP_BYTES):
+            print(f"Reusing uploaded Bilibili file: {video.bilibili_filename}")
+            uploaded = BilibiliUploadFile(filename=video.bilibili_filename, cid=video.bilibili_cid)
+        else:
+            uploaded = self._upload_video_file(video.video_path, progress_callback, cancel_token)
+            video.bilibili_filename = uploaded.filename
+            video.bilibili_cid = uploaded.cid
+            video.set_step_state("bilibili", STEP_BYTES, StepState.DONE)
+        check_cancelled(cancel_token)
+        report_stage(progress_callback, "bilibili", UploadStage.BILIBILI_SUBMIT)
         payload = self._build_archive_payload(video, uploaded, cover_url, replay_url)
         response = self._post_json(
             BILIBILI_ADD_URL,
@@ -78,14 +185,14 @@ class BilibiliUploader(BaseUploader):
         return bvid
 
     def _ensure_replay_uploaded(self, video: VideoItem) -> str:
-        """Reuse an already-uploaded replay URL, or upload it once."""
+        """Reuse an already-uploaded replay URL, or upload it once through the replay service."""
         if not video.has_replay:
             return ""
         if video.replay_url:
             return video.replay_url
         try:
             print(f"Uploading replay to Google Drive: {video.replay_path}")
-            replay_url = google_drive.upload_replay(video.replay_path)
+            replay_url = self.replay_service.get_url(video.replay_path)
             video.set_replay_url(replay_url)
             return replay_url
         except Exception as exc:
@@ -116,24 +223,51 @@ class BilibiliUploader(BaseUploader):
         print(f"Loaded Bilibili cookies from {self.cookies.source}")
 
     def _upload_cover(self, thumbnail_path: str) -> str:
-        with open(thumbnail_path, "rb") as f:
-            encoded = base64.b64encode(f.read()).decode("ascii")
-
-        mime_type = mimetypes.guess_type(thumbnail_path)[0] or "image/jpeg"
-        cover = f"data:{mime_type};base64,{encoded}"
-        response = self.session.post(
-            BILIBILI_COVER_URL,
-            params={"ts": self._timestamp_ms()},
-            data={"csrf": self.cookies.csrf, "cover": cover},
-            timeout=60,
-        )
+        with self.governor.reserve_memory(self._cover_memory_cost(os.path.getsize(thumbnail_path))):
+            with open(thumbnail_path, "rb") as f:
+                encoded = base64.b64encode(f.read()).decode("ascii")
+
+            mime_type = mimetypes.guess_type(thumbnail_path)[0] or "image/jpeg"
+            cover = f"data:{mime_type};base64,{encoded}"
+            response = self.session.post(
+                BILIBILI_COVER_URL,
+                params={"ts": self._timestamp_ms()},
+                data={"csrf": self.cookies.csrf, "cover": cover},
+                timeout=60,
+            )
         payload = self._parse_bilibili_response(response)
         url = (payload.get("data") or {}).get("url")
         if not url:
             raise RuntimeError(f"Cover upload returned no URL: {payload}")
         return url
 
-    def _upload_video_file(self, video_path: str) -> BilibiliUploadFile:
+    @staticmethod
+    def _cover_memory_cost(image_size: int) -> int:
+        """Peak bytes held while posting a cover: the raw image, its base64 text and the form body."""
+        encoded_size = 4 * math.ceil(image_size / 3)
+        return image_size + 2 * encoded_size
+
+    def _upload_video_file(
+        self,
+        video_path: str,
+        progress_callback: Optional[ProgressListener] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> BilibiliUploadFile:
+        ledger_key = file_state_key(video_path)
+        session = self._load_upload_session(ledger_key)
+        if session:
+            print(f"Resuming Bilibili upload: {len(session['completed_parts'])} parts already uploaded")
+            try:
+                return self._finish_upload_session(video_path, ledger_key, session, progress_callback, cancel_token)
+            except UposSessionExpiredError as exc:
+                print(f"Saved UPOS session expired, starting a fresh upload: {exc}")
+                self.ledger.delete(ledger_key)
+
+        session = self._start_upload_session(video_path)
+        self.ledger.set(ledger_key, session)
+        return self._finish_upload_session(video_path, ledger_key, session, progress_callback, cancel_token)
+
+    def _start_upload_session(self, video_path: str) -> dict:
         filename = os.path.basename(video_path)
         filesize = os.path.getsize(video_path)
         preupload = self._preupload(filename)
@@ -143,36 +277,258 @@ class BilibiliUploader(BaseUploader):
         auth = preupload["auth"]
 
         upload_meta = self._create_upos_upload(upload_url, filesize, chunk_size, biz_id, auth)
-        upload_id = upload_meta["upload_id"]
+        return {
+            "preupload": preupload,
+            "upload_url": upload_url,
+            "upload_id": upload_meta["upload_id"],
+            "auth": auth,
+            "biz_id": biz_id,
+            "chunk_size": chunk_size,
+            "filesize": filesize,
+            "created_at": time.time(),
+            "completed_parts": [],
+        }
+
+    def _load_upload_session(self, ledger_key: str) -> Optional[dict]:
+        session = self.ledger.get(ledger_key)
+        if not session:
+            return None
+        age = time.time() - session.get("created_at", 0)
+        if age > BILIBILI_LEDGER_TTL.total_seconds():
+            print("Saved UPOS session is too old, starting a fresh upload")
+            self.ledger.delete(ledger_key)
+            return None
+        return session
+
+    def _finish_upload_session(
+        self,
+        video_path: str,
+        ledger_key: str,
+        session: dict,
+        progress_callback: Optional[ProgressListener] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> BilibiliUploadFile:
+        filename = os.path.basename(video_path)
+        completed = set(session["completed_parts"])
+        chunk_size = session["chunk_size"]
+        filesize = session["filesize"]
+
+        def part_size(part_number: int) -> int:
+            return max(0, min(chunk_size, filesize - (part_number - 1) * chunk_size))
+
+        tracker = ProgressTracker(
+            "bilibili",
+            filesize,
+            progress_callback,
+            initial_bytes=sum(part_size(number) for number in completed),
+        )
+
+        def record_part(part_number: int):
+            completed.add(part_number)
+            session["completed_parts"] = sorted(completed)
+            self.ledger.set(ledger_key, session)
+            tracker.advance(part_size(part_number))
+
+        parts = self._upload_parts(
+            video_path,
+            session["upload_url"],
+            session["auth"],
+            session["upload_id"],
+            session["chunk_size"],
+            session["filesize"],
+            completed_parts=completed,
+            on_part_uploaded=record_part,
+            cancel_token=cancel_token,
+        )
+
+        self._complete_upos_upload(
+            session["upload_url"], filename, session["upload_id"], session["biz_id"], session["auth"], parts
+        )
+        self.ledger.delete(ledger_key)
+        bili_filename = os.path.splitext(os.path.basename(session["preupload"]["upos_uri"]))[0]
+        return BilibiliUploadFile(filename=bili_filename, cid=session["biz_id"])
+
+    def _upload_parts(
+        self,
+        video_path: str,
+        upload_url: str,
+        auth: str,
+        upload_id: str,
+        chunk_size: int,
+        filesize: int,
+        completed_parts: Iterable[int] = (),
+        on_part_uploaded: Optional[Callable[[int], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> list:
+        """Upload every missing chunk with up to ``chunk_concurrency`` PUTs in flight.
+
+        UPOS accepts parts in any order, so chunks are sent concurrently and the
+        part list is sorted by part number before the upload is completed.
+        Parts listed in ``completed_parts`` are skipped; ``on_part_uploaded`` is
+        called with each newly uploaded part number. ``cancel_token`` is checked
+        before each chunk is read. With a tuner, the in-flight limit follows the
+        endpoint's AIMD controller, which is fed every chunk's latency and errors.
+
+        A chunk that fails with a timeout, 5xx or throttling status is re-read from
+        the source and resent after a jittered backoff, drawing on a separate budget
+        per error class. While it waits it holds no worker and no memory, so the
+        other chunks keep going; only an exhausted budget fails the upload. When
+        only backed-off chunks are left the wait happens here, unless
+        ``defer_long_retries`` is set and the wait is long: then the chunk's last
+        error is re-raised for the caller to reschedule (the ledger keeps sent parts).
+        """
         chunks = max(1, math.ceil(filesize / chunk_size))
+        completed_parts = set(completed_parts)
+        pending_indexes = [i for i in range(chunks) if i + 1 not in completed_parts]
+        controller = self._concurrency_controller(upload_url)
+
+        def in_flight_limit() -> int:
+            limit = controller.value if controller else self.chunk_concurrency
+            return max(1, min(limit, len(pending_indexes)))
 
-        print(f"Uploading Bilibili video in {chunks} chunks")
-        parts = []
-        with open(video_path, "rb") as f:
-            for chunk_index in range(chunks):
+        max_workers = max(1, min(controller.maximum if controller else self.chunk_concurrency, len(pending_indexes)))
+        print(f"Uploading Bilibili video in {chunks} chunks ({in_flight_limit()} in flight)")
+
+        with shared_source(video_path) as source, ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bilibili-chunk"
+        ) as pool:
+
+            def send(chunk_index: int) -> int:
+                check_cancelled(cancel_token)
                 start = chunk_index * chunk_size
-                data = f.read(chunk_size)
-                end = start + len(data)
+                size = min(chunk_size, filesize - start)
                 part_number = chunk_index + 1
-                self._upload_chunk(
-                    upload_url=upload_url,
-                    auth=auth,
-                    upload_id=upload_id,
-                    part_number=part_number,
-                    chunk_index=chunk_index,
-                    chunks=chunks,
-                    size=len(data),
-                    start=start,
-                    end=end,
-                    total=filesize,
-                    data=data,
-                )
-                parts.append({"partNumber": part_number, "eTag": "etag"})
-                print(f"Uploaded chunk {part_number}/{chunks}")
-
-        self._complete_upos_upload(upload_url, filename, upload_id, biz_id, auth, parts)
-        bili_filename = os.path.splitext(os.path.basename(preupload["upos_uri"]))[0]
-        return BilibiliUploadFile(filename=bili_filename, cid=biz_id)
+                # The chunk's pages stay resident until the PUT finishes, so hold the
+                # process-wide memory budget for the whole request.
+                with self.governor.reserve_memory(size, cancel_token):
+                    # Charged through the shared source: bytes YouTube already read are free.
+                    source.charge_disk(start, size, self.governor, cancel_token)
+                    # Zero-copy slice of the shared mmap; the pages were usually prefetched already.
+                    data = source.view(start, size)
+                    started = time.monotonic()
+                    try:
+                        self._upload_chunk(
+                            upload_url=upload_url,
+                            auth=auth,
+                            upload_id=upload_id,
+                            part_number=part_number,
+                            chunk_index=chunk_index,
+                            chunks=chunks,
+                            size=len(data),
+                            start=start,
+                            end=start + len(data),
+                            total=filesize,
+                            data=data,
+                            cancel_token=cancel_token,
+                        )
+                    except UposSessionExpiredError:
+                        raise
+                    except (requests.RequestException, RuntimeError, StallError):
+                        # Timeouts, stalls and rejected PUTs mean the link is overloaded: back off.
+                        if controller:
+                            controller.record_failure()
+                        raise
+                if controller:
+                    controller.record_success(len(data), time.monotonic() - started)
+                return part_number
+
+            parts = [{"partNumber": number, "eTag": "etag"} for number in completed_parts]
+
+            # Submit lazily so at most `in_flight_limit()` chunks are read into memory at once.
+            in_flight: Dict[Future, int] = {}
+            # Failed chunks waiting for their backoff: (monotonic time they may resend, chunk index).
+            retry_queue: List[Tuple[float, int]] = []
+            retries_used: Dict[int, Dict[str, int]] = {}
+            last_errors: Dict[int, Exception] = {}
+            next_pending = 0
+            try:
+                while next_pending < len(pending_indexes) or in_flight or retry_queue:
+                    while len(in_flight) < in_flight_limit():
+                        if retry_queue and retry_queue[0][0] <= time.monotonic():
+                            _, chunk_index = heapq.heappop(retry_queue)
+                        elif next_pending < len(pending_indexes):
+                            chunk_index = pending_indexes[next_pending]
+                            next_pending += 1
+                            if next_pending < len(pending_indexes):
+                                # Double-buffer: load the next chunk while the current PUTs are in flight.
+                                source.prefetch(pending_indexes[next_pending] * chunk_size, chunk_size)
+                        else:
+                            break
+                        check_cancelled(cancel_token)
+                        in_flight[pool.submit(send, chunk_index)] = chunk_index
+
+                    next_retry = retry_queue[0][0] - time.monotonic() if retry_queue else None
+                    if not in_flight:
+                        # Only chunks in backoff are left. A rescheduling caller gets the long
+                        # backoff back instead of a worker held through it.
+                        if self.defer_long_retries and next_retry > INLINE_RETRY_LIMIT:
+                            raise last_errors[retry_queue[0][1]]
+                        self._wait_for_retry(max(0.0, next_retry), cancel_token)
+                        continue
+                    done, _ = wait(
+                        in_flight,
+                        timeout=None if next_retry is None else max(0.0, next_retry),
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in done:
+                        chunk_index = in_flight.pop(future)
+                        try:
+                            part_number = future.result()
+                        except Exception as exc:
+                            delay = self._chunk_retry_delay(exc, retries_used.setdefault(chunk_index, {}))
+                            last_errors[chunk_index] = exc
+                            print(f"Chunk {chunk_index + 1}/{chunks} failed, resending in {delay:.1f}s: {exc}")
+                            heapq.heappush(retry_queue, (time.monotonic() + delay, chunk_index))
+                            continue
+                        parts.append({"partNumber": part_number, "eTag": "etag"})
+                        if on_part_uploaded:
+                            on_part_uploaded(part_number)
+                        print(f"Uploaded chunk {part_number}/{chunks}")
+            except BaseException:
+                for future in in_flight:
+                    future.cancel()
+                raise
+
+        parts.sort(key=lambda part: part["partNumber"])
+        return parts
+
+    @staticmethod
+    def _chunk_retry_delay(exc: Exception, retries_used: Dict[str, int]) -> float:
+        """Seconds to back off before resending a failed chunk.
+
+        ``retries_used`` counts this chunk's retries per error class and is updated.
+        Re-raises ``exc`` when it isn't transient or its class budget is spent.
+        """
+        error_class = classify_chunk_error(exc)
+        if error_class is None:
+            raise exc
+        retries_used[error_class] = retries_used.get(error_class, 0) + 1
+        if retries_used[error_class] > BILIBILI_CHUNK_RETRY_BUDGETS[error_class]:
+            raise exc
+        base = BILIBILI_THROTTLE_BASE_DELAY if error_class == "throttled" else BILIBILI_RETRY_BASE_DELAY
+        return backoff_delay(
+            retries_used[error_class], base, BILIBILI_RETRY_MAX_DELAY, getattr(exc, "retry_after", None)
+        )
+
+    @staticmethod
+    def _wait_for_retry(seconds: float, cancel_token: Optional[CancellationToken]):
+        """Sleep until the next chunk may be resent; a cancel interrupts the wait."""
+        if cancel_token is not None:
+            cancel_token.sleep(seconds)
+        else:
+            time.sleep(seconds)
+
+    def _concurrency_controller(self, upload_url: str) -> Optional[AimdController]:
+        """The AIMD controller for this UPOS host, or None when auto-tuning is off."""
+        if self.tuner is None:
+            return None
+        return self.tuner.controller(
+            f"bilibili-concurrency:{urlsplit(upload_url).netloc}",
+            default=self.chunk_concurrency,
+            minimum=1,
+            maximum=BILIBILI_MAX_CHUNK_CONCURRENCY,
+            step=1,
+        )
 
     def _preupload(self, filename: str) -> dict:
         response = self.session.get(
@@ -216,26 +572,37 @@ class BilibiliUploader(BaseUploader):
         start: int,
         end: int,
         total: int,
-        data: bytes,
+        data: memoryview,
+        cancel_token: Optional[CancellationToken] = None,
     ):
-        response = self.session.put(
-            upload_url,
-            params={
-                "partNumber": part_number,
-                "uploadId": upload_id,
-                "chunk": chunk_index,
-                "chunks": chunks,
-                "size": size,
-                "start": start,
-                "end": end,
-                "total": total,
-            },
-            headers={"X-Upos-Auth": auth, "Content-Type": "application/octet-stream"},
-            data=data,
-            timeout=120,
-        )
+        # Stream the body through the governor so a capped uplink is paced within the PUT, and
+        # report what was sent to the watchdog; the timeout scales with chunk size and link speed.
+        body = WatchedReader(GovernedReader(ViewReader(data), self.governor, cancel_token, charge_disk=False))
+        with self.watchdog.watch("bilibili", len(data)) as transfer:
+            response = self.session.put(
+                upload_url,
+                params={
+                    "partNumber": part_number,
+                    "uploadId": upload_id,
+                    "chunk": chunk_index,
+                    "chunks": chunks,
+                    "size": size,
+                    "start": start,
+                    "end": end,
+                    "total": total,
+                },
+                headers={"X-Upos-Auth": auth, "Content-Type": "application/octet-stream"},
+                data=body,
+                timeout=transfer.timeout,
+            )
+        if response.status_code in UPOS_SESSION_EXPIRED_STATUSES:
+            raise UposSessionExpiredError(f"Chunk upload rejected: HTTP {response.status_code} {response.text[:500]}")
         if response.text.strip() != "MULTIPART_PUT_SUCCESS":
-            raise RuntimeError(f"Chunk upload failed: HTTP {response.status_code} {response.text[:500]}")
+            raise ChunkUploadError(
+                f"Chunk upload failed: HTTP {response.status_code} {response.text[:500]}",
+                status_code=response.status_code,
+                retry_after=_retry_after_seconds(response),
+            )
 
     def _complete_upos_upload(self, upload_url: str, filename: str, upload_id: str, biz_id: int, auth: str, parts: list):
         response = self.session.post(
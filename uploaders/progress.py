@@ -0,0 +1,210 @@
+"""
+上傳進度
+定義上傳器回報給呼叫端的進度資料與速率 / 剩餘時間計算
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Protocol
+
+
+# 剩餘時間使用的平滑速率權重（越大越偏重最新一段的速率）
+RATE_SMOOTHING = 0.3
+
+
+class UploadStage(Enum):
+    """上傳階段枚舉"""
+    REPLAY = "Replay"
+    BYTES = "上傳影片"
+    THUMBNAIL = "縮圖"
+    PLAYLIST = "播放清單"
+    LOCALIZATION = "多國語言"
+    BILIBILI_COVER = "B站封面"
+    BILIBILI_SUBMIT = "B站投稿"
+    RETRY_WAIT = "等待重試"
+    DONE = "完成"
+
+
+@dataclass
+class UploadProgress:
+    """單次上傳的進度快照"""
+    platform: str
+    bytes_sent: int
+    total_bytes: int
+    # 最近一段（上一次回報到這次）的瞬時速率
+    bytes_per_second: float = 0.0
+    # 預估剩餘秒數（速率未知時為 None）
+    eta_seconds: Optional[float] = None
+    # 目前所在的階段
+    stage: UploadStage = UploadStage.BYTES
+
+    @property
+    def fraction(self) -> float:
+        """完成比例（0.0 ~ 1.0）"""
+        if self.total_bytes <= 0:
+            return 0.0
+        return min(1.0, self.bytes_sent / self.total_bytes)
+
+    @property
+    def is_complete(self) -> bool:
+        """是否已傳完所有位元組"""
+        return self.total_bytes > 0 and self.bytes_sent >= self.total_bytes
+
+    @property
+    def has_bytes(self) -> bool:
+        """是否帶有位元組進度（只回報階段時為 False）"""
+        return self.total_bytes > 0
+
+    @property
+    def progress_text(self) -> str:
+        """進度文字，例如 '45% (1.2/2.7 GB)'"""
+        if not self.has_bytes:
+            return ""
+        return f"{self.fraction * 100:.0f}% ({_format_size(self.bytes_sent, self.total_bytes)})"
+
+    @property
+    def speed_text(self) -> str:
+        """速率文字（MB/s）"""
+        if not self.has_bytes:
+            return ""
+        return f"{self.bytes_per_second / 1024 / 1024:.1f} MB/s"
+
+    @property
+    def eta_text(self) -> str:
+        """剩餘時間文字"""
+        if self.is_complete:
+            return "0:00"
+        if not self.has_bytes or self.eta_seconds is None:
+            return "--:--"
+        minutes, seconds = divmod(int(self.eta_seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        if hours:
+            return f"{hours}:{minutes:02d}:{seconds:02d}"
+        return f"{minutes}:{seconds:02d}"
+
+
+def _format_size(sent: int, total: int) -> str:
+    """以總大小決定單位，格式化已傳 / 總位元組數"""
+    if total >= 1024 ** 3:
+        return f"{sent / 1024 ** 3:.2f}/{total / 1024 ** 3:.2f} GB"
+    return f"{sent / 1024 ** 2:.1f}/{total / 1024 ** 2:.1f} MB"
+
+
+class ProgressListener(Protocol):
+    """進度監聽器協定：任何接受 UploadProgress 的可呼叫物件"""
+
+    def __call__(self, progress: UploadProgress) -> None:
+        ...
+
+
+def report_stage(callback: Optional[ProgressListener], platform: str, stage: UploadStage):
+    """
+    回報進入新階段（不帶位元組進度）
+
+    Args:
+        callback: 進度回呼（None 時不做任何事）
+        platform: 平台名稱
+        stage: 新的階段
+    """
+    if callback:
+        callback(UploadProgress(platform=platform, bytes_sent=0, total_bytes=0, stage=stage))
+
+
+class ProgressTracker:
+    """
+    進度追蹤器
+
+    依每次回報的已傳位元組數計算瞬時速率與平滑後的剩餘時間，並呼叫回呼。
+    可從多個執行緒呼叫（例如 B站並行分塊上傳）。
+    """
+
+    def __init__(self, platform: str, total_bytes: int,
+                 callback: Optional[ProgressListener] = None,
+                 initial_bytes: int = 0):
+        """
+        初始化進度追蹤器
+
+        Args:
+            platform: 平台名稱（'youtube'、'bilibili' 等）
+            total_bytes: 總位元組數
+            callback: 進度回呼（None 表示只追蹤不回報）
+            initial_bytes: 開始時已完成的位元組數（續傳時）
+        """
+        self.platform = platform
+        self.total_bytes = total_bytes
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._bytes_sent = initial_bytes
+        self._last_time = time.monotonic()
+        self._last_bytes = initial_bytes
+        self._smoothed_rate: Optional[float] = None
+
+    @property
+    def bytes_sent(self) -> int:
+        """目前已傳送的位元組數"""
+        with self._lock:
+            return self._bytes_sent
+
+    def update(self, bytes_sent: int) -> UploadProgress:
+        """
+        以絕對位置回報進度
+
+        Args:
+            bytes_sent: 目前已傳送（或伺服器已確認）的位元組數
+
+        Returns:
+            UploadProgress: 進度快照
+        """
+        with self._lock:
+            self._bytes_sent = bytes_sent
+            progress = self._snapshot()
+        if self.callback:
+            self.callback(progress)
+        return progress
+
+    def advance(self, num_bytes: int) -> UploadProgress:
+        """
+        以增量回報進度
+
+        Args:
+            num_bytes: 這次新傳送的位元組數
+
+        Returns:
+            UploadProgress: 進度快照
+        """
+        with self._lock:
+            self._bytes_sent += num_bytes
+            progress = self._snapshot()
+        if self.callback:
+            self.callback(progress)
+        return progress
+
+    def _snapshot(self) -> UploadProgress:
+        """計算速率與剩餘時間（呼叫端需持有鎖）"""
+        now = time.monotonic()
+        elapsed = now - self._last_time
+        delta = self._bytes_sent - self._last_bytes
+        rate = 0.0
+        if elapsed > 0 and delta >= 0:
+            rate = delta / elapsed
+            if self._smoothed_rate is None:
+                self._smoothed_rate = rate
+            else:
+                self._smoothed_rate = RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * self._smoothed_rate
+        self._last_time = now
+        self._last_bytes = self._bytes_sent
+
+        eta = None
+        if self._smoothed_rate:
+            eta = max(0.0, self.total_bytes - self._bytes_sent) / self._smoothed_rate
+
+        return UploadProgress(
+            platform=self.platform,
+            bytes_sent=self._bytes_sent,
+            total_bytes=self.total_bytes,
+            bytes_per_second=rate,
+            eta_seconds=eta,
+            stage=UploadStage.BYTES,
+        )
@@ -3,23 +3,49 @@ YouTube 上傳器
 實作 YouTube 影片上傳功能
 """
 
-import random
+import http.client
+import json
+import mimetypes
+import os
 import time
-from typing import List, Dict, Optional
-import googleapiclient.discovery
+from typing import List, Dict, Optional, Tuple
+import httplib2
 import googleapiclient.errors
-from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import DEFAULT_CHUNK_SIZE, MediaFileUpload, MediaUpload
 
-from uploaders.base_uploader import BaseUploader
-from video_item import VideoItem
+from uploaders.base_uploader import BaseUploader, CancellationToken, check_cancelled
+from uploaders.progress import ProgressListener, ProgressTracker, UploadStage, report_stage
+from video_item import STEP_LOCALIZATIONS, StepState, VideoItem
 from token_manager import TokenManager
-from services import google_drive
+from services.google_api import get_service
+from services.channel_inventory import ChannelInventory
+from services.replay_service import ReplayService, get_replay_service
+from services.resilience import INLINE_RETRY_LIMIT, RetryBudget
+from services.file_source import DEFAULT_READAHEAD, FileSource, open_source, release_source
+from services.resource_governor import GovernedReader, ResourceGovernor, get_governor
+from services.stall_watchdog import StallWatchdog, WatchedReader, get_watchdog
+from services.state_store import JsonStateStore, file_state_key
+from services.upload_tuner import AimdController, UploadTuner
 
 
-# 重試設定
-MAX_RETRIES = 10
-RETRIABLE_STATUS_CODES = [500, 502, 503, 504]
+# 查詢 session 時視為連線問題的錯誤（錯誤分類與重試額度見 services.resilience）
+RETRIABLE_EXCEPTIONS = (httplib2.HttpLib2Error, http.client.HTTPException, OSError)
+
+# 分塊上傳設定（分塊大小必須是 256 KB 的倍數，-1 表示整個檔案一次送出）
+YOUTUBE_CHUNK_ALIGNMENT = 256 * 1024
+YOUTUBE_CHUNK_SIZE = 8 * 1024 * 1024
+# 自動調整分塊大小的範圍與每次增加的量
+YOUTUBE_MIN_CHUNK_SIZE = 1024 * 1024
+YOUTUBE_MAX_CHUNK_SIZE = 64 * 1024 * 1024
+YOUTUBE_CHUNK_STEP = 4 * 1024 * 1024
+
+# 可恢復上傳 session 設定
+YOUTUBE_SESSION_PATH = "youtube_upload_sessions.json"
+YOUTUBE_SESSION_TTL_SECONDS = 6 * 24 * 60 * 60  # YouTube session URI 約一週後失效
+SESSION_EXPIRED_STATUS_CODES = [404, 410]
+
+# 單一批次請求最多合併的 API 呼叫數
+YOUTUBE_BATCH_LIMIT = 50
 
 # YouTube 設定
 CATEGORY_ID = "20"  # Gaming
@@ -31,24 +57,201 @@ ENG_TO_JA = {"Protoss": "プロトス", "Zerg": "ザーグ", "Terran": "テラ
 ENG_TO_KR = {"Protoss": "프로토스", "Zerg": "저그", "Terran": "테란", "Random": "랜덤"}
 
 
+class SourceMediaUpload(MediaUpload):
+    """
+    從共用檔案來源讀取的上傳媒體
+    
+    取代 MediaFileUpload：送出的資料是 mmap 的 memoryview 切片，不另外配置 bytes，
+    並在送出目前分塊時於背景預讀下一個分塊；同一個檔案與 B站上傳共用同一個來源。
+    指定 governor 時經由來源扣磁碟配額，與 B站同時上傳時同一段只扣一次。
+    檔案在第一次使用時才開啟，用完需呼叫 close()
+    """
+    
+    def __init__(self, filename: str, chunksize: int = DEFAULT_CHUNK_SIZE,
+                 resumable: bool = False, mimetype: Optional[str] = None,
+                 governor: Optional[ResourceGovernor] = None,
+                 cancel_token: Optional[CancellationToken] = None):
+        """
+        初始化上傳媒體
+        
+        Args:
+            filename: 檔案路徑
+            chunksize: 分塊大小（-1 表示整個檔案一次送出）
+            resumable: 是否為可恢復上傳
+            mimetype: MIME 類型（None 表示依副檔名判斷）
+            governor: 讀取時扣磁碟配額的資源管控（None 表示不扣）
+            cancel_token: 取消權杖（等待配額期間可被中斷）
+        """
+        self._filename = filename
+        self._chunksize = chunksize
+        self._resumable = resumable
+        self._mimetype = mimetype or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        self._governor = governor
+        self._cancel_token = cancel_token
+        self._source: Optional[FileSource] = None
+    
+    @property
+    def source(self) -> FileSource:
+        """共用的檔案來源（第一次存取時開啟）"""
+        if self._source is None:
+            self._source = open_source(self._filename)
+        return self._source
+    
+    def chunksize(self):
+        return self._chunksize
+    
+    def mimetype(self):
+        return self._mimetype
+    
+    def size(self):
+        return self.source.size
+    
+    def resumable(self):
+        return self._resumable
+    
+    def has_stream(self):
+        return True
+    
+    def getbytes(self, begin, length):
+        if self._governor is not None:
+            self.source.charge_disk(begin, length, self._governor, self._cancel_token)
+        return self.source.view(begin, length).tobytes()
+    
+    def stream(self):
+        # 每次預讀一個分塊：送出目前分塊時，下一個分塊已在背景載入
+        readahead = self._chunksize if self._chunksize > 0 else DEFAULT_READAHEAD
+        return self.source.reader(readahead, self._governor, self._cancel_token)
+    
+    def close(self):
+        """釋放共用的檔案來源"""
+        if self._source is not None:
+            release_source(self._source)
+            self._source = None
+
+
+class GovernedMediaUpload(MediaUpload):
+    """
+    受資源管控限速的上傳媒體
+    
+    包裝另一個 MediaUpload，httplib2 從 stream() 讀取要送出的資料時每讀一小段
+    就向資源管控取得配額，不分塊（chunksize=-1）時整個檔案也會依限速平均送出；
+    讀取進度同時回報給停滯監視
+    """
+    
+    def __init__(self, media: MediaUpload, governor: ResourceGovernor,
+                 cancel_token: Optional[CancellationToken] = None,
+                 charge_disk: bool = True):
+        """
+        初始化上傳媒體
+        
+        Args:
+            media: 實際的上傳媒體（例如 MediaFileUpload）
+            governor: 頻寬資源管控
+            cancel_token: 取消權杖（等待配額期間可被中斷）
+            charge_disk: 是否扣磁碟配額（被包裝的媒體已自行經由共用來源扣時為 False）
+        """
+        self._media = media
+        self._governor = governor
+        self._cancel_token = cancel_token
+        self._charge_disk = charge_disk
+        self._chunksize: Optional[int] = None
+    
+    def set_chunksize(self, chunksize: int):
+        """
+        調整之後每個分塊的大小（上傳中也可以調整）
+        
+        Args:
+            chunksize: 分塊大小（需為 256 KB 的倍數）
+        """
+        self._chunksize = chunksize
+    
+    def chunksize(self):
+        if self._chunksize is not None:
+            return self._chunksize
+        return self._media.chunksize()
+    
+    def mimetype(self):
+        return self._media.mimetype()
+    
+    def size(self):
+        return self._media.size()
+    
+    def resumable(self):
+        return self._media.resumable()
+    
+    def has_stream(self):
+        return self._media.has_stream()
+    
+    def getbytes(self, begin, length):
+        if self._charge_disk:
+            self._governor.acquire_disk(length, self._cancel_token)
+        data = self._media.getbytes(begin, length)
+        self._governor.acquire_network(len(data), self._cancel_token)
+        return data
+    
+    def stream(self):
+        # 外層回報送出進度給停滯監視（等待配額的時間不算停滯）
+        return WatchedReader(GovernedReader(self._media.stream(), self._governor, self._cancel_token,
+                                            charge_disk=self._charge_disk))
+
+
 class YouTubeUploader(BaseUploader):
     """YouTube 上傳器"""
     
-    def __init__(self, token_manager: TokenManager):
+    def __init__(self, token_manager: TokenManager, session_store_path: str = YOUTUBE_SESSION_PATH,
+                 chunk_size: int = YOUTUBE_CHUNK_SIZE,
+                 governor: Optional[ResourceGovernor] = None,
+                 tuner: Optional[UploadTuner] = None,
+                 replay_service: Optional[ReplayService] = None,
+                 inventory: Optional[ChannelInventory] = None,
+                 watchdog: Optional[StallWatchdog] = None,
+                 defer_long_retries: bool = False):
         """
         初始化 YouTube 上傳器
         
         Args:
             token_manager: Token 管理器
+            session_store_path: 可恢復上傳 session 的儲存檔案
+            chunk_size: 每次 next_chunk 送出的位元組數（-1 表示不分塊）
+            governor: 頻寬資源管控（None 表示使用共用的資源管控）
+            tuner: 分塊大小自動調整（None 表示固定使用 chunk_size）
+            replay_service: Replay 上傳服務（None 表示使用與 B站共用的服務）
+            inventory: 頻道內容快取（None 表示不檢查，一律送出 insert）
+            watchdog: 傳輸停滯監視（None 表示使用共用的監視）
+            defer_long_retries: 較長的退避是否拋出錯誤交給呼叫端重新排程（False 表示在目前執行緒等待）
         """
         self.token_manager = token_manager
+        self.session_store = JsonStateStore(session_store_path)
+        self.chunk_size = chunk_size
+        self.governor = governor or get_governor()
+        self.tuner = tuner
+        self.replay_service = replay_service or get_replay_service()
+        self.inventory = inventory
+        self.watchdog = watchdog or get_watchdog()
+        self.defer_long_retries = defer_long_retries
+    
+    @property
+    def chunk_size(self) -> int:
+        """分塊大小（已對齊到 256 KB 的倍數）"""
+        return self._chunk_size
     
-    def upload(self, video: VideoItem) -> str:
+    @chunk_size.setter
+    def chunk_size(self, value: int):
+        if value is None or value <= 0:
+            self._chunk_size = -1
+        else:
+            chunks = max(1, -(-value // YOUTUBE_CHUNK_ALIGNMENT))
+            self._chunk_size = chunks * YOUTUBE_CHUNK_ALIGNMENT
+    
+    def upload(self, video: VideoItem, progress_callback: Optional[ProgressListener] = None,
+               cancel_token: Optional[CancellationToken] = None) -> str:
         """
         上傳影片到 YouTube
         
         Args:
             video: 影片資料
+            progress_callback: 每送出一個分塊後呼叫的進度回呼
+            cancel_token: 取消權杖（在分塊之間檢查，session 會保留以便續傳）
             
         Returns:
             str: YouTube 影片 ID
@@ -60,17 +263,10 @@ class YouTubeUploader(BaseUploader):
         if not self.validate_video(video):
             raise ValueError("影片資料不完整")
         
-        # 1. 上傳 Replay 到 Google Drive（如果有）
-        replay_url = ""
-        if video.has_replay:
-            try:
-                print(f"上傳 Replay: {video.replay_path}")
-                replay_url = google_drive.upload_replay(video.replay_path)
-                video.set_replay_url(replay_url)
-                print(f"Replay URL: {replay_url}")
-            except Exception as e:
-                print(f"Replay 上傳失敗: {str(e)}")
-                # Replay 上傳失敗不影響影片上傳
+        # 1. 上傳 Replay 到 Google Drive（如果有，批次上傳時通常已由獨立的任務先完成）
+        replay_url = self.ensure_replay_uploaded(video, progress_callback)
+        
+        check_cancelled(cancel_token)
         
         # 2. 準備影片描述
         social_links = self._get_social_links()
@@ -82,10 +278,8 @@ class YouTubeUploader(BaseUploader):
         if not creds:
             raise Exception("無法取得 YouTube 憑證，請先進行認證")
         
-        # 4. 建立 YouTube 服務
-        youtube = googleapiclient.discovery.build(
-            "youtube", "v3", credentials=creds
-        )
+        # 4. 取得 YouTube 服務（依憑證快取）
+        youtube = get_service("youtube", "v3", creds)
         
         # 5. 準備上傳參數
         tags = KEYWORDS.split(",")
@@ -118,18 +312,78 @@ class YouTubeUploader(BaseUploader):
         if publish_at:
             body["status"]["publishAt"] = publish_at
         
-        insert_request = youtube.videos().insert(
-            part=",".join(body.keys()),
-            body=body,
-            media_body=MediaFileUpload(video.video_path, chunksize=-1, resumable=True)
-        )
+        # 多國語言標題與描述直接隨上傳送出，不需要上傳後再 list + update
+        body["snippet"]["defaultLanguage"] = "en"
+        body["localizations"] = self._build_localizations(video.title, replay_url, social_links)
         
-        # 8. 執行上傳
-        video_id = self._resumable_upload(insert_request)
+        # 磁碟配額經由共用來源扣（與 B站同時上傳時同一段只扣一次），這裡只扣網路配額
+        media = SourceMediaUpload(video.video_path, chunksize=self._initial_chunk_size(), resumable=True,
+                                  governor=self.governor, cancel_token=cancel_token)
+        try:
+            insert_request = youtube.videos().insert(
+                part=",".join(body.keys()),
+                body=body,
+                media_body=GovernedMediaUpload(media, self.governor, cancel_token, charge_disk=False)
+            )
+            
+            # 8. 若有上次中斷的 session，向伺服器查詢已接收的範圍後續傳
+            video_id = self._restore_upload_session(video, insert_request)
+            
+            # 9. 執行上傳
+            if video_id is None:
+                video_id = self._resumable_upload(insert_request, video, progress_callback, cancel_token)
+        finally:
+            media.close()
         
+        self._clear_upload_session(video)
         print(f"✅ 影片上傳成功: {video_id}")
+        if self.inventory is not None:
+            self.inventory.record_upload(video_id, video.title)
+        # 多國語言已隨上傳送出
+        video.set_step_state("youtube", STEP_LOCALIZATIONS, StepState.DONE)
         return video_id
     
+    def ensure_replay_uploaded(self, video: VideoItem,
+                               progress_callback: Optional[ProgressListener] = None,
+                               raise_errors: bool = False) -> str:
+        """
+        確保 Replay 已上傳到 Google Drive
+        
+        已上傳過（例如續傳上次中斷的影片）時沿用原本的連結，不重複建立公開連結；
+        經由共用的 Replay 服務上傳，與 B站同時需要同一個 Replay 時只上傳一次；
+        上傳失敗不影響影片上傳
+        
+        Args:
+            video: 影片資料（取得連結後寫回 replay_url）
+            progress_callback: 進度回呼（回報 Replay 階段）
+            raise_errors: 上傳失敗時是否拋出例外（由呼叫端決定重試或略過）
+            
+        Returns:
+            str: Replay 連結（沒有 Replay 或上傳失敗時為空字串）
+        """
+        if not video.has_replay:
+            return ""
+        
+        replay_url = video.replay_url or self._saved_replay_url(video) or ""
+        if replay_url:
+            if replay_url != video.replay_url:
+                video.set_replay_url(replay_url)
+                print(f"沿用已上傳的 Replay: {replay_url}")
+            return replay_url
+        
+        report_stage(progress_callback, "youtube", UploadStage.REPLAY)
+        try:
+            print(f"上傳 Replay: {video.replay_path}")
+            replay_url = self.replay_service.get_url(video.replay_path)
+            video.set_replay_url(replay_url)
+            print(f"Replay URL: {replay_url}")
+            return replay_url
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Replay 上傳失敗: {str(e)}")
+            return ""
+    
     def set_thumbnail(self, video_id: str, thumbnail_path: str) -> bool:
         """
         設定影片縮圖
@@ -139,196 +393,502 @@ class YouTubeUploader(BaseUploader):
             thumbnail_path: 縮圖檔案路徑
             
         Returns:
-            bool: 是否成功
-        """
-        try:
-            creds = self.token_manager.get_youtube_credentials()
-            if not creds:
-                return False
-            
-            youtube = googleapiclient.discovery.build(
-                "youtube", "v3", credentials=creds
-            )
+            bool: 成功時為 True
             
+        Raises:
+            Exception: 設定失敗時拋出異常（由呼叫端記錄步驟狀態並決定是否重試）
+        """
+        creds = self.token_manager.get_youtube_credentials()
+        if not creds:
+            raise Exception("無法取得 YouTube 憑證，請先進行認證")
+        
+        youtube = get_service("youtube", "v3", creds)
+        
+        # googleapiclient 會把縮圖整個讀進記憶體後送出
+        with self.governor.reserve_memory(os.path.getsize(thumbnail_path)):
             youtube.thumbnails().set(
                 videoId=video_id,
                 media_body=MediaFileUpload(thumbnail_path)
             ).execute()
-            
-            print(f"✅ 縮圖設定成功: {video_id}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ 縮圖設定失敗: {str(e)}")
-            return False
+        
+        print(f"✅ 縮圖設定成功: {video_id}")
+        return True
     
     def add_to_playlist(self, video_id: str, playlist_ids: List[str]) -> bool:
         """
-        將影片加入播放清單
+        將影片加入播放清單（所有播放清單以一次批次請求送出）
         
         Args:
             video_id: YouTube 影片 ID
             playlist_ids: 播放清單 ID 列表
             
         Returns:
-            bool: 是否成功
+            bool: 是否全部成功
         """
-        try:
-            creds = self.token_manager.get_youtube_credentials()
-            if not creds:
-                return False
-            
-            youtube = googleapiclient.discovery.build(
-                "youtube", "v3", credentials=creds
-            )
+        results = self.add_videos_to_playlists([(video_id, playlist_id) for playlist_id in playlist_ids])
+        return bool(results) and all(error is None for error in results.values())
+    
+    def add_videos_to_playlists(self, items: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        以 YouTube 批次端點一次加入多個 (影片, 播放清單)
+        
+        每 YOUTUBE_BATCH_LIMIT 個項目合併成一個 HTTP 請求，各項目的錯誤分別回報；
+        有頻道內容快取時先同步目標播放清單，已在清單中的項目直接視為成功，不重複加入
+        
+        Args:
+            items: (影片 ID, 播放清單 ID) 列表
             
-            for playlist_id in playlist_ids:
-                youtube.playlistItems().insert(
-                    part="snippet",
-                    body={
-                        'snippet': {
-                            'playlistId': playlist_id,
-                            'resourceId': {
-                                'kind': 'youtube#video',
-                                'videoId': video_id
+        Returns:
+            Dict[Tuple[str, str], Optional[str]]: 每個項目的結果（None 表示成功，否則為錯誤訊息）
+        """
+        results: Dict[Tuple[str, str], Optional[str]] = {}
+        if not items:
+            return results
+        
+        creds = self.token_manager.get_youtube_credentials()
+        if not creds:
+            print("❌ 加入播放清單失敗: 無法取得 YouTube 憑證")
+            return {item: "無法取得 YouTube 憑證" for item in items}
+        
+        youtube = get_service("youtube", "v3", creds)
+        
+        if self.inventory is not None:
+            self._sync_inventory(youtube, {playlist_id for _, playlist_id in items}, include_uploads=False)
+            for item in items:
+                if self.inventory.contains(item[1], item[0]):
+                    results[item] = None
+                    print(f"已在播放清單中，略過: {item[0]} → {item[1]}")
+            items = [item for item in items if item not in results]
+        
+        def on_response(item: Tuple[str, str]):
+            def callback(request_id, response, exception):
+                if exception is not None:
+                    results[item] = str(exception)
+                    print(f"❌ 加入播放清單失敗: {item[0]} → {item[1]}: {str(exception)}")
+                else:
+                    results[item] = None
+                    if self.inventory is not None:
+                        self.inventory.record(item[1], item[0])
+                    print(f"✅ 加入播放清單: {item[0]} → {item[1]}")
+            return callback
+        
+        for offset in range(0, len(items), YOUTUBE_BATCH_LIMIT):
+            group = items[offset:offset + YOUTUBE_BATCH_LIMIT]
+            batch = youtube.new_batch_http_request()
+            for video_id, playlist_id in group:
+                batch.add(
+                    youtube.playlistItems().insert(
+                        part="snippet",
+                        body={
+                            'snippet': {
+                                'playlistId': playlist_id,
+                                'resourceId': {
+                                    'kind': 'youtube#video',
+                                    'videoId': video_id
+                                }
                             }
                         }
-                    }
-                ).execute()
-                print(f"✅ 加入播放清單: {playlist_id}")
+                    ),
+                    callback=on_response((video_id, playlist_id)),
+                )
+            try:
+                batch.execute()
+            except Exception as e:
+                # 整個批次請求失敗：這一批中尚未回報的項目都記為失敗
+                print(f"❌ 加入播放清單失敗: {str(e)}")
+                for item in group:
+                    results.setdefault(item, str(e))
+        
+        return results
+    
+    def sync_inventory(self) -> bool:
+        """
+        同步頻道「上傳的影片」播放清單到本地快取（沒有快取時不做事）
+        
+        Returns:
+            bool: 是否成功
+        """
+        if self.inventory is None:
+            return False
+        creds = self.token_manager.get_youtube_credentials()
+        if not creds:
+            print("❌ 同步頻道內容失敗: 無法取得 YouTube 憑證")
+            return False
+        return self._sync_inventory(get_service("youtube", "v3", creds))
+    
+    def _sync_inventory(self, youtube, playlist_ids=(), include_uploads: bool = True) -> bool:
+        """
+        同步頻道內容快取（失敗時沿用舊的快取）
+        
+        Args:
+            youtube: YouTube 服務
+            playlist_ids: 要同步的播放清單
+            include_uploads: 是否同時同步「上傳的影片」播放清單
             
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            self.inventory.sync(youtube, playlist_ids, include_uploads=include_uploads)
             return True
-            
         except Exception as e:
-            print(f"❌ 加入播放清單失敗: {str(e)}")
+            print(f"❌ 同步頻道內容失敗: {str(e)}")
             return False
     
     def add_localizations(self, video_id: str, replay_url: str) -> bool:
         """
-        添加多國語言字幕
+        為已上傳的影片補上多國語言標題與描述
+        
+        新上傳的影片已在 videos.insert 時帶入多國語言，這裡只用於先前上傳的舊影片
         
         Args:
             video_id: YouTube 影片 ID
             replay_url: Replay 檔案 URL
             
         Returns:
-            bool: 是否成功
-        """
-        try:
-            creds = self.token_manager.get_youtube_credentials()
-            if not creds:
-                return False
+            bool: 成功時為 True
             
-            youtube = googleapiclient.discovery.build(
-                "youtube", "v3", credentials=creds
+        Raises:
+            Exception: 設定失敗時拋出異常（由呼叫端記錄步驟狀態並決定是否重試）
+        """
+        creds = self.token_manager.get_youtube_credentials()
+        if not creds:
+            raise Exception("無法取得 YouTube 憑證，請先進行認證")
+        
+        youtube = get_service("youtube", "v3", creds)
+        
+        # 取得影片資訊
+        video_response = youtube.videos().list(
+            part="snippet,localizations",
+            id=video_id
+        ).execute()
+        
+        if not video_response['items']:
+            raise Exception(f"找不到影片: {video_id}")
+        
+        video = video_response['items'][0]
+        snippet = video['snippet']
+        existing_localizations = video.get('localizations', {})
+        
+        # 設定預設語言
+        snippet['defaultLanguage'] = "en"
+        
+        # 更新本地化內容
+        existing_localizations.update(
+            self._build_localizations(snippet['title'], replay_url, self._get_social_links())
+        )
+        
+        # 更新影片
+        youtube.videos().update(
+            part="snippet,localizations",
+            body=dict(
+                id=video_id,
+                snippet=snippet,
+                localizations=existing_localizations
             )
+        ).execute()
+        
+        print(f"✅ 多國語言設定成功")
+        return True
+    
+    def _build_localizations(self, title: str, replay_url: str, social_links: str) -> Dict[str, Dict[str, str]]:
+        """
+        產生繁中、日文、韓文的標題與描述
+        
+        Args:
+            title: 英文標題
+            replay_url: Replay URL
+            social_links: 社群連結
             
-            # 取得影片資訊
-            video_response = youtube.videos().list(
-                part="snippet,localizations",
-                id=video_id
-            ).execute()
-            
-            if not video_response['items']:
-                return False
-            
-            video = video_response['items'][0]
-            snippet = video['snippet']
-            existing_localizations = video.get('localizations', {})
-            
-            # 設定預設語言
-            snippet['defaultLanguage'] = "en"
-            
-            # 準備多語言內容
-            en_title = snippet['title']
-            en_description = self._get_description(en_title, replay_url, include_social=False)
-            
-            social_links = self._get_social_links()
-            
-            # 繁體中文
-            zh_tw_title = self._translate_title(en_title, ENG_TO_TW)
-            zh_tw_description = self._get_description(zh_tw_title, replay_url, social_links)
-            
-            # 日文
-            ja_title = self._translate_title(en_title, ENG_TO_JA)
-            ja_description = self._get_description(ja_title, replay_url, social_links)
-            
-            # 韓文
-            ko_title = self._translate_title(en_title, ENG_TO_KR)
-            ko_description = self._get_description(ko_title, replay_url, social_links)
-            
-            # 更新本地化內容
-            localizations = {
-                'zh-TW': {'title': zh_tw_title, 'description': zh_tw_description},
-                'ja': {'title': ja_title, 'description': ja_description},
-                'ko': {'title': ko_title, 'description': ko_description}
+        Returns:
+            Dict[str, Dict[str, str]]: videos 資源的 localizations 欄位
+        """
+        localizations = {}
+        for language, translation_dict in (('zh-TW', ENG_TO_TW), ('ja', ENG_TO_JA), ('ko', ENG_TO_KR)):
+            localized_title = self._translate_title(title, translation_dict)
+            localizations[language] = {
+                'title': localized_title,
+                'description': self._get_description(localized_title, replay_url, social_links),
             }
-            
-            existing_localizations.update(localizations)
-            
-            # 更新影片
-            youtube.videos().update(
-                part="snippet,localizations",
-                body=dict(
-                    id=video_id,
-                    snippet=snippet,
-                    localizations=existing_localizations
-                )
-            ).execute()
-            
-            print(f"✅ 多國語言設定成功")
-            return True
-            
-        except Exception as e:
-            print(f"❌ 多國語言設定失敗: {str(e)}")
-            return False
+        return localizations
     
-    def _resumable_upload(self, insert_request) -> str:
+    def _resumable_upload(self, insert_request, video: Optional[VideoItem] = None,
+                          progress_callback: Optional[ProgressListener] = None,
+                          cancel_token: Optional[CancellationToken] = None) -> str:
         """
         可恢復的上傳
         
+        分塊模式下每個 next_chunk 只送出一個分塊，失敗重試時只需重送該分塊；
+        退避在目前執行緒等待；設定 defer_long_retries 時只等很短的退避，
+        較長的退避拋出原本的錯誤交給呼叫端排程，不佔用工作執行緒
+        
         Args:
             insert_request: YouTube API 上傳請求
+            video: 影片資料（用來保存 session URI 與已上傳位元組數）
+            progress_callback: 每個分塊完成後呼叫的進度回呼
+            cancel_token: 取消權杖（每個分塊之前檢查）
             
         Returns:
             str: 影片 ID
+            
+        Raises:
+            UploadCancelledError: 上傳被取消
+            Exception: 永久性錯誤、重試額度用完，或（defer_long_retries 時）需要較長退避的暫時性錯誤
         """
+        tracker = ProgressTracker(
+            "youtube",
+            insert_request.resumable.size(),
+            progress_callback,
+            initial_bytes=insert_request.resumable_progress,
+        )
+        controller = self._chunk_controller()
+        budget = RetryBudget()
         response = None
-        error = None
-        retry = 0
         
         while response is None:
             try:
-                print("上傳中...")
-                status, response = insert_request.next_chunk()
+                check_cancelled(cancel_token)
+                chunk_start = insert_request.resumable_progress
+                started = time.monotonic()
+                # 傳送中的分塊（或不分塊時的預讀範圍）計入共用的記憶體預算；
+                # 停滯監視在送出速率過低或超過依分塊大小計算的逾時時中止連線，下次從伺服器確認的位置續傳
+                with self.governor.reserve_memory(self._chunk_memory_cost(controller), cancel_token):
+                    with self.watchdog.watch("youtube", self._request_size(insert_request, tracker, controller)):
+                        status, response = insert_request.next_chunk()
+                
+                if controller is not None:
+                    sent = (status.resumable_progress if status is not None else tracker.total_bytes) - chunk_start
+                    controller.record_success(sent, time.monotonic() - started)
+                    insert_request.resumable.set_chunksize(controller.value)
+                
+                if status is not None:
+                    progress = tracker.update(status.resumable_progress)
+                    print(
+                        f"上傳中... {progress.fraction * 100:.1f}% "
+                        f"({progress.bytes_per_second / 1024 / 1024:.2f} MB/s)"
+                    )
                 
                 if response is not None:
                     if 'id' in response:
+                        tracker.update(tracker.total_bytes)
                         return response['id']
                     else:
                         raise Exception(f"上傳失敗，未預期的回應: {response}")
                         
-            except HttpError as e:
-                if e.resp.status in RETRIABLE_STATUS_CODES:
-                    error = f"HTTP 錯誤 {e.resp.status}: {e.content}"
-                else:
-                    raise
-                    
             except Exception as e:
-                error = f"上傳錯誤: {str(e)}"
-            
-            if error is not None:
-                print(f"⚠️ {error}")
-                retry += 1
+                delay = budget.delay_for(e)
+                if delay is None:
+                    raise
+                print(f"⚠️ 上傳錯誤: {str(e)}")
                 
-                if retry > MAX_RETRIES:
-                    raise Exception("重試次數已達上限")
+                if controller is not None:
+                    # 分塊失敗時縮小分塊，重試只需重送較少的資料
+                    controller.record_failure()
+                    insert_request.resumable.set_chunksize(controller.value)
                 
-                max_sleep = 2 ** retry
-                sleep_seconds = random.random() * max_sleep
-                print(f"等待 {sleep_seconds:.1f} 秒後重試...")
-                time.sleep(sleep_seconds)
-                error = None
+                if self.defer_long_retries and delay > INLINE_RETRY_LIMIT:
+                    # 較長的退避交給呼叫端排程（session 已保存，重新呼叫 upload 時從伺服器確認的位置續傳）
+                    raise
+                print(f"等待 {delay:.1f} 秒後重試...")
+                if cancel_token is not None:
+                    cancel_token.sleep(delay)
+                else:
+                    time.sleep(delay)
+            
+            finally:
+                # 每一步都保存 session，程式中斷後可從伺服器確認的位置續傳
+                if video is not None and response is None:
+                    self._save_upload_session(video, insert_request)
+    
+    def _chunk_controller(self) -> Optional[AimdController]:
+        """
+        取得分塊大小的 AIMD 調整器
+        
+        Returns:
+            Optional[AimdController]: 調整器，未啟用自動調整或不分塊時返回 None
+        """
+        if self.tuner is None or self.chunk_size == -1:
+            return None
+        return self.tuner.controller(
+            "youtube-chunk-size",
+            default=self.chunk_size,
+            minimum=YOUTUBE_MIN_CHUNK_SIZE,
+            maximum=YOUTUBE_MAX_CHUNK_SIZE,
+            step=YOUTUBE_CHUNK_STEP,
+            granularity=YOUTUBE_CHUNK_ALIGNMENT,
+        )
+    
+    def _chunk_memory_cost(self, controller: Optional[AimdController]) -> int:
+        """
+        一次 next_chunk 佔用的記憶體
+        
+        Args:
+            controller: 分塊大小的調整器（None 表示使用固定的 chunk_size）
+            
+        Returns:
+            int: 位元組數（不分塊時為預讀範圍）
+        """
+        chunk_size = controller.value if controller is not None else self.chunk_size
+        return chunk_size if chunk_size > 0 else DEFAULT_READAHEAD
+    
+    def _request_size(self, insert_request, tracker: ProgressTracker,
+                      controller: Optional[AimdController]) -> int:
+        """
+        下一個 next_chunk 會送出的位元組數（決定停滯監視的逾時）
+        
+        Args:
+            insert_request: YouTube API 上傳請求
+            tracker: 上傳進度（取得檔案大小）
+            controller: 分塊大小的調整器
+            
+        Returns:
+            int: 位元組數（分塊時為分塊大小，最後一個分塊較小也不影響；不分塊時為剩餘的全部資料）
+        """
+        chunk_size = controller.value if controller is not None else self.chunk_size
+        if chunk_size != -1:
+            return chunk_size
+        return max(0, tracker.total_bytes - insert_request.resumable_progress)
+    
+    def _initial_chunk_size(self) -> int:
+        """
+        取得新上傳的起始分塊大小
+        
+        Returns:
+            int: 自動調整啟用時為調整器目前的數值，否則為 chunk_size
+        """
+        controller = self._chunk_controller()
+        return controller.value if controller is not None else self.chunk_size
+    
+    def _session_key(self, video: VideoItem) -> Optional[str]:
+        """
+        取得影片檔案對應的 session key
+        
+        Args:
+            video: 影片資料
+            
+        Returns:
+            Optional[str]: session key，檔案不存在時返回 None
+        """
+        try:
+            return file_state_key(video.video_path)
+        except OSError:
+            return None
+    
+    def _save_upload_session(self, video: VideoItem, insert_request):
+        """
+        保存可恢復上傳的 session URI 與已確認的位元組數
+        
+        Args:
+            video: 影片資料
+            insert_request: YouTube API 上傳請求
+        """
+        upload_uri = insert_request.resumable_uri
+        if not upload_uri:
+            return
+        
+        uploaded_bytes = insert_request.resumable_progress
+        if (upload_uri == video.youtube_upload_uri
+                and uploaded_bytes == video.youtube_uploaded_bytes):
+            return
+        
+        video.set_youtube_upload_session(upload_uri, uploaded_bytes)
+        key = self._session_key(video)
+        if key:
+            previous = self.session_store.get(key) or {}
+            created_at = previous.get('created_at') if previous.get('uri') == upload_uri else None
+            self.session_store.set(key, {
+                'uri': upload_uri,
+                'uploaded_bytes': uploaded_bytes,
+                'created_at': created_at or time.time(),
+                'replay_url': video.replay_url,
+            })
+    
+    def _saved_replay_url(self, video: VideoItem) -> Optional[str]:
+        """
+        取得上次中斷的上傳所使用的 Replay 連結
+        
+        Args:
+            video: 影片資料
+            
+        Returns:
+            Optional[str]: Replay 連結，沒有保存的 session 時返回 None
+        """
+        key = self._session_key(video)
+        saved = self.session_store.get(key) if key else None
+        return (saved or {}).get('replay_url')
+    
+    def _clear_upload_session(self, video: VideoItem):
+        """
+        上傳完成後清除保存的 session
+        
+        Args:
+            video: 影片資料
+        """
+        video.set_youtube_upload_session(None)
+        key = self._session_key(video)
+        if key:
+            self.session_store.delete(key)
+    
+    def _restore_upload_session(self, video: VideoItem, insert_request) -> Optional[str]:
+        """
+        還原上次中斷的可恢復上傳 session
+        
+        向伺服器送出空的 PUT 查詢已確認的範圍，並把上傳請求的進度設到該位置
+        
+        Args:
+            video: 影片資料
+            insert_request: YouTube API 上傳請求
+            
+        Returns:
+            Optional[str]: 若伺服器表示上次其實已上傳完成，返回影片 ID；否則返回 None
+        """
+        key = self._session_key(video)
+        saved = self.session_store.get(key) if key else None
+        upload_uri = (saved or {}).get('uri') or video.youtube_upload_uri
+        if not upload_uri:
+            return None
+        
+        if saved and time.time() - saved.get('created_at', 0) > YOUTUBE_SESSION_TTL_SECONDS:
+            print("⚠️ 上次的上傳 session 已過期，重新上傳")
+            self._clear_upload_session(video)
+            return None
+        
+        total = os.path.getsize(video.video_path)
+        try:
+            resp, content = insert_request.http.request(
+                upload_uri,
+                method="PUT",
+                headers={"Content-Range": f"bytes */{total}", "content-length": "0"},
+            )
+            if resp.status in [200, 201]:
+                video_id = json.loads(content)['id']
+                print("✅ 上次的上傳其實已完成")
+                return video_id
+        except (*RETRIABLE_EXCEPTIONS, ValueError, KeyError) as e:
+            # 查詢失敗不代表 session 失效：沿用保存的 session 並標記為錯誤狀態，
+            # 由 _resumable_upload 的重試流程在下一個 next_chunk 重新向伺服器確認範圍
+            print(f"⚠️ 無法查詢上次的上傳 session（{str(e)}），改在上傳時重新確認")
+            insert_request.resumable_uri = upload_uri
+            insert_request.resumable_progress = (saved or {}).get('uploaded_bytes', video.youtube_uploaded_bytes)
+            insert_request._in_error_state = True
+            return None
+        
+        if resp.status == 308:
+            committed = 0
+            if 'range' in resp:
+                committed = int(resp['range'].split('-')[1]) + 1
+            insert_request.resumable_uri = upload_uri
+            insert_request.resumable_progress = committed
+            video.set_youtube_upload_session(upload_uri, committed)
+            print(f"續傳上次中斷的上傳，伺服器已確認 {committed}/{total} bytes")
+            return None
+        
+        if resp.status in SESSION_EXPIRED_STATUS_CODES:
+            print("⚠️ 上次的上傳 session 已失效，重新上傳")
+        else:
+            print(f"⚠️ 無法查詢上次的上傳 session（HTTP {resp.status}），重新上傳")
+        self._clear_upload_session(video)
+        return None
     
     def _get_description(self, title: str, replay_url: str, 
                         social_links: str = "", include_social: bool = True) -> str:
@@ -6,7 +6,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 
 
 class UploadStatus(Enum):
@@ -15,6 +15,7 @@ class UploadStatus(Enum):
     UPLOADING = "上傳中"
     COMPLETED = "已完成"
     FAILED = "失敗"
+    SKIPPED = "已略過"  # 重複的影片，平台上已有同一部影片
 
 
 class MatchType(Enum):
@@ -26,6 +27,34 @@ class MatchType(Enum):
     UNKNOWN = "未知"
 
 
+class StepState(Enum):
+    """上傳步驟狀態枚舉"""
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
+
+# 上傳步驟名稱（各平台共用；播放清單每個清單一個步驟，見 playlist_step）
+STEP_BYTES = "bytes"
+STEP_THUMBNAIL = "thumbnail"
+STEP_LOCALIZATIONS = "localizations"
+STEP_COVER = "cover"
+STEP_SUBMIT = "submit"
+
+
+def playlist_step(playlist_id: str) -> str:
+    """
+    取得加入播放清單的步驟名稱
+    
+    Args:
+        playlist_id: 播放清單 ID
+        
+    Returns:
+        str: 步驟名稱
+    """
+    return f"playlist:{playlist_id}"
+
+
 @dataclass
 class VideoItem:
     """
@@ -67,6 +96,12 @@ class VideoItem:
     # Replay 上傳後的 URL
     replay_url: Optional[str] = None
 
+    # YouTube 可恢復上傳的 session URI（程式重啟後用來續傳）
+    youtube_upload_uri: Optional[str] = None
+
+    # YouTube 伺服器已確認收到的位元組數
+    youtube_uploaded_bytes: int = 0
+
     # Bilibili 上傳狀態（與 YouTube 的 status 互相獨立）
     bilibili_status: UploadStatus = UploadStatus.PENDING
 
@@ -76,6 +111,19 @@ class VideoItem:
     # Bilibili 錯誤訊息（如果上傳失敗）
     bilibili_error_message: Optional[str] = None
 
+    # Bilibili 已上傳的封面 URL（投稿失敗重試時沿用）
+    bilibili_cover_url: Optional[str] = None
+
+    # Bilibili 已上傳完成的影片檔名與 cid（投稿失敗重試時不需要重新上傳）
+    bilibili_filename: Optional[str] = None
+    bilibili_cid: Optional[int] = None
+
+    # 各平台的上傳步驟狀態（平台 → 步驟 → 狀態），重新執行時只做未完成的步驟
+    upload_steps: Dict[str, Dict[str, StepState]] = field(default_factory=dict)
+
+    # 步驟狀態改變時的回呼（保存檢查點用，不序列化）
+    on_checkpoint: Optional[Callable[['VideoItem'], None]] = field(default=None, repr=False, compare=False)
+
     def __post_init__(self):
         """初始化後處理"""
         # 如果沒有設定發布時間，預設為當天 18:00
@@ -131,6 +179,95 @@ class VideoItem:
         """
         self.video_id = video_id
         self.status = UploadStatus.COMPLETED
+        self.set_step_state("youtube", STEP_BYTES, StepState.DONE)
+    
+    def set_skipped(self, platform: str, video_id: str):
+        """
+        標記影片已在平台上（重複的影片），這個平台不再上傳，也不算本批次上傳成功
+        
+        Args:
+            platform: 平台（'youtube' 或 'bilibili'）
+            video_id: 平台上既有的影片 ID
+        """
+        if platform == "bilibili":
+            self.bilibili_video_id = video_id
+            self.bilibili_status = UploadStatus.SKIPPED
+        else:
+            self.video_id = video_id
+            self.status = UploadStatus.SKIPPED
+    
+    def set_bilibili_video_id(self, video_id: str):
+        """
+        設定 B站投稿後的影片 ID
+        
+        Args:
+            video_id: Bilibili 影片 ID（bvid）
+        """
+        self.bilibili_video_id = video_id
+        self.bilibili_status = UploadStatus.COMPLETED
+        self.set_step_state("bilibili", STEP_SUBMIT, StepState.DONE)
+    
+    @property
+    def needs_upload(self) -> bool:
+        """是否還有未完成的上傳（待上傳，或任一平台失敗需要重試未完成的步驟）"""
+        return (self.status in (UploadStatus.PENDING, UploadStatus.FAILED)
+                or self.bilibili_status == UploadStatus.FAILED)
+    
+    def step_state(self, platform: str, step: str) -> StepState:
+        """
+        取得上傳步驟的狀態
+        
+        Args:
+            platform: 平台（'youtube' 或 'bilibili'）
+            step: 步驟名稱
+            
+        Returns:
+            StepState: 步驟狀態（沒有紀錄時為 PENDING）
+        """
+        return self.upload_steps.get(platform, {}).get(step, StepState.PENDING)
+    
+    def is_step_done(self, platform: str, step: str) -> bool:
+        """
+        上傳步驟是否已完成
+        
+        Args:
+            platform: 平台
+            step: 步驟名稱
+            
+        Returns:
+            bool: 已完成時為 True
+        """
+        return self.step_state(platform, step) == StepState.DONE
+    
+    def set_step_state(self, platform: str, step: str, state: StepState):
+        """
+        設定上傳步驟的狀態
+        
+        Args:
+            platform: 平台
+            step: 步驟名稱
+            state: 新的狀態
+        """
+        self.upload_steps.setdefault(platform, {})[step] = state
+        if self.on_checkpoint is not None:
+            self.on_checkpoint(self)
+    
+    @property
+    def pending_playlist_ids(self) -> List[str]:
+        """尚未加入的 YouTube 播放清單"""
+        return [playlist_id for playlist_id in self.playlist_ids
+                if not self.is_step_done("youtube", playlist_step(playlist_id))]
+    
+    def set_youtube_upload_session(self, upload_uri: Optional[str], uploaded_bytes: int = 0):
+        """
+        設定 YouTube 可恢復上傳的 session 狀態
+        
+        Args:
+            upload_uri: 可恢復上傳的 session URI（None 表示清除）
+            uploaded_bytes: 伺服器已確認收到的位元組數
+        """
+        self.youtube_upload_uri = upload_uri
+        self.youtube_uploaded_bytes = uploaded_bytes if upload_uri else 0
     
     def set_replay_url(self, replay_url: str):
         """
@@ -168,6 +305,58 @@ class VideoItem:
             'processed': False
         }
     
+    def checkpoint_dict(self) -> dict:
+        """
+        轉換為檢查點格式（只包含重新執行未完成的步驟所需的資料）
+        
+        Returns:
+            dict: 步驟狀態與各平台已取得的 ID
+        """
+        return {
+            'video_id': self.video_id,
+            'bilibili_video_id': self.bilibili_video_id,
+            'bilibili_cover_url': self.bilibili_cover_url,
+            'bilibili_filename': self.bilibili_filename,
+            'bilibili_cid': self.bilibili_cid,
+            'upload_steps': self._dump_steps(),
+        }
+    
+    def restore_checkpoint(self, data: dict):
+        """
+        套用保存的檢查點（已投稿 B站的影片直接標記為完成）
+        
+        Args:
+            data: checkpoint_dict() 的內容
+        """
+        self.video_id = data.get('video_id')
+        self.bilibili_video_id = data.get('bilibili_video_id')
+        self.bilibili_cover_url = data.get('bilibili_cover_url')
+        self.bilibili_filename = data.get('bilibili_filename')
+        self.bilibili_cid = data.get('bilibili_cid')
+        self.upload_steps = self._load_steps(data.get('upload_steps'))
+        if self.bilibili_video_id and self.is_step_done("bilibili", STEP_SUBMIT):
+            self.bilibili_status = UploadStatus.COMPLETED
+    
+    def _dump_steps(self) -> Dict[str, Dict[str, str]]:
+        """步驟狀態轉換為可序列化的字典"""
+        return {
+            platform: {step: state.value for step, state in steps.items()}
+            for platform, steps in self.upload_steps.items()
+        }
+    
+    @staticmethod
+    def _load_steps(data: Optional[dict]) -> Dict[str, Dict[str, StepState]]:
+        """轉換上傳步驟狀態（無法辨識的狀態視為未完成）"""
+        upload_steps = {}
+        for platform, steps in (data or {}).items():
+            upload_steps[platform] = {}
+            for step, value in steps.items():
+                try:
+                    upload_steps[platform][step] = StepState(value)
+                except ValueError:
+                    pass
+        return upload_steps
+    
     def to_dict(self) -> dict:
         """
         轉換為字典格式（用於序列化）
@@ -190,9 +379,15 @@ class VideoItem:
             'video_id': self.video_id,
             'error_message': self.error_message,
             'replay_url': self.replay_url,
+            'youtube_upload_uri': self.youtube_upload_uri,
+            'youtube_uploaded_bytes': self.youtube_uploaded_bytes,
             'bilibili_status': self.bilibili_status.value,
             'bilibili_video_id': self.bilibili_video_id,
-            'bilibili_error_message': self.bilibili_error_message
+            'bilibili_error_message': self.bilibili_error_message,
+            'bilibili_cover_url': self.bilibili_cover_url,
+            'bilibili_filename': self.bilibili_filename,
+            'bilibili_cid': self.bilibili_cid,
+            'upload_steps': self._dump_steps()
         }
     
     @classmethod
@@ -250,7 +445,13 @@ class VideoItem:
             video_id=data.get('video_id'),
             error_message=data.get('error_message'),
             replay_url=data.get('replay_url'),
+            youtube_upload_uri=data.get('youtube_upload_uri'),
+            youtube_uploaded_bytes=data.get('youtube_uploaded_bytes', 0),
             bilibili_status=bilibili_status,
             bilibili_video_id=data.get('bilibili_video_id'),
-            bilibili_error_message=data.get('bilibili_error_message')
+            bilibili_error_message=data.get('bilibili_error_message'),
+            bilibili_cover_url=data.get('bilibili_cover_url'),
+            bilibili_filename=data.get('bilibili_filename'),
+            bilibili_cid=data.get('bilibili_cid'),
+            upload_steps=cls._load_steps(data.get('upload_steps'))
         )